@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+County Lookup Benchmark
+
+Replays a recorded drive through the county lookup paths and compares them:
+  - lookup()        STRtree query + polygon test (the original path)
+  - lookup() + grid precomputed cell table (load_grid_index)
+  - locate()        last-county-first fast path used by the GPS callback
+  - lookup_many()   one vectorized call for the whole track
+
+Usage:
+    python bench_county_lookup.py --nmea drive.nmea     # recorded NMEA log (GGA sentences)
+    python bench_county_lookup.py                       # synthetic OKC -> Tulsa drive
+    python bench_county_lookup.py --shapefile data/tl_2025_us_county.shp
+"""
+
+import argparse
+import math
+import time
+
+from modules.county_lookup import CountyLookupService
+
+
+def read_nmea_track(path):
+    """Read (lat, lon) fixes from the GGA sentences of an NMEA log"""
+    import pynmea2
+    
+    track = []
+    with open(path, 'r', encoding='ascii', errors='ignore') as f:
+        for line in f:
+            line = line.strip()
+            if not (line.startswith('$GPGGA') or line.startswith('$GNGGA')):
+                continue
+            try:
+                msg = pynmea2.parse(line)
+            except pynmea2.ParseError:
+                continue
+            if msg.latitude and msg.longitude and msg.gps_qual and msg.gps_qual > 0:
+                track.append((msg.latitude, msg.longitude))
+    return track
+
+
+def synthetic_track(start=(35.4676, -97.5164), end=(36.1540, -95.9928), mph=65):
+    """1 Hz fixes along a straight line at highway speed (default OKC -> Tulsa)"""
+    lat1, lon1 = start
+    lat2, lon2 = end
+    miles = math.hypot((lat2 - lat1) * 69.05, (lon2 - lon1) * 69.05 * math.cos(math.radians(lat1)))
+    fixes = max(2, int(miles / mph * 3600))
+    return [(lat1 + (lat2 - lat1) * i / (fixes - 1), lon1 + (lon2 - lon1) * i / (fixes - 1))
+            for i in range(fixes)]
+
+
+def time_per_fix(label, func, track, repeat=3):
+    """Best-of-N time for running func over the whole track"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(track)
+        best = min(best, time.perf_counter() - start)
+    print(f"  {label:<24} {best * 1e6 / len(track):8.2f} us/fix   ({best * 1000:.1f} ms total)")
+    return result
+
+
+def fips_list(counties):
+    return [c.fips if c else None for c in counties]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark county lookup paths over a drive")
+    parser.add_argument('--shapefile', default='data/us_counties_10m.shp')
+    parser.add_argument('--nmea', help="Recorded NMEA log to replay (default: synthetic drive)")
+    args = parser.parse_args()
+    
+    track = read_nmea_track(args.nmea) if args.nmea else synthetic_track()
+    print(f"Track: {len(track)} fixes ({'recorded' if args.nmea else 'synthetic OKC -> Tulsa'})")
+    
+    tree_service = CountyLookupService()
+    tree_service.load_shapefile(args.shapefile)
+    
+    grid_service = CountyLookupService()
+    grid_service.load_shapefile(args.shapefile)
+    start = time.perf_counter()
+    grid_service.load_grid_index()
+    print(f"Grid table ready in {time.perf_counter() - start:.2f}s")
+    print()
+    
+    baseline = time_per_fix("lookup() STRtree", 
+                            lambda t: [tree_service.lookup(lat, lon) for lat, lon in t], track)
+    
+    gridded = time_per_fix("lookup() grid table",
+                           lambda t: [grid_service.lookup(lat, lon) for lat, lon in t], track)
+    
+    def replay_locate(t):
+        tree_service._last = tree_service._last_info = None  # Start each run with no last county
+        return [tree_service.locate(lat, lon).county for lat, lon in t]
+    located = time_per_fix("locate() fast path", replay_locate, track)
+    
+    lats = [lat for lat, _ in track]
+    lons = [lon for _, lon in track]
+    bulk = time_per_fix("lookup_many()", lambda t: tree_service.lookup_many(lats, lons), track)
+    
+    print()
+    expected = fips_list(baseline)
+    for label, result in (("grid table", gridded), ("locate()", located), ("lookup_many()", bulk)):
+        mismatches = sum(a != b for a, b in zip(expected, fips_list(result)))
+        print(f"  {label:<24} {'matches STRtree' if not mismatches else f'{mismatches} MISMATCHES'}")
+    
+    counties = len({f for f in expected if f})
+    print(f"\nDrive crossed {counties} counties")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Maidenhead Grid Benchmark
+
+Times modules/maidenhead.py against the per-call grid code it replaced
+(gps_monitor.latlon_to_grid and the _grid_to_latlon copies in copilot.py
+and radio_updater.py), and checks both give the same answers.
+
+Usage:
+    python bench_grid.py
+    python bench_grid.py --points 500000
+"""
+
+import argparse
+import random
+import time
+
+from modules import maidenhead
+
+
+# === Previous implementations (reference only) ===
+
+def legacy_latlon_to_grid(lat, lon):
+    lon = lon + 180
+    lat = lat + 90
+    field_lon = int(lon / 20)
+    field_lat = int(lat / 10)
+    lon = lon - (field_lon * 20)
+    lat = lat - (field_lat * 10)
+    square_lon = int(lon / 2)
+    square_lat = int(lat)
+    lon = (lon - (square_lon * 2)) * 12
+    lat = (lat - square_lat) * 24
+    subsquare_lon = int(lon)
+    subsquare_lat = int(lat)
+    return (chr(ord('A') + field_lon) + chr(ord('A') + field_lat) +
+            str(square_lon) + str(square_lat) +
+            chr(ord('a') + subsquare_lon) + chr(ord('a') + subsquare_lat))
+
+
+def legacy_grid_to_latlon(grid):
+    if not grid or len(grid) < 4:
+        return None, None
+    grid = grid.upper()
+    try:
+        lon = (ord(grid[0]) - ord('A')) * 20 - 180
+        lat = (ord(grid[1]) - ord('A')) * 10 - 90
+        lon += int(grid[2]) * 2
+        lat += int(grid[3]) * 1
+        if len(grid) >= 6:
+            lon += (ord(grid[4]) - ord('A')) * (2/24)
+            lat += (ord(grid[5]) - ord('A')) * (1/24)
+            lon += (2/24) / 2
+            lat += (1/24) / 2
+        else:
+            lon += 1
+            lat += 0.5
+        return lat, lon
+    except (IndexError, ValueError):
+        return None, None
+
+
+def best_of(func, repeat=5):
+    """Best wall time of several runs, plus the last result"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def report(label, old, new, count):
+    print(f"  {label:<32} old {old * 1e9 / count:7.0f} ns   new {new * 1e9 / count:7.0f} ns   "
+          f"({old / new:.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Maidenhead grid conversions")
+    parser.add_argument('--points', type=int, default=200000)
+    args = parser.parse_args()
+    
+    random.seed(5)
+    # Mostly North America, like a real QSY table / GPS track
+    lats = [random.uniform(25, 50) for _ in range(args.points)]
+    lons = [random.uniform(-125, -67) for _ in range(args.points)]
+    grids = [legacy_latlon_to_grid(lat, lon) for lat, lon in zip(lats, lons)]
+    grids4 = [g[:4] for g in grids]
+    print(f"{args.points} points\n")
+    
+    old, old_grids = best_of(lambda: [legacy_latlon_to_grid(a, b) for a, b in zip(lats, lons)])
+    new, new_grids = best_of(lambda: [maidenhead.latlon_to_grid(a, b) for a, b in zip(lats, lons)])
+    report("latlon_to_grid (6 char)", old, new, args.points)
+    vec, vec_grids = best_of(lambda: maidenhead.latlon_to_grid_many(lats, lons))
+    report("latlon_to_grid_many (6 char)", old, vec, args.points)
+    
+    # QSY tables / spot lists decode the same few hundred grids over and over
+    table = [random.choice(grids[:500]) for _ in range(args.points)]
+    
+    def decode_cold(grid_list):
+        maidenhead._decode.cache_clear()
+        return [maidenhead.grid_to_latlon(g) for g in grid_list]
+    
+    old, old_centers = best_of(lambda: [legacy_grid_to_latlon(g) for g in grids4])
+    new, new_centers = best_of(lambda: decode_cold(grids4))
+    report("grid_to_latlon (4 char)", old, new, args.points)
+    
+    old6, old_centers6 = best_of(lambda: [legacy_grid_to_latlon(g) for g in grids])
+    new6, new_centers6 = best_of(lambda: decode_cold(grids))
+    report("grid_to_latlon (6 char, unique)", old6, new6, args.points)
+    
+    old_t, old_table = best_of(lambda: [legacy_grid_to_latlon(g) for g in table])
+    new_t, new_table = best_of(lambda: [maidenhead.grid_to_latlon(g) for g in table])
+    report("grid_to_latlon (6 char, table)", old_t, new_t, args.points)
+    
+    print()
+    mismatched = sum(a != b for a, b in zip(old_grids, new_grids))
+    mismatched += sum(a != b for a, b in zip(old_grids, vec_grids))
+    off = sum(abs(a[0] - b[0]) > 1e-9 or abs(a[1] - b[1]) > 1e-9
+              for a, b in zip(old_centers + old_centers6 + old_table,
+                                new_centers + new_centers6 + new_table))
+    print(f"  encode mismatches: {mismatched}   decode mismatches: {off}")
+
+
+if __name__ == '__main__':
+    main()
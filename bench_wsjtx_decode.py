@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+WSJT-X Protocol Benchmark
+
+Times modules/wsjtx_protocol.py (message layouts compiled to cached
+struct.Struct runs, read in place with unpack_from) against the
+slice-and-unpack parsing and bytes += building it replaced in
+radio_updater.py, under a simulated broadcast storm: several WSJT-X
+instances each sending a Heartbeat, a Status and a full period of
+Decodes every cycle, with the odd QSO Logged. Checks both decode the
+same values.
+
+Usage:
+    python bench_wsjtx_decode.py
+    python bench_wsjtx_decode.py --instances 12 --decodes 60 --cycles 200
+"""
+
+import argparse
+import datetime
+import random
+import struct
+import time
+
+from modules import wsjtx_protocol
+
+
+# === Previous implementations (reference only) ===
+
+def legacy_decode_qstring(data, offset):
+    if len(data) < offset + 4:
+        raise ValueError("Not enough data for QString length")
+    length = struct.unpack('>I', data[offset:offset+4])[0]
+    offset += 4
+    if length == 0xFFFFFFFF:
+        return '', offset
+    if len(data) < offset + length:
+        raise ValueError("Not enough data for QString content")
+    string = data[offset:offset+length].decode('utf-8')
+    offset += length
+    return string, offset
+
+
+def legacy_decode_qdatetime(data, offset):
+    if len(data) < offset + 13:
+        raise ValueError("Not enough data for QDateTime")
+    julian_day = struct.unpack('>Q', data[offset:offset+8])[0]
+    offset += 8
+    msecs = struct.unpack('>I', data[offset:offset+4])[0]
+    offset += 4
+    time_spec = struct.unpack('>B', data[offset:offset+1])[0]
+    offset += 1
+    dt = datetime.datetime(1970, 1, 1) + datetime.timedelta(days=julian_day - 2440588, milliseconds=msecs)
+    return dt, offset
+
+
+def legacy_parse_header(data):
+    if len(data) < 12:
+        raise ValueError("Packet too short")
+    magic, schema, msg_type = struct.unpack('>III', data[0:12])
+    if magic != wsjtx_protocol.MAGIC:
+        raise ValueError("Invalid magic number")
+    wsjtx_id, offset = legacy_decode_qstring(data, 12)
+    return msg_type, wsjtx_id, offset
+
+
+def legacy_parse_status(data, offset):
+    dial_frequency = struct.unpack('>Q', data[offset:offset+8])[0]
+    offset += 8
+    mode, offset = legacy_decode_qstring(data, offset)
+    dx_call, offset = legacy_decode_qstring(data, offset)
+    report, offset = legacy_decode_qstring(data, offset)
+    tx_mode, offset = legacy_decode_qstring(data, offset)
+    tx_enabled = struct.unpack('>B', data[offset:offset+1])[0] != 0
+    offset += 1
+    transmitting = struct.unpack('>B', data[offset:offset+1])[0] != 0
+    offset += 1
+    decoding = struct.unpack('>B', data[offset:offset+1])[0] != 0
+    offset += 1
+    rx_df = struct.unpack('>I', data[offset:offset+4])[0]
+    offset += 4
+    tx_df = struct.unpack('>I', data[offset:offset+4])[0]
+    offset += 4
+    de_call, offset = legacy_decode_qstring(data, offset)
+    de_grid, offset = legacy_decode_qstring(data, offset)
+    dx_grid, offset = legacy_decode_qstring(data, offset)
+    tx_watchdog = struct.unpack('>B', data[offset:offset+1])[0] != 0
+    offset += 1
+    sub_mode, offset = legacy_decode_qstring(data, offset)
+    fast_mode = struct.unpack('>B', data[offset:offset+1])[0] != 0
+    offset += 1
+    special_operation_mode = struct.unpack('>B', data[offset:offset+1])[0]
+    offset += 1
+    frequency_tolerance = struct.unpack('>I', data[offset:offset+4])[0]
+    offset += 4
+    tr_period = struct.unpack('>I', data[offset:offset+4])[0]
+    offset += 4
+    configuration_name, offset = legacy_decode_qstring(data, offset)
+    tx_message, offset = legacy_decode_qstring(data, offset)
+    return {'dial_frequency': dial_frequency, 'mode': mode, 'dx_call': dx_call, 'report': report,
+            'tx_mode': tx_mode, 'tx_enabled': tx_enabled, 'transmitting': transmitting,
+            'decoding': decoding, 'rx_df': rx_df, 'tx_df': tx_df, 'de_call': de_call,
+            'de_grid': de_grid, 'dx_grid': dx_grid, 'tx_watchdog': tx_watchdog,
+            'sub_mode': sub_mode, 'fast_mode': fast_mode,
+            'special_operation_mode': special_operation_mode,
+            'frequency_tolerance': frequency_tolerance, 'tr_period': tr_period,
+            'configuration_name': configuration_name, 'tx_message': tx_message}
+
+
+def legacy_parse_decode(data, offset):
+    new = struct.unpack('>B', data[offset:offset+1])[0] != 0
+    offset += 1
+    msecs = struct.unpack('>I', data[offset:offset+4])[0]
+    offset += 4
+    snr = struct.unpack('>i', data[offset:offset+4])[0]
+    offset += 4
+    delta_time = struct.unpack('>d', data[offset:offset+8])[0]
+    offset += 8
+    delta_frequency = struct.unpack('>I', data[offset:offset+4])[0]
+    offset += 4
+    mode, offset = legacy_decode_qstring(data, offset)
+    message, offset = legacy_decode_qstring(data, offset)
+    low_confidence = struct.unpack('>B', data[offset:offset+1])[0] != 0
+    offset += 1
+    off_air = struct.unpack('>B', data[offset:offset+1])[0] != 0
+    offset += 1
+    seconds, ms = divmod(msecs, 1000)
+    return {'new': new, 'time': datetime.time(seconds // 3600, seconds // 60 % 60, seconds % 60, ms * 1000),
+            'snr': snr, 'delta_time': delta_time, 'delta_frequency': delta_frequency,
+            'mode': mode, 'message': message, 'low_confidence': low_confidence, 'off_air': off_air}
+
+
+def legacy_parse_qso_logged(data, offset):
+    datetime_off, offset = legacy_decode_qdatetime(data, offset)
+    dx_call, offset = legacy_decode_qstring(data, offset)
+    dx_grid, offset = legacy_decode_qstring(data, offset)
+    tx_freq = struct.unpack('>Q', data[offset:offset+8])[0]
+    offset += 8
+    mode, offset = legacy_decode_qstring(data, offset)
+    report_sent, offset = legacy_decode_qstring(data, offset)
+    report_rcvd, offset = legacy_decode_qstring(data, offset)
+    tx_power, offset = legacy_decode_qstring(data, offset)
+    comments, offset = legacy_decode_qstring(data, offset)
+    name, offset = legacy_decode_qstring(data, offset)
+    datetime_on, offset = legacy_decode_qdatetime(data, offset)
+    operator_call, offset = legacy_decode_qstring(data, offset)
+    my_call, offset = legacy_decode_qstring(data, offset)
+    my_grid, offset = legacy_decode_qstring(data, offset)
+    exchange_sent, offset = legacy_decode_qstring(data, offset)
+    exchange_rcvd, offset = legacy_decode_qstring(data, offset)
+    adif_prop_mode, offset = legacy_decode_qstring(data, offset)
+    return {'datetime_off': datetime_off, 'dx_call': dx_call, 'dx_grid': dx_grid,
+            'tx_frequency': tx_freq, 'mode': mode, 'report_sent': report_sent,
+            'report_received': report_rcvd, 'tx_power': tx_power, 'comments': comments,
+            'dx_name': name, 'datetime_on': datetime_on, 'operator_call': operator_call,
+            'my_call': my_call, 'my_grid': my_grid, 'exchange_sent': exchange_sent,
+            'exchange_received': exchange_rcvd, 'adif_propagation_mode': adif_prop_mode}
+
+
+LEGACY_PARSERS = {
+    wsjtx_protocol.MSG_STATUS: legacy_parse_status,
+    wsjtx_protocol.MSG_DECODE: legacy_parse_decode,
+    wsjtx_protocol.MSG_QSO_LOGGED: legacy_parse_qso_logged,
+}
+
+
+def legacy_parse(data):
+    msg_type, wsjtx_id, offset = legacy_parse_header(data)
+    parse = LEGACY_PARSERS.get(msg_type)
+    return msg_type, wsjtx_id, parse(data, offset) if parse else {}
+
+
+def legacy_encode_qstring(text):
+    if text is None or text == '':
+        return struct.pack('>I', 0xFFFFFFFF)
+    encoded = text.encode('utf-8')
+    return struct.pack('>I', len(encoded)) + encoded
+
+
+def legacy_location_change(wsjtx_id, grid_square):
+    message = struct.pack('>I', wsjtx_protocol.MAGIC)
+    message += struct.pack('>I', wsjtx_protocol.SCHEMA)
+    message += struct.pack('>I', wsjtx_protocol.MSG_LOCATION)
+    message += legacy_encode_qstring(wsjtx_id)
+    message += legacy_encode_qstring(grid_square)
+    return message
+
+
+# === Simulated broadcast storm ===
+
+CALLS = ['K5TR', 'W5LUA', 'N5ZY', 'K1JT', 'W9GA', 'KA5D', 'N0LL', 'K0GU', 'W5ZN', 'AA5AM',
+         'KF5LUB', 'WB5ABC', 'K2UYH', 'N2NT', 'VE3KH', 'W7GJ', 'K7ULS', 'WA5TKU']
+GRIDS = ['EM10', 'EM12', 'EM13', 'EM15', 'EM20', 'EL29', 'DM79', 'EN34', 'FN20', 'DM43']
+
+
+def build_storm(instances, decodes, cycles):
+    """Datagrams in arrival order for `cycles` 15-second periods"""
+    rng = random.Random(19)
+    now = datetime.datetime(2026, 6, 14, 18, 0, 0)
+    encode = wsjtx_protocol.encode_message
+    packets = []
+    for cycle in range(cycles):
+        period = now + datetime.timedelta(seconds=15 * cycle)
+        for n in range(instances):
+            wsjtx_id = f"WSJT-X - {['6m', '2m', '222', '432', '903', '1296', '2304', '3400'][n % 8]}"
+            packets.append(encode(wsjtx_protocol.MSG_HEARTBEAT, wsjtx_id,
+                                  {'max_schema': 3, 'version': '2.7.0', 'revision': 'a1b2c3'}))
+            packets.append(encode(wsjtx_protocol.MSG_STATUS, wsjtx_id, {
+                'dial_frequency': 144174000 + n * 1000, 'mode': 'FT8', 'dx_call': rng.choice(CALLS),
+                'report': '-12', 'tx_mode': 'FT8', 'tx_enabled': cycle % 2 == 0, 'transmitting': False,
+                'decoding': True, 'rx_df': 1500, 'tx_df': 1200, 'de_call': 'N5ZY', 'de_grid': 'EM15',
+                'dx_grid': rng.choice(GRIDS), 'tx_watchdog': False, 'sub_mode': '', 'fast_mode': False,
+                'special_operation_mode': 0, 'frequency_tolerance': 0xFFFFFFFF, 'tr_period': 0xFFFFFFFF,
+                'configuration_name': 'Default', 'tx_message': ''}))
+            for _ in range(decodes):
+                call = rng.choice(CALLS)
+                packets.append(encode(wsjtx_protocol.MSG_DECODE, wsjtx_id, {
+                    'new': True, 'time': period.time(), 'snr': rng.randint(-24, 10),
+                    'delta_time': round(rng.uniform(-1.5, 1.5), 1), 'delta_frequency': rng.randint(200, 2800),
+                    'mode': '~', 'message': f"CQ {call} {rng.choice(GRIDS)}",
+                    'low_confidence': False, 'off_air': False}))
+            if rng.random() < 0.05:
+                packets.append(encode(wsjtx_protocol.MSG_QSO_LOGGED, wsjtx_id, {
+                    'datetime_off': period, 'dx_call': rng.choice(CALLS), 'dx_grid': rng.choice(GRIDS),
+                    'tx_frequency': 144174000, 'mode': 'FT8', 'report_sent': '-10', 'report_received': '-08',
+                    'tx_power': '100', 'comments': '', 'dx_name': '', 'datetime_on': period - datetime.timedelta(minutes=1),
+                    'operator_call': '', 'my_call': 'N5ZY', 'my_grid': 'EM15', 'exchange_sent': '',
+                    'exchange_received': '', 'adif_propagation_mode': ''}))
+    return packets
+
+
+def best_of(func, repeat=7):
+    """Best wall time of several runs, plus the last result"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def report(label, old, new, count):
+    print(f"  {label:<32} old {old * 1e9 / count:7.0f} ns   new {new * 1e9 / count:7.0f} ns   "
+          f"({old / new:.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark WSJT-X message parsing under a broadcast storm")
+    parser.add_argument('--instances', type=int, default=6)
+    parser.add_argument('--decodes', type=int, default=40, help="Decodes per instance per period")
+    parser.add_argument('--cycles', type=int, default=100)
+    args = parser.parse_args()
+    
+    packets = build_storm(args.instances, args.decodes, args.cycles)
+    print(f"{len(packets)} datagrams from {args.instances} instances over {args.cycles} periods\n")
+    
+    def parse_new():
+        return [wsjtx_protocol.decode_message(p) for p in packets]
+    
+    old, old_msgs = best_of(lambda: [legacy_parse_header(p) for p in packets])
+    new, _ = best_of(lambda: [wsjtx_protocol.decode_header(p) for p in packets])
+    report("header only", old, new, len(packets))
+    
+    old, old_msgs = best_of(lambda: [legacy_parse(p) for p in packets])
+    new, new_msgs = best_of(parse_new)
+    report("full message", old, new, len(packets))
+    
+    for msg_type in LEGACY_PARSERS:
+        subset = [p for p in packets if wsjtx_protocol.decode_header(p)[0] == msg_type]
+        if not subset:
+            continue
+        subset = subset * max(1, 5000 // len(subset))  # Enough work to time the rare types
+        old_t, _ = best_of(lambda: [legacy_parse(p) for p in subset])
+        new_t, _ = best_of(lambda: [wsjtx_protocol.decode_message(p) for p in subset])
+        report(f"  {wsjtx_protocol.MESSAGE_FIELDS[msg_type][0]} ({len(subset)})", old_t, new_t, len(subset))
+    
+    ids = [f"WSJT-X - {band}" for band in ('6m', '2m', '222', '432', '903', '1296')]
+    grids = [f"EM{n:02d}ab" for n in range(100)]
+    pairs = [(i, g) for g in grids for i in ids] * 20
+    old_b, old_built = best_of(lambda: [legacy_location_change(i, g) for i, g in pairs])
+    new_b, new_built = best_of(lambda: [wsjtx_protocol.encode_message(wsjtx_protocol.MSG_LOCATION, i,
+                                                                     {'location': g}) for i, g in pairs])
+    report("LocationChange build", old_b, new_b, len(pairs))
+    
+    print()
+    mismatched = 0
+    for (msg_type, wsjtx_id, fields), message in zip(old_msgs, new_msgs):
+        if msg_type != message['type'] or wsjtx_id != message['id']:
+            mismatched += 1
+        elif any(message[key] != value for key, value in fields.items()):
+            mismatched += 1
+    mismatched += sum(a != b for a, b in zip(old_built, new_built))
+    print(f"Mismatches: {mismatched}")
+
+
+if __name__ == '__main__':
+    main()
@@ -8,11 +8,13 @@ import tkinter as tk
 from tkinter import ttk, messagebox, filedialog, simpledialog
 import json
 import os
+import threading
 from pathlib import Path
 import serial.tools.list_ports  # For COM port discovery
 
 # Import our modules (will create these next)
 from modules.gps_monitor import GPSMonitor
+from modules.maidenhead import grid_to_latlon, distance_miles, bearing_deg, GridPathCache
 from modules.battery_monitor import BatteryMonitor
 from modules.radio_updater import RadioUpdater
 from modules.log_monitor import LogMonitor
@@ -27,7 +29,14 @@ from modules.qsoparty_parser import (
     get_county_list_for_display,
     get_canonical_county
 )
-from modules.county_lookup import CountyLookupService
+from modules.county_lookup import CountyLookupService, region_around
+from modules.county_mappings import CountyMappingRegistry
+from modules.station_index import StationSearchIndex
+from modules.virtual_table import VirtualTable, TableRow
+from modules.adif import AdifWriter, parse_adif_datetime, read_adif_file
+from modules.session_journal import SessionJournal
+from modules.relay_journal import RelayJournal
+from modules.wsjtx_protocol import parse_standard_message
 
 # Contest mode constants
 CONTEST_MODES = {
@@ -41,6 +50,21 @@ HF_BANDS = ['160m', '80m', '60m', '40m', '30m', '20m', '17m', '15m', '12m', '10m
 VHF_BANDS = ['6m', '2m', '1.25m', '70cm', '33cm', '23cm', '13cm', '9cm', '5cm', '3cm']
 ALL_BANDS = HF_BANDS + VHF_BANDS
 
+# Max time a WSJT-X listener thread waits for the county index when stamping a QSO
+COUNTY_STAMP_WAIT_SECS = 5.0
+
+# Partial county load without a QSO party state: degrees around the first GPS fix
+COUNTY_REGION_RADIUS_DEG = 2.0
+
+# County lookups are skipped until the rover could have reached the county line;
+# this much slack covers GPS jitter
+COUNTY_LOOKUP_SLACK_MI = 0.05
+# QSO Party mode: voice alerts when approaching a county line (miles)
+COUNTY_APPROACH_ALERTS_MI = (2.0, 1.0, 0.25)
+
+# Re-stat data/county_mappings/*.json this often (ms) to pick up edits
+COUNTY_MAPPING_REFRESH_MS = 30000
+
 class CoPilotApp:
     VERSION = "1.8.31"
     
@@ -64,6 +88,7 @@ class CoPilotApp:
         self.voice = VoiceAlerter()
         self.qsy_advisor = QSYAdvisor()
         self.qsy_advisor.set_qsy_callback(self.on_qsy_opportunity)
+        self.qsy_path_cache = GridPathCache()  # Distance/bearing from current_grid, per station grid
         self.grid_boundary = GridBoundaryMonitor(self.on_boundary_announcement)
         
         # Current state
@@ -81,23 +106,51 @@ class CoPilotApp:
         self.qso_parties = {}
         self._load_qsoparty_data()
         
+        # FIPS -> QSO Party abbreviation maps, read once and re-read only when edited
+        self.county_mappings = CountyMappingRegistry()
+        
         # County lookup service (for QSO Party mode auto-detection)
+        # Loads on a background thread; GPS fixes seen meanwhile are deferred
         self.county_lookup = None
+        self._pending_county_fix = None  # Latest (lat, lon) received while loading
+        self._county_load_deferred = False  # Partial load waiting for the first GPS fix
+        self._last_county_check = None  # (fips, mode, auto-detect, party, county) last handled
+        self._county_anchor = None  # (lat, lon, miles to county line) at the last lookup
+        self._county_alerts_given = set()  # Approach distances already announced in this county
         self._load_county_shapefile()
         
         # Ignore list for "calling me" alerts: {callsign: expire_timestamp}
         self.ignored_stations = {}
         self.ignore_duration_minutes = 30
         
+        # WSJT-X UDP decodes: grids worked / already announced per band, "calling me" debounce
+        self._worked_grids = set()           # (band, 4-char grid) from logged QSOs
+        self._decode_grids_alerted = set()   # (band, 4-char grid) announced as new
+        self._calling_me_alerted = {}        # (callsign, band) -> time of last alert
+        self._wsjt_transmitting = set()      # Listen ports whose WSJT-X is transmitting
+        
         # Shared PSK enabled variable (used by both Settings and PSK Monitor tabs)
         self.psk_enabled_var = tk.BooleanVar(value=self.config.get('psk_enabled', False))
         
         self.create_gui()
+        
+        # Daily ADIF log, shared by every RadioUpdater, Manual Entry and Grid Corner
+        self.adif_writer = AdifWriter(os.path.join(os.path.dirname(__file__), 'logs'))
+        
+        # QSOs waiting for the contest logger - relayed on the next start if Co-Pilot closes first
+        self.relay_journal = RelayJournal(os.path.join(os.path.dirname(__file__), 'logs', 'relay_queue.jsonl'))
+        
+        # Session journal (QSOs of this contest session, restored after a restart)
+        self.session_journal = None
+        self._open_session_journal()
+        
         self.start_monitoring()
         
         # Start PSK monitor if enabled in config
         if self.config.get('psk_enabled', False):
             self.root.after(2000, self._start_psk_monitor)  # Delay to let GPS initialize
+        
+        self.root.after(COUNTY_MAPPING_REFRESH_MS, self._refresh_county_mappings)
     
     def load_config(self):
         """Load configuration from JSON file"""
@@ -120,6 +173,10 @@ class CoPilotApp:
                 'qsoparty_file': get_default_qsoparty_path(),  # N1MM+ QSOParty.sec file
                 'county_shapefile': 'data/us_counties_10m.shp',  # US county boundaries shapefile
                 'county_auto_detect': True,  # Auto-detect county from GPS in QSO Party mode
+                'county_partial_load': False,  # Load only the QSO party state / area around GPS
+                'county_grid_index': False,  # Precomputed cell table for faster full-map lookups
+                'session_journal': True,  # Restore the QSO Log / QSY tracking from logs/session.db at startup
+                'wsjtx_udp_decodes': True,  # New grid / calling me alerts from WSJT-X UDP decodes (not log files)
                 'wsjt_instances': [
                     {'name': 'IC-7610 (6m/HF)', 'log_path': '', 'udp_port': 2237},
                     {'name': 'IC-9700 (2m/70cm/23cm/10G)', 'log_path': '', 'udp_port': 2238},
@@ -131,6 +188,7 @@ class CoPilotApp:
                 'n1mm_udp_port': 52001,  # N1MM+ JTDX TCP port (Config → Configure Ports → WSJT/JTDX Setup)
                 'n3fjp_host': '127.0.0.1',
                 'n3fjp_port': 1100,  # N3FJP default API port
+                'logger_keep_alive': True,  # Keep the N1MM+/N3FJP TCP connection open (False = connect per QSO)
                 'active_bands': ['50', '144', '222', '432', '902', '1296', '10368'],
                 # APRS-IS settings
                 'aprs_enabled': False,
@@ -151,7 +209,7 @@ class CoPilotApp:
             print(f"Loaded {len(self.qso_parties)} QSO parties")
     
     def _load_county_shapefile(self):
-        """Load county boundaries shapefile for QSO Party auto-detection"""
+        """Start loading county boundaries for QSO Party auto-detection (background thread)"""
         shapefile_path = self.config.get('county_shapefile', 'data/us_counties_10m.shp')
         
         print(f"County Lookup: Looking for shapefile at: {shapefile_path}")
@@ -166,81 +224,114 @@ class CoPilotApp:
         try:
             from modules.county_lookup import CountyLookupService
             self.county_lookup = CountyLookupService()
-            self.county_lookup.load_shapefile(shapefile_path)
-            print(f"  SUCCESS: Loaded {self.county_lookup.county_count} counties")
-            
-            # Test lookup with Oklahoma City coordinates
-            test_info = self.county_lookup.lookup(35.4676, -97.5164)
-            if test_info:
-                print(f"  Test lookup (OKC): {test_info.name}, {test_info.state_abbrev} ✓")
-            else:
-                print(f"  Test lookup (OKC): FAILED - no result")
-                
         except ImportError as e:
             print(f"  ERROR: Missing dependency - {e}")
             print("  Run: pip install pyshp shapely")
             self.county_lookup = None
-        except Exception as e:
-            print(f"  ERROR: {e}")
-            import traceback
-            traceback.print_exc()
-            self.county_lookup = None
+            return
+        
+        if self.config.get('county_partial_load', False):
+            # QSO Party rover: only the party's state; otherwise wait for the
+            # first GPS fix and load the area around it. Either grows on demand.
+            state = self._qso_party_state()
+            if self.config.get('contest_mode') == 'qso_party' and state:
+                print(f"  Partial load: {state} counties only")
+                self._start_county_load(shapefile_path, states=[state])
+            else:
+                print("  Partial load: waiting for GPS fix")
+                self._county_load_deferred = True
+            return
+        
+        self._start_county_load(shapefile_path,
+                                use_grid=self.config.get('county_grid_index', False))
     
-    def _grid_to_latlon(self, grid):
-        """Convert Maidenhead grid to lat/lon (center of grid)"""
-        if not grid or len(grid) < 4:
-            return None, None
+    def _start_county_load(self, shapefile_path=None, **load_kwargs):
+        """Load the county index on a background thread (load_kwargs: states, bbox, use_grid)"""
+        if shapefile_path is None:
+            shapefile_path = self.config.get('county_shapefile', 'data/us_counties_10m.shp')
+        
+        # GUI and GPS start right away; lookups are deferred until the index is ready
+        self.county_lookup.load_in_background(
+            shapefile_path,
+            progress_callback=lambda pct: self.root.after(0, self._on_county_load_progress, pct),
+            done_callback=lambda err: self.root.after(0, self._on_county_load_done, err),
+            **load_kwargs
+        )
+    
+    def _qso_party_state(self):
+        """State abbreviation for the configured QSO party (e.g. 'OK'), or ''"""
+        party_code = self.config.get('qso_party_code', '').upper()
+        party_data = self.qso_parties.get(party_code, {})
+        state = party_data.get('state', '') or party_code
+        return state if len(state) == 2 else ''
+    
+    def _on_county_load_progress(self, percent):
+        """Show county index load progress in the status bar (Tk thread)"""
+        if percent < 100 and hasattr(self, 'status_text'):
+            self.update_status(f"Loading county boundaries... {percent}%")
+    
+    def _on_county_load_done(self, error):
+        """Called on the Tk thread when the background county load finishes"""
+        if error is not None or not self.county_lookup:
+            print(f"  ERROR: {error}")
+            self.county_lookup = None
+            self._pending_county_fix = None
+            self._update_shapefile_status()
+            return
         
-        grid = grid.upper()
+        print(f"  SUCCESS: Loaded {self.county_lookup.county_count} counties")
         
-        try:
-            lon = (ord(grid[0]) - ord('A')) * 20 - 180
-            lat = (ord(grid[1]) - ord('A')) * 10 - 90
-            lon += int(grid[2]) * 2
-            lat += int(grid[3]) * 1
-            
-            if len(grid) >= 6:
-                lon += (ord(grid[4]) - ord('A')) * (2/24)
-                lat += (ord(grid[5]) - ord('A')) * (1/24)
-                lon += (2/24) / 2
-                lat += (1/24) / 2
+        # Test lookup with Oklahoma City coordinates (a partial load may not include it)
+        if not self.county_lookup.is_partial:
+            test_info = self.county_lookup.lookup(35.4676, -97.5164)
+            if test_info:
+                print(f"  Test lookup (OKC): {test_info.name}, {test_info.state_abbrev} ✓")
             else:
-                lon += 1
-                lat += 0.5
-            
-            return lat, lon
-        except:
-            return None, None
-    
-    def _haversine(self, lat1, lon1, lat2, lon2):
-        """Calculate distance in miles between two lat/lon points"""
-        import math
-        R = 3959  # Earth radius in miles
+                print(f"  Test lookup (OKC): FAILED - no result")
         
-        lat1_rad = math.radians(lat1)
-        lat2_rad = math.radians(lat2)
-        delta_lat = math.radians(lat2 - lat1)
-        delta_lon = math.radians(lon2 - lon1)
+        self._update_shapefile_status()
+        if hasattr(self, 'status_text'):
+            self.update_status("Running")
         
-        a = (math.sin(delta_lat/2)**2 + 
-             math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(delta_lon/2)**2)
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
+        # Resolve the most recent fix that arrived while we were loading
+        pending = self._pending_county_fix
+        self._pending_county_fix = None
+        if pending:
+            self._check_county_change(*pending)
+    
+    def _update_shapefile_status(self):
+        """Refresh the county shapefile status label on the Settings tab"""
+        if not hasattr(self, 'shapefile_status_label'):
+            return
         
-        return R * c
+        shapefile_path = self.config.get('county_shapefile', 'data/us_counties_10m.shp')
+        if self.county_lookup and self.county_lookup.is_loaded:
+            shapefile_status = f"✓ {self.county_lookup.county_count} counties loaded"
+            if self.county_lookup.is_partial:
+                shapefile_status += " (partial - grows as you drive)"
+            status_color = "green"
+        elif self.county_lookup and self._county_load_deferred:
+            shapefile_status = "… Waiting for GPS fix to load nearby counties"
+            status_color = "orange"
+        elif self.county_lookup:
+            shapefile_status = f"… Loading county boundaries from {shapefile_path}"
+            status_color = "orange"
+        else:
+            shapefile_status = f"✗ Shapefile not found: {shapefile_path}"
+            status_color = "red"
+        self.shapefile_status_label.config(text=shapefile_status, foreground=status_color)
+    
+    def _grid_to_latlon(self, grid):
+        """Convert Maidenhead grid to lat/lon (center of grid)"""
+        return grid_to_latlon(grid)
+    
+    def _haversine(self, lat1, lon1, lat2, lon2):
+        """Calculate distance in miles between two lat/lon points"""
+        return distance_miles(lat1, lon1, lat2, lon2)
     
     def _bearing(self, lat1, lon1, lat2, lon2):
         """Calculate bearing in degrees from point 1 to point 2"""
-        import math
-        lat1_rad = math.radians(lat1)
-        lat2_rad = math.radians(lat2)
-        delta_lon = math.radians(lon2 - lon1)
-        
-        x = math.sin(delta_lon) * math.cos(lat2_rad)
-        y = (math.cos(lat1_rad) * math.sin(lat2_rad) - 
-             math.sin(lat1_rad) * math.cos(lat2_rad) * math.cos(delta_lon))
-        
-        bearing = math.degrees(math.atan2(x, y))
-        return (bearing + 360) % 360
+        return bearing_deg(lat1, lon1, lat2, lon2)
     
     def _bearing_to_compass(self, bearing):
         """Convert bearing degrees to compass direction"""
@@ -287,6 +378,7 @@ class CoPilotApp:
         
         # Create status labels for each configured instance (use custom names)
         self.wsjt_status_labels = {}
+        self.wsjt_status_names = {}  # Label text per port (band is appended from Status messages)
         self.wsjt_last_seen = {}  # Track last heartbeat time per instance
         
         for instance in self.config.get('wsjt_instances', []):
@@ -313,6 +405,7 @@ class CoPilotApp:
             
             port = instance.get('udp_port', 2237)
             self.wsjt_status_labels[port] = lbl
+            self.wsjt_status_names[port] = short
             self.wsjt_last_seen[port] = 0  # Never seen
         
         # If no instances configured, show placeholder
@@ -567,16 +660,18 @@ class CoPilotApp:
                                          command=self._on_county_auto_detect_change)
         auto_detect_cb.grid(row=4, column=0, columnspan=2, sticky=tk.W, pady=(5, 2))
         
-        # Status of county shapefile
-        shapefile_path = self.config.get('county_shapefile', 'data/us_counties_10m.shp')
-        if self.county_lookup and self.county_lookup.is_loaded:
-            shapefile_status = f"✓ {self.county_lookup.county_count} counties loaded"
-            status_color = "green"
-        else:
-            shapefile_status = f"✗ Shapefile not found: {shapefile_path}"
-            status_color = "red"
-        ttk.Label(self.qso_party_frame, text=shapefile_status, 
-                 foreground=status_color).grid(row=5, column=0, columnspan=3, sticky=tk.W, pady=2)
+        # Status of county shapefile (updated again when the background load finishes)
+        self.shapefile_status_label = ttk.Label(self.qso_party_frame)
+        self.shapefile_status_label.grid(row=5, column=0, columnspan=3, sticky=tk.W, pady=2)
+        self._update_shapefile_status()
+        
+        # Partial county loading (takes effect on next start)
+        self.county_partial_load_var = tk.BooleanVar(value=self.config.get('county_partial_load', False))
+        partial_load_cb = ttk.Checkbutton(self.qso_party_frame,
+                                          text="Load only this state's counties (faster startup, needs restart)",
+                                          variable=self.county_partial_load_var,
+                                          command=self._on_county_partial_load_change)
+        partial_load_cb.grid(row=6, column=0, columnspan=3, sticky=tk.W, pady=(2, 2))
         
         # Initialize county list for current QSO party
         self._update_county_list()
@@ -1207,6 +1302,11 @@ class CoPilotApp:
         ttk.Button(button_frame, text="Clear All", width=18,
                    command=self.clear_qso_display).pack(pady=2)
         
+        # QSOs the contest logger never took (relay dead-letter list)
+        self.relay_retry_button = ttk.Button(button_frame, text="Retry Relays (0)", width=18,
+                                             command=self.retry_failed_relays, state=tk.DISABLED)
+        self.relay_retry_button.pack(pady=2)
+        
         # Treeview for QSO log - optimized for rover use (MyGrid more important than RST)
         columns = ('time', 'call', 'grid', 'band', 'mode', 'my_grid', 'source')
         self.qso_tree = ttk.Treeview(frame, columns=columns, show='headings', height=15)
@@ -1229,9 +1329,9 @@ class CoPilotApp:
         self.qso_tree.column('my_grid', width=70)
         self.qso_tree.column('source', width=100)
         
-        # Scrollbar
-        scrollbar = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=self.qso_tree.yview)
-        self.qso_tree.configure(yscrollcommand=scrollbar.set)
+        # Scrollbar (driven by the virtual table - only visible rows exist in the tree)
+        scrollbar = ttk.Scrollbar(frame, orient=tk.VERTICAL)
+        self.qso_table = VirtualTable(self.qso_tree, scrollbar)
         
         # Pack treeview and scrollbar (fills remaining space)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y, pady=5)
@@ -1253,7 +1353,7 @@ class CoPilotApp:
             time_str = qso_data['datetime_off'].strftime('%H:%M:%S') if qso_data['datetime_off'] else ''
             source = qso_data.get('wsjtx_id', 'Unknown')
             
-            self.qso_tree.insert('', 0, values=(
+            values = (
                 time_str,
                 qso_data['dx_call'],
                 qso_data.get('dx_grid', ''),
@@ -1261,7 +1361,20 @@ class CoPilotApp:
                 qso_data['mode'],
                 self.current_grid or "",  # My Grid
                 source                     # Source (WSJT-X instance or "Manual")
-            ))
+            )
+            
+            # Journal first so a crash right after logging still restores it
+            entry_id = None
+            if self.session_journal:
+                try:
+                    entry_id = self.session_journal.record(
+                        qso_data['dx_call'], qso_data['band'], qso_data['mode'],
+                        qso_data.get('dx_grid', '') or '', self.current_grid or '', values)
+                except Exception as e:
+                    print(f"Session Journal: Error recording QSO: {e}")
+            
+            self.qso_table.insert(TableRow(values, data=entry_id), index=0)
+            self._add_worked_grid(qso_data['band'], qso_data.get('dx_grid'))
             
             # Add alert
             self.add_alert(f"QSO: {qso_data['dx_call']} on {qso_data['band']} via {source}")
@@ -1279,9 +1392,8 @@ class CoPilotApp:
                 )
             
             # Update status
-            import datetime
-            today = datetime.datetime.now().strftime('%Y%m%d')
-            self.qso_status_var.set(f"Last QSO: {qso_data['dx_call']} - ADIF: logs/n5zy_copilot_{today}.adi")
+            adif_name = os.path.basename(self.adif_writer.current_path)
+            self.qso_status_var.set(f"Last QSO: {qso_data['dx_call']} - ADIF: logs/{adif_name}")
             
         except Exception as e:
             print(f"Error updating QSO display: {e}")
@@ -1361,9 +1473,8 @@ class CoPilotApp:
         self.psk_alert_tree.tag_configure('p4', foreground='green')
         self.psk_alert_tree.tag_configure('info', foreground='gray')
         
-        psk_scrollbar = ttk.Scrollbar(alerts_frame, orient=tk.VERTICAL, 
-                                      command=self.psk_alert_tree.yview)
-        self.psk_alert_tree.configure(yscrollcommand=psk_scrollbar.set)
+        psk_scrollbar = ttk.Scrollbar(alerts_frame, orient=tk.VERTICAL)
+        self.psk_alert_table = VirtualTable(self.psk_alert_tree, psk_scrollbar)
         
         self.psk_alert_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         psk_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
@@ -1503,7 +1614,7 @@ class CoPilotApp:
                 'line_of_sight': 'LOS',
             }.get(prop_mode, prop_mode)
             
-            self.psk_alert_tree.insert('', 0, values=(
+            self.psk_alert_table.insert(TableRow((
                 time_str,
                 pri_text,
                 band,
@@ -1513,16 +1624,13 @@ class CoPilotApp:
                 spot_data.get('bearing', ''),
                 prop_display,
                 spot_data.get('mode', 'FT8')
-            ), tags=(row_tag,))
+            ), tags=(row_tag,)), index=0)
             
             # Update band activity display
             self._update_psk_band_activity()
             
             # Trim old entries
-            children = self.psk_alert_tree.get_children()
-            if len(children) > 50:
-                for child in children[50:]:
-                    self.psk_alert_tree.delete(child)
+            self.psk_alert_table.truncate(50)
                     
         except Exception as e:
             print(f"Error adding PSK spot to tree: {e}")
@@ -1540,19 +1648,17 @@ class CoPilotApp:
     
     def _clear_psk_alerts(self):
         """Clear PSK alert display"""
-        for item in self.psk_alert_tree.get_children():
-            self.psk_alert_tree.delete(item)
+        self.psk_alert_table.clear()
     
     def _psk_open_pskreporter(self, event):
         """Open PSK Reporter map for selected spot"""
         import webbrowser
         
-        selection = self.psk_alert_tree.selection()
+        selection = self.psk_alert_table.selected_rows()
         if not selection:
             return
         
-        item = selection[0]
-        values = self.psk_alert_tree.item(item, 'values')
+        values = selection[0].values
         # columns: time, pri, band, nearby, far, dist, dir, prop, mode
         if len(values) >= 5:
             far_call = values[4]  # The "far" callsign is who to look up
@@ -2294,9 +2400,9 @@ class CoPilotApp:
         self.qsy_tree.column('dir', width=40)
         self.qsy_tree.column('last_seen', width=80)
         
-        # Scrollbar
-        scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.qsy_tree.yview)
-        self.qsy_tree.configure(yscrollcommand=scrollbar.set)
+        # Scrollbar (driven by the virtual table - only visible rows exist in the tree)
+        scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL)
+        self.qsy_table = VirtualTable(self.qsy_tree, scrollbar, on_select=self.on_qsy_station_select)
         
         self.qsy_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
@@ -2309,13 +2415,17 @@ class CoPilotApp:
         ttk.Label(detail_frame, textvariable=self.qsy_detail_var, 
                   font=('Courier', 10)).pack(fill=tk.X)
         
-        # Bind selection and double-click
-        self.qsy_tree.bind('<<TreeviewSelect>>', self.on_qsy_station_select)
+        # Double-click (selection is reported by the virtual table)
         self.qsy_tree.bind('<Double-1>', self._qsy_open_qrz)
         
-        # Track sort state
+        # Search index over the station database
+        self.qsy_index = None
+        
+        # Track sort state (applied to every refresh of the table)
         self.qsy_sort_column = 'call'
         self.qsy_sort_reverse = False
+        self._qsy_heading_text = {col: self.qsy_tree.heading(col, 'text') for col in columns}
+        self._apply_qsy_sort()
         
         # Initial load
         self.root.after(500, self.refresh_qsy_database)
@@ -2330,6 +2440,9 @@ class CoPilotApp:
         # Update database date display
         self._update_qsy_db_date()
         
+        # Station details may have changed in place - rebuild the search index
+        self.qsy_index = None
+        
         # Just apply filters which will re-populate with all data
         self.filter_qsy_stations()
     
@@ -2362,77 +2475,43 @@ class CoPilotApp:
         except:
             min_bands = 1
         
-        # Clear current display
-        for item in self.qsy_tree.get_children():
-            self.qsy_tree.delete(item)
-        
         stations = self.qsy_advisor.stations
         
-        # Get my position for distance calculation
-        my_lat, my_lon = None, None
-        if self.current_grid and self.current_grid != "----":
-            my_lat, my_lon = self._grid_to_latlon(self.current_grid)
-        
-        # Band names - wavelength order (longest to shortest)
-        band_names = {
-            '50': '6m', '144': '2m', '222': '1.25m', '432': '70cm',
-            '902': '33cm', '1296': '23cm', '2304': '13cm', '3456': '9cm',
-            '5760': '5cm', '10368': '3cm', '10G': '3cm',
-            '24G': '1.2cm', '47G': '6mm', '78G': '4mm'
-        }
+        # (Re)build the search index when the database changed size or was refreshed
+        if self.qsy_index is None or self.qsy_index.source_size != len(stations):
+            self.qsy_index = StationSearchIndex(stations)
         
-        # Sort order for bands (by wavelength, longest first)
-        band_order = ['50', '144', '222', '432', '902', '1296', '2304', '3456', '5760', '10368', '10G', '24G', '47G', '78G']
+        # Distances are measured from my current grid (cache resets when it changes)
+        have_position = bool(self.current_grid and self.current_grid != "----")
+        if have_position:
+            self.qsy_path_cache.set_origin(self.current_grid)
         
-        def sort_bands(bands):
-            """Sort bands by wavelength order"""
-            return sorted(bands, key=lambda b: band_order.index(b) if b in band_order else 99)
+        matches = self.qsy_index.search(search_call, search_grid, min_bands)
         
-        filtered_count = 0
-        for call, info in stations.items():
-            bands = info.get('bands', [])
-            grids = info.get('grids', [])
-            last_seen = info.get('last_seen', '')
-            
-            # Apply filters
-            if search_call and search_call not in call:
-                continue
-            if search_grid and not any(search_grid in g for g in grids):
-                continue
-            if len(bands) < min_bands:
-                continue
-            
-            # Sort bands by wavelength and convert to names
-            sorted_bands = sort_bands(bands)
-            band_str = ', '.join([band_names.get(b, b) for b in sorted_bands])
-            grid_str = ', '.join(sorted(grids)) if grids else ''
+        # Build rows only for matches; the table draws just the visible ones
+        rows = []
+        for call in matches:
+            entry = self.qsy_index.entries[call]
             
             # Calculate distance and direction to first grid
             dist_str = '--'
             dir_str = '--'
-            if my_lat and my_lon and grids:
-                # grids is a set, convert to list to access first element
-                first_grid = list(grids)[0] if grids else None
-                if first_grid:
-                    their_lat, their_lon = self._grid_to_latlon(first_grid)
-                    if their_lat and their_lon:
-                        dist = self._haversine(my_lat, my_lon, their_lat, their_lon)
-                        bearing = self._bearing(my_lat, my_lon, their_lat, their_lon)
-                        dist_str = str(int(dist))
-                        dir_str = self._bearing_to_compass(bearing)
+            dist = bearing = float('inf')  # Unknown sorts last
+            if have_position and entry.first_grid:
+                path = self.qsy_path_cache.path_to(entry.first_grid)
+                if path:
+                    dist, bearing = path
+                    dist_str = str(int(dist))
+                    dir_str = self._bearing_to_compass(bearing)
             
-            self.qsy_tree.insert('', 'end', values=(
-                call,
-                band_str,
-                grid_str,
-                len(bands),
-                dist_str,
-                dir_str,
-                last_seen
-            ))
-            filtered_count += 1
-        
-        self.qsy_stats_var.set(f"Stations: {filtered_count} / {len(stations)}")
+            # data holds typed sort keys in column order (see sort_qsy_column)
+            rows.append(TableRow((call, entry.band_str, entry.grid_str, entry.band_count,
+                                  dist_str, dir_str, entry.last_seen), key=call,
+                                 data=(call, entry.band_str, entry.grid_str, entry.band_count,
+                                       dist, bearing, entry.last_seen)))
+        
+        self.qsy_table.set_rows(rows)  # Current column sort stays applied
+        self.qsy_stats_var.set(f"Stations: {len(matches)} / {len(stations)}")
     
     def sort_qsy_column(self, col):
         """Sort QSY database by column"""
@@ -2443,33 +2522,29 @@ class CoPilotApp:
             self.qsy_sort_column = col
             self.qsy_sort_reverse = False
         
-        # Get all items
-        items = [(self.qsy_tree.set(item, col), item) for item in self.qsy_tree.get_children('')]
-        
-        # Sort - handle numeric columns
-        if col in ['band_count', 'dist']:
-            # Numeric sort - treat '--' as infinity
-            def num_key(x):
-                try:
-                    return int(x[0])
-                except:
-                    return 999999
-            items.sort(key=num_key, reverse=self.qsy_sort_reverse)
-        else:
-            items.sort(key=lambda x: x[0], reverse=self.qsy_sort_reverse)
-        
-        # Rearrange items
-        for index, (val, item) in enumerate(items):
-            self.qsy_tree.move(item, '', index)
+        self._apply_qsy_sort()
+    
+    def _apply_qsy_sort(self):
+        """Sort the QSY table by the remembered column/direction and mark the header"""
+        col = self.qsy_sort_column
+        
+        # One bulk sort of the model on the typed keys each row carries
+        # (numbers for band count/distance/bearing, strings for the rest)
+        index = self.qsy_tree['columns'].index(col)
+        self.qsy_table.sort(lambda row: row.data[index], reverse=self.qsy_sort_reverse)
+        
+        for column, text in self._qsy_heading_text.items():
+            if column == col:
+                text += ' ▼' if self.qsy_sort_reverse else ' ▲'
+            self.qsy_tree.heading(column, text=text)
     
-    def on_qsy_station_select(self, event):
+    def on_qsy_station_select(self, event=None):
         """Show details for selected station"""
-        selection = self.qsy_tree.selection()
+        selection = self.qsy_table.selected_rows()
         if not selection:
             return
         
-        item = selection[0]
-        call = self.qsy_tree.item(item, 'values')[0]
+        call = selection[0].key
         
         if call in self.qsy_advisor.stations:
             info = self.qsy_advisor.stations[call]
@@ -2503,12 +2578,11 @@ class CoPilotApp:
         """Open QRZ page for selected station"""
         import webbrowser
         
-        selection = self.qsy_tree.selection()
+        selection = self.qsy_table.selected_rows()
         if not selection:
             return
         
-        item = selection[0]
-        call = self.qsy_tree.item(item, 'values')[0]
+        call = selection[0].key
         
         if call:
             url = f"https://www.qrz.com/db/{call}"
@@ -2782,9 +2856,8 @@ class CoPilotApp:
         Loads all ADIF files from the last 4 days to cover a full contest weekend.
         Tracks QSOs by (my_grid, band, their_call) to properly handle rover dupes.
         """
-        import re
         import glob
-        from datetime import datetime, timedelta
+        from datetime import datetime, timedelta, timezone
         
         log_dir = os.path.join(os.path.dirname(__file__), 'logs')
         
@@ -2793,12 +2866,15 @@ class CoPilotApp:
             self.voice.announce("No logs directory found")
             return
         
+        # Make sure QSOs still queued for the ADIF writer are in the files
+        self.adif_writer.flush(timeout=2.0)
+        
         # Find all ADIF files from the last 4 days (covers full contest weekend)
+        # Daily files roll over at UTC midnight
         adif_files = []
-        today = datetime.now()
+        today = datetime.now(timezone.utc)
         for days_ago in range(4):  # Today + 3 previous days
-            date_str = (today - timedelta(days=days_ago)).strftime('%Y%m%d')
-            adif_path = os.path.join(log_dir, f'n5zy_copilot_{date_str}.adi')
+            adif_path = self.adif_writer.path_for(today - timedelta(days=days_ago))
             if os.path.exists(adif_path):
                 adif_files.append(adif_path)
         
@@ -2820,35 +2896,23 @@ class CoPilotApp:
             
             qso_count = 0
             files_loaded = 0
+            rows = []
+            journal_qsos = []
             
             for adif_path in adif_files:
-                with open(adif_path, 'r') as f:
-                    content = f.read()
+                # Determine source from filename
+                source = os.path.basename(adif_path).replace('n5zy_copilot_', '').replace('.adi', '')
                 
-                # Parse ADIF records
-                records = re.split(r'<eor>|<EOR>', content, flags=re.IGNORECASE)
-                
-                for record in records:
-                    if not record.strip():
-                        continue
-                    
-                    # Extract fields
-                    call_match = re.search(r'<call:(\d+)>([^<]+)', record, re.IGNORECASE)
-                    band_match = re.search(r'<band:(\d+)>([^<]+)', record, re.IGNORECASE)
-                    mode_match = re.search(r'<mode:(\d+)>([^<]+)', record, re.IGNORECASE)
-                    gridsquare_match = re.search(r'<gridsquare:(\d+)>([^<]+)', record, re.IGNORECASE)
-                    my_grid_match = re.search(r'<my_gridsquare:(\d+)>([^<]+)', record, re.IGNORECASE)
-                    time_match = re.search(r'<time_on:(\d+)>([^<]+)', record, re.IGNORECASE)
-                    date_match = re.search(r'<qso_date:(\d+)>([^<]+)', record, re.IGNORECASE)
-                    
-                    if call_match:
-                        callsign = call_match.group(2).strip()
-                        band = band_match.group(2).strip() if band_match else "?"
-                        mode = mode_match.group(2).strip() if mode_match else "?"
-                        their_grid = gridsquare_match.group(2).strip() if gridsquare_match else ""
-                        my_grid = my_grid_match.group(2).strip() if my_grid_match else ""
-                        time_str = time_match.group(2).strip() if time_match else ""
-                        date_str = date_match.group(2).strip() if date_match else ""
+                # Stream records (one pass per file, fields tokenized once)
+                for record in read_adif_file(adif_path):
+                    callsign = record.get('call', '').strip()
+                    if callsign:
+                        band = record.get('band', '').strip() or "?"
+                        mode = record.get('mode', '').strip() or "?"
+                        their_grid = record.get('gridsquare', '').strip()
+                        my_grid = record.get('my_gridsquare', '').strip()
+                        time_str = record.get('time_on', '').strip()
+                        date_str = record.get('qso_date', '').strip()
                         
                         # Format time for display (include date for multi-day)
                         if len(time_str) >= 4:
@@ -2862,11 +2926,8 @@ class CoPilotApp:
                             if len(date_str) >= 8:
                                 time_display = f"{date_str[4:6]}-{date_str[6:8]} {time_display}"
                         
-                        # Determine source from filename
-                        source = os.path.basename(adif_path).replace('n5zy_copilot_', '').replace('.adi', '')
-                        
-                        # Add to display
-                        self.qso_tree.insert('', 'end', values=(
+                        # Add to display (shown in one go below)
+                        values = (
                             time_display,
                             callsign,
                             their_grid,
@@ -2874,7 +2935,16 @@ class CoPilotApp:
                             mode,
                             my_grid[:4] if my_grid else "",
                             f"ADIF:{source}"  # Source shows which log file
-                        ))
+                        )
+                        rows.append(TableRow(values))
+                        self._add_worked_grid(band, their_grid)
+                        # Journal age is the QSO's own time, so reloads never extend its life
+                        qso_time = parse_adif_datetime(date_str, time_str)
+                        journal_qsos.append({'call': callsign, 'band': band, 'mode': mode,
+                                             'grid': their_grid, 'my_grid': my_grid,
+                                             'values': values,
+                                             'logged_at': qso_time.replace(tzinfo=timezone.utc).timestamp()
+                                                          if qso_time else None})
                         
                         # Update QSY Advisor tracking (per-grid tracking)
                         if self.qsy_advisor and my_grid:
@@ -2890,7 +2960,13 @@ class CoPilotApp:
                 
                 files_loaded += 1
             
-            # Update count
+            # Rebuild the session journal from the ADIF files (the log of record)
+            if self.session_journal:
+                for row, entry_id in zip(rows, self.session_journal.replace(journal_qsos)):
+                    row.data = entry_id
+            
+            # Update display and count
+            self.qso_table.set_rows(rows)
             self.qso_count = qso_count
             self.qso_count_var.set(f"QSOs: {qso_count}")
             
@@ -2899,8 +2975,7 @@ class CoPilotApp:
                 self.qsy_advisor.set_my_grid(self.current_grid)
             
             # Scroll to bottom to show latest
-            if self.qso_tree.get_children():
-                self.qso_tree.see(self.qso_tree.get_children()[-1])
+            self.qso_table.see_end()
             
             self.add_alert(f"Reloaded {qso_count} QSOs from {files_loaded} log file(s)")
             self.voice.announce(f"Reloaded {qso_count} QSOs from {files_loaded} days")
@@ -2909,6 +2984,45 @@ class CoPilotApp:
             self.add_alert(f"Error reloading logs: {e}")
             self.voice.announce("Error reloading logs")
     
+    def _open_session_journal(self):
+        """Open logs/session.db and restore the QSO Log and QSY tracking from it"""
+        if not self.config.get('session_journal', True):
+            return
+        
+        log_dir = os.path.join(os.path.dirname(__file__), 'logs')
+        try:
+            os.makedirs(log_dir, exist_ok=True)
+            self.session_journal = SessionJournal(os.path.join(log_dir, 'session.db'))
+            entries = self.session_journal.entries()
+        except Exception as e:
+            print(f"Session Journal: Could not open: {e}")
+            self.session_journal = None
+            return
+        
+        if not entries:
+            return
+        
+        # Newest first, like QSOs logged live
+        rows = [TableRow(entry.values, data=entry.id) for entry in reversed(entries)]
+        for entry in entries:
+            self._add_worked_grid(entry.band, entry.grid)
+        self.qso_table.set_rows(rows)
+        self.qso_count = len(rows)
+        self.qso_count_var.set(f"QSOs: {self.qso_count}")
+        
+        # Same QSY Advisor tracking a log reload gives (per-grid, no alerts)
+        if self.qsy_advisor:
+            for entry in entries:
+                band_mhz = self._band_to_mhz(entry.band)
+                if entry.my_grid and band_mhz:
+                    self.qsy_advisor.log_qso(entry.call, band_mhz,
+                                             grid=entry.grid,
+                                             my_grid=entry.my_grid,
+                                             suppress_alert=True)
+        
+        print(f"Session Journal: Restored {len(entries)} QSOs")
+        self.add_alert(f"Restored {len(entries)} QSOs from session journal")
+    
     def _band_to_mhz(self, band_str):
         """Convert ADIF band string to MHz for QSY Advisor"""
         band_map = {
@@ -2934,15 +3048,18 @@ class CoPilotApp:
             if not result:
                 return
         
-        for item in self.qso_tree.get_children():
-            self.qso_tree.delete(item)
+        self.qso_table.clear()
+        if self.session_journal:
+            self.session_journal.clear()
+        self._worked_grids.clear()
+        self._decode_grids_alerted.clear()
         self.qso_count = 0
         self.qso_count_var.set("QSOs: 0")
         self.add_alert("QSO display cleared")
     
     def delete_selected_qso(self):
         """Delete selected QSO(s) from display"""
-        selected = self.qso_tree.selection()
+        selected = self.qso_table.selected_rows()
         if not selected:
             messagebox.showinfo("No Selection", "Please select a QSO to delete")
             return
@@ -2950,7 +3067,7 @@ class CoPilotApp:
         # Get info for confirmation
         count = len(selected)
         if count == 1:
-            values = self.qso_tree.item(selected[0])['values']
+            values = selected[0].values
             call = values[1] if len(values) > 1 else "?"
             msg = f"Delete QSO with {call} from display?\n\n(You'll need to manually remove from logger if needed)"
         else:
@@ -2960,9 +3077,10 @@ class CoPilotApp:
         if not result:
             return
         
-        for item in selected:
-            self.qso_tree.delete(item)
-            self.qso_count -= 1
+        self.qso_table.delete(selected)
+        if self.session_journal:
+            self.session_journal.forget(row.data for row in selected)
+        self.qso_count -= count
         
         self.qso_count_var.set(f"QSOs: {self.qso_count}")
         self.add_alert(f"Deleted {count} QSO(s) from display")
@@ -2998,12 +3116,19 @@ class CoPilotApp:
                 n3fjp_port=self.config.get('n3fjp_port', 1100),
                 contest_logger=self.config.get('contest_logger', 'n1mm'),
                 qso_callback=self.on_qso_logged,
-                location_stamper=self._stamp_qso_location
+                location_stamper=self._stamp_qso_location,
+                adif_writer=self.adif_writer,
+                relay_journal=self.relay_journal,
+                decode_callback=self.on_wsjtx_decode,
+                status_callback=self.on_wsjtx_status,
+                logger_keep_alive=self.config.get('logger_keep_alive', True),
+                relay_failed_callback=self.on_relay_failed
             )
             
-            # Start log monitoring
-            self.log_monitor = LogMonitor(self.config['wsjt_instances'], self.on_new_decode)
-            self.log_monitor.start()
+            # Start log monitoring (decodes come straight from UDP unless disabled)
+            if not self.config.get('wsjtx_udp_decodes', True):
+                self.log_monitor = LogMonitor(self.config['wsjt_instances'], self.on_new_decode)
+                self.log_monitor.start()
             
             # Start APRS if enabled
             if self.config.get('aprs_enabled', False):
@@ -3042,6 +3167,7 @@ class CoPilotApp:
             old_grid = self.current_grid
             self.current_grid = grid
             self.grid_label.config(text=grid)
+            self.qsy_path_cache.set_origin(grid)
             
             # Update QSY Advisor with new grid (tracks per-grid for rovers!)
             if self.qsy_advisor:
@@ -3076,15 +3202,52 @@ class CoPilotApp:
     
     def _check_county_change(self, lat, lon):
         """Check if we've crossed into a new county. Updates for ALL modes (ADIF stamping)."""
-        if not self.county_lookup or not self.county_lookup.is_loaded:
+        if not self.county_lookup:
             return
+        if not self.county_lookup.is_loaded:
+            # Index still loading - remember the latest fix, resolved once it's ready
+            self._pending_county_fix = (lat, lon)
+            if self._county_load_deferred:
+                # Partial load mode: first fix tells us which area to load
+                self._county_load_deferred = False
+                self._start_county_load(bbox=region_around(lat, lon, COUNTY_REGION_RADIUS_DEG))
+            return
+        
+        settings_key = (self.config.get('contest_mode'),
+                        self.config.get('county_auto_detect', True),
+                        self.config.get('qso_party_code', ''), self.current_county)
+        
+        # Skip the lookup entirely while we can't have reached the county line yet
+        # (or the next approach alert distance). Settings changes force a recheck.
+        if self._county_anchor and self._last_county_check and self._last_county_check[1:] == settings_key:
+            anchor_lat, anchor_lon, boundary_mi = self._county_anchor
+            moved_mi = self._haversine(anchor_lat, anchor_lon, lat, lon)
+            if boundary_mi - moved_mi > self._next_county_alert_mi() + COUNTY_LOOKUP_SLACK_MI:
+                return
+        
+        # Partial load: pull in neighbouring counties before we drive off the edge
+        if self.county_lookup.is_partial:
+            self.county_lookup.ensure_coverage(lat, lon)
         
-        # Look up county from GPS coordinates
-        county_info = self.county_lookup.lookup(lat, lon)
+        # Look up county from GPS coordinates (fast path while still in the same county)
+        fix = self.county_lookup.locate(lat, lon)
+        county_info = fix.county
         
         if not county_info:
+            self._county_anchor = None
             return
         
+        self._county_anchor = (lat, lon, fix.boundary_distance_mi)
+        if fix.changed:
+            self._county_alerts_given.clear()
+        self._check_county_approach(fix.boundary_distance_mi)
+        
+        # Same county and same QSO party settings as last time - nothing to update
+        check_key = (county_info.fips,) + settings_key
+        if not fix.changed and check_key == self._last_county_check:
+            return
+        self._last_county_check = check_key
+        
         # Store for ADIF stamping (works in ALL modes)
         self.current_county_info = county_info
         
@@ -3155,6 +3318,42 @@ class CoPilotApp:
             if hasattr(self, 'manual_mygrid_var'):
                 self.manual_mygrid_var.set(county_abbrev)
     
+    def _county_approach_alerts_active(self):
+        """County line alerts piggyback on the grid boundary alert setting (QSO Party only)"""
+        return (self.config.get('grid_boundary_alerts', False)
+                and self.config.get('contest_mode') == 'qso_party')
+    
+    def _next_county_alert_mi(self):
+        """Largest county-line alert distance not yet announced (0 if none)"""
+        if not self._county_approach_alerts_active():
+            return 0.0
+        pending = [d for d in COUNTY_APPROACH_ALERTS_MI if d not in self._county_alerts_given]
+        return max(pending, default=0.0)
+    
+    def _check_county_approach(self, boundary_mi):
+        """Announce when the rover gets close to the edge of the current county"""
+        if boundary_mi is None or not self._county_approach_alerts_active():
+            return
+        
+        # Hysteresis: wandering well back from the line re-arms the alerts
+        if boundary_mi > max(COUNTY_APPROACH_ALERTS_MI) * 1.5:
+            self._county_alerts_given.clear()
+            return
+        
+        crossed = [d for d in COUNTY_APPROACH_ALERTS_MI
+                   if boundary_mi <= d and d not in self._county_alerts_given]
+        if not crossed:
+            return
+        
+        # Announce only the closest threshold if several were passed at once
+        self._county_alerts_given.update(crossed)
+        closest = min(crossed)
+        distance_str = f"{closest:g} mile" if closest >= 1 else f"{closest * 1760:.0f} yards"
+        if closest > 1:
+            distance_str += "s"
+        self.voice.announce(f"County line in {distance_str}")
+        self.add_alert(f"Approaching county line ({boundary_mi:.2f} mi)")
+    
     def _fips_to_qsoparty_abbrev(self, fips, county_name, party_data):
         """Convert FIPS code or county name to QSO Party county abbreviation"""
         # Get state abbreviation - try party_data first, then derive from party code
@@ -3162,26 +3361,19 @@ class CoPilotApp:
         if not state_abbrev:
             state_abbrev = self.config.get('qso_party_code', '').upper()
         
-        # Try to load a FIPS mapping file (e.g., OK.json)
-        fips_map_path = Path(f"data/county_mappings/{state_abbrev}.json")
-        
-        if fips_map_path.exists():
-            try:
-                import json
-                with open(fips_map_path) as f:
-                    fips_map = json.load(f)
-                
-                if fips in fips_map:
-                    return fips_map[fips].get('code')
-                    
-                # Fallback: try name matching from JSON
-                for fips_code, entry in fips_map.items():
-                    if entry.get('name', '').upper() == county_name.upper():
-                        return entry.get('code')
-            except Exception as e:
-                print(f"County mapping error: {e}")
-        
-        return None
+        # In-memory lookup (e.g., OK.json) - no file I/O on the GPS path
+        return self.county_mappings.code_for(state_abbrev, fips, county_name)
+    
+    def _refresh_county_mappings(self):
+        """Pick up edited county mapping files (runs every COUNTY_MAPPING_REFRESH_MS)"""
+        if self.county_mappings.refresh():
+            self._last_county_check = None  # Re-map the current county on the next fix
+        self.root.after(COUNTY_MAPPING_REFRESH_MS, self._refresh_county_mappings)
+    
+    def _adif_county_name(self, county_info):
+        """County name for MY_CNTY - the mapping file spelling when the state has one"""
+        return self.county_mappings.name_for(county_info.state_abbrev, county_info.fips,
+                                             default=county_info.contest_name)
     
     def _stamp_qso_location(self, qso_data):
         """
@@ -3204,14 +3396,18 @@ class CoPilotApp:
             county_info = getattr(self, 'current_county_info', None)
             if county_info:
                 qso_data['my_state'] = county_info.state_abbrev
-                qso_data['my_county'] = county_info.contest_name
+                qso_data['my_county'] = self._adif_county_name(county_info)
             else:
-                # Fallback: try fresh lookup
+                # Fallback: try fresh lookup. If the county index is still loading,
+                # listener threads wait briefly for it; the Tk thread never blocks.
+                if self.county_lookup and not self.county_lookup.is_loaded:
+                    if threading.current_thread() is not threading.main_thread():
+                        self.county_lookup.wait_until_loaded(timeout=COUNTY_STAMP_WAIT_SECS)
                 if self.county_lookup and self.county_lookup.is_loaded:
                     county_info = self.county_lookup.lookup(lat, lon)
                     if county_info:
                         qso_data['my_state'] = county_info.state_abbrev
-                        qso_data['my_county'] = county_info.contest_name
+                        qso_data['my_county'] = self._adif_county_name(county_info)
         
         # Default US station values (can be overridden in config later)
         qso_data.setdefault('my_country', 'United States')
@@ -3327,8 +3523,8 @@ class CoPilotApp:
                             self.add_alert(f"WARNING: WSJT-X {short} lost connection!", priority=True)
                             break
             else:
-                # Connected
-                lbl.config(bg='green', fg='white')
+                # Connected (orange while transmitting)
+                lbl.config(bg='orange' if port in self._wsjt_transmitting else 'green', fg='white')
         
         # Schedule next check
         self.root.after(5000, self._check_wsjt_status)  # Check every 5 seconds
@@ -3637,12 +3833,20 @@ class CoPilotApp:
             self.add_alert("County auto-detection enabled")
             if self.county_lookup and self.county_lookup.is_loaded:
                 self.voice.announce("County auto detection enabled")
+            elif self.county_lookup:
+                self.add_alert("County boundaries still loading - auto-detect starts when ready")
             else:
                 self.add_alert("Warning: County shapefile not loaded - auto-detect won't work")
         else:
             self.add_alert("County auto-detection disabled")
             self.voice.announce("County auto detection disabled")
     
+    def _on_county_partial_load_change(self):
+        """Handle partial county load checkbox change (applies on next start)"""
+        self.config['county_partial_load'] = self.county_partial_load_var.get()
+        self.save_config()
+        self.add_alert("County loading mode saved - restart Co-Pilot to apply")
+    
     def _update_county_list(self):
         """Update county dropdown based on selected QSO party"""
         party_code = self.qso_party_code_var.get()
@@ -3675,6 +3879,11 @@ class CoPilotApp:
         party_data = self.qso_parties[party_code]
         canonical = get_canonical_county(party_data, county_input)
         
+        if not canonical:
+            # Typed a county name instead of the abbreviation?
+            state_abbrev = party_data.get('state', '') or party_code
+            canonical = self.county_mappings.code_for(state_abbrev, None, county_input)
+        
         if not canonical:
             # If not found, just use what they typed (might be valid)
             canonical = county_input.upper()
@@ -3746,6 +3955,99 @@ class CoPilotApp:
         self.add_alert(f"Grid: {message}", priority=False)
         self.voice.announce(message)
     
+    def _add_worked_grid(self, band, grid):
+        """Remember a worked (band, grid) so decodes from it are not announced as new"""
+        if band and grid and len(grid) >= 4:
+            self._worked_grids.add((band.lower(), grid[:4].upper()))
+    
+    def on_wsjtx_decode(self, message):
+        """Called from the RadioUpdater listener thread for each WSJT-X Decode message"""
+        # Old decodes re-sent on a Replay request, or decoded from a .wav file, are not live
+        if message['name'] != 'decode' or not message.get('new') or message.get('off_air'):
+            return
+        parsed = parse_standard_message(message.get('message'))
+        if not parsed['from_call'] or not message.get('band'):
+            return
+        self.root.after(0, lambda: self._check_wsjtx_decode(message, parsed))
+    
+    def _check_wsjtx_decode(self, message, parsed):
+        """Work out new grid / calling me for one decode (Tk thread) and alert"""
+        import time
+        
+        band = message['band']
+        callsign = parsed['from_call']
+        grid = (parsed['grid'] or '')[:4]
+        
+        # New grid: not worked on this band and not announced yet
+        is_new_grid = False
+        if grid:
+            key = (band.lower(), grid)
+            if key not in self._worked_grids and key not in self._decode_grids_alerted:
+                self._decode_grids_alerted.add(key)
+                is_new_grid = True
+        
+        # Calling me: addressed to my call (portable/rover suffixes ignored), once a minute per station
+        my_call = (message.get('de_call') or self.config.get('my_call', '')).upper().split('/')[0]
+        to_call = (parsed['to_call'] or '').split('/')[0]
+        is_calling_me = False
+        if my_call and to_call == my_call:
+            now = time.time()
+            if now - self._calling_me_alerted.get((callsign, band), 0) > 60:
+                self._calling_me_alerted[(callsign, band)] = now
+                is_calling_me = True
+        
+        if is_new_grid or is_calling_me:
+            self.on_new_decode(band, callsign, grid, is_new_grid, is_calling_me)
+    
+    def on_wsjtx_status(self, message):
+        """Called from the RadioUpdater listener thread for each WSJT-X Status message"""
+        self.root.after(0, lambda: self._show_wsjtx_status(message))
+    
+    def _show_wsjtx_status(self, message):
+        """Show the instance's band and TX state on its status indicator"""
+        port = message.get('listen_port')
+        lbl = self.wsjt_status_labels.get(port)
+        if not lbl:
+            return
+        
+        if message.get('transmitting'):
+            self._wsjt_transmitting.add(port)
+        else:
+            self._wsjt_transmitting.discard(port)
+        
+        band = message.get('band', '')
+        text = self.wsjt_status_names.get(port, '')
+        lbl.config(text=f"{text} {band}" if band else text)
+        if lbl.cget('bg') != 'red':
+            lbl.config(bg='orange' if port in self._wsjt_transmitting else 'green')
+    
+    def on_relay_failed(self, entry):
+        """Called from the RadioUpdater relay thread when a QSO could not be sent to the contest logger"""
+        self.root.after(0, lambda: self._show_relay_failure(entry))
+    
+    def _show_relay_failure(self, entry):
+        """Alert about a QSO missing from the contest logger and offer to retry it"""
+        qso = entry['qso']
+        self.add_alert(f"QSO with {qso.get('dx_call')} on {qso.get('band')} NOT sent to "
+                       f"{entry['logger']} ({entry['reason']}) - use Retry Relays on the QSO Log tab",
+                       priority=True)
+        self._update_relay_retry_button()
+    
+    def _update_relay_retry_button(self):
+        """Show how many QSOs are waiting in the relay dead-letter list"""
+        count = len(self.radio_updater.get_dead_letters()) if self.radio_updater else 0
+        self.relay_retry_button.config(text=f"Retry Relays ({count})",
+                                       state=tk.NORMAL if count else tk.DISABLED)
+    
+    def retry_failed_relays(self):
+        """Queue the QSOs the contest logger did not take for relay again"""
+        if not self.radio_updater:
+            return
+        count = self.radio_updater.retry_dead_letters()
+        if count:
+            self.add_alert(f"Retrying relay of {count} QSO(s) to the contest logger")
+        self._update_relay_retry_button()
+    
     def on_new_decode(self, band, callsign, grid, is_new_grid, is_calling_me):
         """Called when new decode is found in WSJT-X logs"""
         import time
@@ -4074,7 +4376,8 @@ class CoPilotApp:
         messagebox.showinfo("Settings", "Settings saved successfully")
         self.add_alert("Settings saved")
         
-        # Stop old radio updater before creating new one
+        # Stop old radio updater before creating new one (the new one resumes
+        # every QSO the logger has not taken, failed relays included, from the journal)
         if hasattr(self, 'radio_updater') and self.radio_updater:
             self.radio_updater.stop_listener()
         
@@ -4087,8 +4390,15 @@ class CoPilotApp:
             n3fjp_port=self.config.get('n3fjp_port', 1100),
             contest_logger=self.config.get('contest_logger', 'n1mm'),
             qso_callback=self.on_qso_logged,
-            location_stamper=self._stamp_qso_location
+            location_stamper=self._stamp_qso_location,
+            adif_writer=self.adif_writer,
+            relay_journal=self.relay_journal,
+            decode_callback=self.on_wsjtx_decode,
+            status_callback=self.on_wsjtx_status,
+            logger_keep_alive=self.config.get('logger_keep_alive', True),
+            relay_failed_callback=self.on_relay_failed
         )
+        self._update_relay_retry_button()
         self.add_alert("Radio updater restarted with new settings")
         
         # Start/stop APRS based on settings
@@ -4217,6 +4527,7 @@ class CoPilotApp:
         # Update current grid
         self.current_grid = test_grid
         self.grid_label.config(text=test_grid)
+        self.qsy_path_cache.set_origin(test_grid)
         
         # Update logger button (main window)
         logger = self.config.get('contest_logger', 'n1mm')
@@ -4283,6 +4594,9 @@ def main():
     root = tk.Tk()
     app = CoPilotApp(root)
     root.mainloop()
+    
+    # Write out any queued ADIF records before exiting
+    app.adif_writer.close()
 
 if __name__ == "__main__":
     main()
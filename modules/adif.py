@@ -0,0 +1,344 @@
+"""
+ADIF Reader / Formatter
+
+Single-pass, streaming reader for ADIF (.adi) files shared by the contest
+log reload, restamp_adif.py and anything else that reads Co-Pilot logs.
+Each <name:length[:type]> tag is tokenized once and its value is taken by
+the declared length (so values may contain '<'), reading the file in
+fixed-size chunks - memory stays bounded however large the log grows.
+
+Records are dicts of lowercase field name -> value, in file order.
+
+AdifWriter appends records to the daily log (logs/n5zy_copilot_YYYYMMDD.adi)
+from one writer thread: every producer (WSJT-X listeners, Manual Entry,
+Grid Corner) just queues text, so records never interleave. While it has a
+day's file open, a <file>.lock next to it marks the file as in use, so
+restamp_adif.py leaves it alone.
+
+Usage:
+    from modules.adif import AdifReader, AdifWriter, format_record
+    
+    with open("logs/n5zy_copilot_20260614.adi", encoding="utf-8") as f:
+        reader = AdifReader(f)
+        for record in reader:
+            print(record.get('call'), record.get('band'))
+        print(reader.header)        # {'adif_ver': '3.1.4', ...}
+    
+    format_record({'call': 'N5ZY', 'band': '2m'})  # "<call:4>N5ZY <band:2>2m <eor>"
+    
+    writer = AdifWriter("logs")
+    writer.write(format_record(fields))
+    writer.close()                  # Drains the queue and closes the file
+"""
+
+import datetime
+import io
+import os
+import queue
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+CHUNK_SIZE = 64 * 1024
+LOCK_SUFFIX = '.lock'  # <log>.adi.lock exists while an AdifWriter has <log>.adi open
+
+
+class AdifReader:
+    """Iterate the records of an ADIF file (or any text stream) one at a time"""
+    
+    def __init__(self, stream, chunk_size: int = CHUNK_SIZE):
+        """
+        Args:
+            stream: Text file object opened for reading
+            chunk_size: Characters read per refill
+        """
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self.header: Dict[str, str] = {}   # Header fields (filled once <eoh> is read)
+        self.header_text = ''              # Everything up to and including <eoh>
+        self.records_read = 0
+    
+    def __iter__(self) -> Iterator[Dict[str, str]]:
+        read = self._stream.read
+        chunk_size = self._chunk_size
+        buf = read(chunk_size)
+        eof = not buf
+        pos = 0
+        fields: Dict[str, str] = {}
+        # Until <eoh> (or the first <eor> of a headerless file) the buffer keeps
+        # the file start so header_text can be returned verbatim
+        in_header = True
+        
+        while True:
+            lt = buf.find('<', pos)
+            gt = buf.find('>', lt + 1) if lt >= 0 else -1
+            if gt < 0:
+                # Incomplete tag at the end of the buffer - read on
+                if eof:
+                    break
+                more = read(chunk_size)
+                eof = not more
+                keep = 0 if in_header else (lt if lt >= 0 else len(buf))
+                pos = (lt if lt >= 0 else len(buf)) - keep
+                buf = buf[keep:] + more
+                continue
+            
+            spec = buf[lt + 1:gt]
+            colon = spec.find(':')
+            if colon < 0:
+                # Bare tag: <eor> / <eoh> (anything else is ignored)
+                tag = spec.strip().lower()
+                pos = gt + 1
+                if tag == 'eor':
+                    in_header = False
+                    if fields:
+                        self.records_read += 1
+                        yield fields
+                    fields = {}
+                elif tag == 'eoh' and in_header:
+                    self.header_text = buf[:pos]
+                    self.header = fields
+                    fields = {}
+                    in_header = False
+                continue
+            
+            try:
+                length = int(spec[colon + 1:].split(':', 1)[0])
+            except ValueError:
+                pos = gt + 1  # Malformed tag - skip it
+                continue
+            
+            # Value is exactly `length` characters after the tag
+            start = gt + 1
+            end = start + length
+            while end > len(buf) and not eof:
+                more = read(chunk_size)
+                eof = not more
+                if not in_header:
+                    buf, start, end = buf[lt:], start - lt, end - lt
+                    lt = 0
+                buf += more
+            fields[spec[:colon].strip().lower()] = buf[start:end]
+            pos = min(end, len(buf))
+            
+            # Drop parsed text so the buffer stays around one chunk
+            if not in_header and pos > chunk_size:
+                buf = buf[pos:]
+                pos = 0
+        
+        if fields:
+            # Last record without a trailing <eor>
+            self.records_read += 1
+            yield fields
+
+
+def read_adif_file(path: str, encoding: str = 'utf-8') -> Iterator[Dict[str, str]]:
+    """Yield the records of an ADIF file (opened and closed here)"""
+    with open(path, 'r', encoding=encoding, errors='replace') as f:
+        yield from AdifReader(f)
+
+
+def parse_records(text: str) -> List[Dict[str, str]]:
+    """Parse ADIF text already in memory (e.g. a WSJT-X "ADIF Logged" message)"""
+    return list(AdifReader(io.StringIO(text)))
+
+
+def parse_adif_datetime(date_str: str, time_str: str) -> Optional[datetime.datetime]:
+    """QSO_DATE (YYYYMMDD) + TIME_ON/TIME_OFF (HHMM or HHMMSS) -> naive UTC datetime, or None"""
+    date_str = (date_str or '').strip()
+    time_str = (time_str or '').strip()
+    if len(date_str) != 8 or len(time_str) not in (4, 6):
+        return None
+    try:
+        return datetime.datetime.strptime(date_str + time_str.ljust(6, '0'), '%Y%m%d%H%M%S')
+    except ValueError:
+        return None
+
+
+def adif_file_in_use(path: str) -> bool:
+    """True while an AdifWriter (Co-Pilot) is appending to this file"""
+    return os.path.exists(path + LOCK_SUFFIX)
+
+
+def format_field(name: str, value) -> str:
+    """One ADIF field: <name:length>value"""
+    value = str(value)
+    return f"<{name}:{len(value)}>{value}"
+
+
+def format_record(fields: Union[Dict[str, str], Iterable[Tuple[str, str]]]) -> str:
+    """A record from a field dict (or (name, value) pairs), ending in <eor>"""
+    items = fields.items() if isinstance(fields, dict) else fields
+    parts = [format_field(name, value) for name, value in items if value is not None and value != '']
+    parts.append('<eor>')
+    return ' '.join(parts)
+
+
+class AdifWriter:
+    """
+    Appends records to a daily ADIF file through a single writer thread.
+    
+    The day's file stays open; it rolls over to a new file (with a fresh
+    header) at UTC midnight. Queued records are written in batches - the
+    writer takes everything waiting, writes it, then flushes and fsyncs
+    once, so a record is on disk moments after write() however many
+    threads are logging. If the file is replaced underneath the writer
+    (another tool rewrote it), the next batch reopens it by path instead
+    of appending to the old, unlinked copy.
+    """
+    
+    def __init__(self, log_dir: str, file_prefix: str = 'n5zy_copilot_',
+                 program_id: str = 'N5ZY-CoPilot', program_version: str = '1.8.32'):
+        """
+        Args:
+            log_dir: Directory for the daily files (created if missing)
+            file_prefix: File name before the YYYYMMDD date
+            program_id: PROGRAMID written in new file headers
+            program_version: PROGRAMVERSION written in new file headers
+        """
+        self.log_dir = log_dir
+        self.file_prefix = file_prefix
+        self.program_id = program_id
+        self.program_version = program_version
+        os.makedirs(log_dir, exist_ok=True)
+        
+        self._queue = queue.Queue()  # (utc datetime, record text) | threading.Event | None (stop)
+        self._file = None
+        self._path = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._write_loop, daemon=True)
+        self._thread.start()
+    
+    def path_for(self, when: Optional[datetime.datetime] = None) -> str:
+        """Daily file for a UTC time (default now)"""
+        when = when or datetime.datetime.now(datetime.timezone.utc)
+        return os.path.join(self.log_dir, f"{self.file_prefix}{when.strftime('%Y%m%d')}.adi")
+    
+    @property
+    def current_path(self) -> str:
+        """Today's (UTC) file"""
+        return self.path_for()
+    
+    def write(self, record: str):
+        """
+        Queue one record (ADIF text ending in <eor>) for today's file.
+        
+        Safe from any thread; returns without waiting for the disk.
+        """
+        if self._closed:
+            print("ADIF Writer: Closed - record not written")
+            return
+        self._queue.put((datetime.datetime.now(datetime.timezone.utc), record.strip()))
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until everything queued so far is written and fsynced.
+        
+        Returns:
+            True if it was, False on timeout
+        """
+        if self._closed:
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+    
+    def close(self, timeout: float = 5.0):
+        """Write what is queued, close the file and stop the writer thread"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout)
+    
+    def _write_loop(self):
+        """Writer thread: one batch (and one fsync) per wakeup"""
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            records = [item for item in batch if isinstance(item, tuple)]
+            if records:
+                self._write_batch(records)
+            
+            for item in batch:
+                if isinstance(item, threading.Event):
+                    item.set()
+            if None in batch:
+                self._close_file()
+                return
+    
+    def _write_batch(self, records):
+        """Write (time, text) records, rolling over files as their UTC date changes"""
+        try:
+            for when, text in records:
+                path = self.path_for(when)
+                if path != self._path or self._replaced():
+                    self._open(path)
+                self._file.write(text + "\n")
+            self._sync()
+        except (OSError, ValueError) as e:
+            print(f"ADIF Writer: Error writing {len(records)} record(s) to {self._path}: {e}")
+            self._close_file()  # Reopened by the next batch
+    
+    def _open(self, path: str):
+        """Switch to another daily file, writing its header if it is new"""
+        self._close_file()
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, 'a', encoding='utf-8')
+        self._path = path
+        if new_file:
+            self._file.write(self._header())
+        try:
+            with open(path + LOCK_SUFFIX, 'w', encoding='utf-8') as lock:
+                lock.write(f"{os.getpid()}\n")
+        except OSError as e:
+            print(f"ADIF Writer: Could not create {path + LOCK_SUFFIX}: {e}")
+        print(f"ADIF Writer: Logging to {path}")
+    
+    def _replaced(self) -> bool:
+        """True if the open file is no longer the one at its path (renamed over or deleted)"""
+        if self._file is None:
+            return False
+        try:
+            on_disk = os.stat(self._path)
+        except FileNotFoundError:
+            return True
+        opened = os.fstat(self._file.fileno())
+        return (on_disk.st_dev, on_disk.st_ino) != (opened.st_dev, opened.st_ino)
+    
+    def _header(self) -> str:
+        """ADIF 3.1.4 header for a new daily file"""
+        created = datetime.datetime.now().strftime('%A, %B %d, %Y')
+        return ("#++++++++++++++++++++++++++++++++++++\n"
+                "#   N5ZY Co-Pilot GPS-stamped log\n"
+                f"#   Created: {created}\n"
+                "#   For LoTW upload via Log4OM\n"
+                "#++++++++++++++++++++++++++++++++++++\n\n"
+                f"{format_field('adif_ver', '3.1.4')}\n"
+                f"{format_field('programid', self.program_id)}\n"
+                f"{format_field('programversion', self.program_version)}\n"
+                "<eoh>\n\n")
+    
+    def _sync(self):
+        """Flush Python's buffer and fsync - the durability point for a batch"""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+    
+    def _close_file(self):
+        if self._file is None:
+            return
+        try:
+            self._sync()
+            self._file.close()
+        except (OSError, ValueError) as e:
+            print(f"ADIF Writer: Error closing {self._path}: {e}")
+        try:
+            os.remove(self._path + LOCK_SUFFIX)
+        except OSError:
+            pass
+        self._file = None
+        self._path = None
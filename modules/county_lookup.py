@@ -4,6 +4,12 @@ County Lookup Service
 Performs fast point-in-polygon lookups for US county boundaries.
 Uses Census shapefiles with rtree spatial indexing for performance.
 
+The first load of a shapefile writes a compiled index next to it
+(e.g. data/us_counties_10m.cidx) holding WKB geometries, bounding boxes
+and the CountyInfo table. Later launches memory-map that file instead of
+re-parsing the shapefile. The cache is checked against the size, mtime and
+SHA-1 of the source .shp/.dbf and silently rebuilt when stale.
+
 Usage:
     from modules.county_lookup import CountyLookupService
     
@@ -16,14 +22,47 @@ Usage:
         print(f"FIPS: {county.fips}")  # "40109"
 """
 
+import hashlib
+import json
+import math
+import mmap
+import os
+import struct
+import threading
+
+import numpy as np
 import shapefile
+import shapely
 from shapely.geometry import shape, Point
 from shapely.strtree import STRtree
 from dataclasses import dataclass
-from typing import Optional, List, Callable
+from typing import Optional, List, Callable, Iterable, Set, Tuple
 from pathlib import Path
 
 
+# Compiled index cache file layout:
+#   magic (8) + header length (uint32 LE) + header JSON + WKB blob
+# The header holds the source file signatures, the CountyInfo table, per-county
+# bounding boxes and WKB offsets relative to the start of the blob.
+CACHE_SUFFIX = ".cidx"
+CACHE_MAGIC = b"N5ZYCIX1"
+CACHE_VERSION = 1
+_CACHE_PREFIX = struct.Struct("<8sI")
+
+# Partial loads: when a fix gets within EXPAND_MARGIN_DEG of the loaded
+# region's edge, counties within EXPAND_WINDOW_DEG of it are loaded too
+EXPAND_MARGIN_DEG = 0.25
+EXPAND_WINDOW_DEG = 1.0
+
+MILES_PER_DEGREE = 69.05  # One degree of latitude
+
+# Optional lat/lon cell lookup table (see CountyGridIndex)
+GRID_SUFFIX = ".cgrid.npz"
+GRID_VERSION = 1
+GRID_CELLS_PER_DEGREE = 10  # 0.1 degree cells (~7 x 5.5 miles in the lower 48)
+GRID_EMPTY = -1             # Cell value: no county
+
+
 # State FIPS to (abbreviation, name) mapping
 STATE_FIPS_MAP = {
     "01": ("AL", "Alabama"), "02": ("AK", "Alaska"), "04": ("AZ", "Arizona"),
@@ -75,6 +114,294 @@ class CountyInfo:
         return f"{self.name}, {self.state_abbrev} (FIPS: {self.fips})"
 
 
+@dataclass
+class CountyFix:
+    """Result of CountyLookupService.locate() for one GPS fix"""
+    county: Optional[CountyInfo]  # None if not in any loaded county
+    changed: bool                 # County differs from the previous locate() call
+    fast_path: bool               # Resolved from the last county without an index query
+    # Distance to the nearest edge of the county in miles (None if no county).
+    # A lower bound: the rover cannot leave the county before covering it.
+    boundary_distance_mi: Optional[float] = None
+
+
+@dataclass
+class _LastCounty:
+    """Locality state for locate(): the county matched by the previous fix"""
+    geometries: list   # The geometry list idx refers to (identity changes on reload)
+    idx: int
+    boundary: object   # Cached geom.boundary for clearance distance
+    anchor: Tuple[float, float] = (0.0, 0.0)  # (x, y) where clearance was measured
+    clearance: float = 0.0                    # Distance to boundary from anchor (degrees)
+    
+    @property
+    def interior_box(self) -> Optional[Tuple[float, float, float, float]]:
+        """Square inscribed in the clearance circle - entirely inside the county"""
+        half = self.clearance * 0.7071
+        if half <= 0:
+            return None
+        x, y = self.anchor
+        return (x - half, y - half, x + half, y + half)
+    
+    def measure(self, x: float, y: float):
+        """Re-anchor the clearance circle at (x, y)"""
+        self.anchor = (x, y)
+        self.clearance = float(shapely.distance(self.boundary, Point(x, y)))
+    
+    def clearance_at(self, x: float, y: float) -> float:
+        """Lower bound on the boundary distance at (x, y) without touching the polygon"""
+        return max(0.0, self.clearance - math.hypot(x - self.anchor[0], y - self.anchor[1]))
+
+
+def degrees_to_miles(distance_deg: float, latitude: float) -> float:
+    """
+    Convert a planar lon/lat distance to miles, rounding down.
+    
+    A degree of longitude shrinks with cos(latitude), so scaling by the
+    shorter axis gives a safe lower bound (within ~20% in the lower 48).
+    """
+    return distance_deg * MILES_PER_DEGREE * math.cos(math.radians(latitude))
+
+
+def _source_files(shapefile_path: Path) -> List[Path]:
+    """Files whose contents determine the county index (.shp geometry + .dbf attributes)"""
+    files = [shapefile_path]
+    dbf_path = shapefile_path.with_suffix(".dbf")
+    if dbf_path.exists():
+        files.append(dbf_path)
+    return files
+
+
+def _file_stats(files: List[Path]) -> List[dict]:
+    """Cheap signature (name, size, mtime) for each source file"""
+    stats = []
+    for f in files:
+        st = f.stat()
+        stats.append({"name": f.name, "size": st.st_size, "mtime_ns": st.st_mtime_ns})
+    return stats
+
+
+def _hash_files(files: List[Path]) -> str:
+    """SHA-1 over the contents of all source files"""
+    digest = hashlib.sha1()
+    for f in files:
+        with open(f, "rb") as fh:
+            for chunk in iter(lambda: fh.read(1 << 20), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _source_signature(shapefile_path: Path) -> dict:
+    """Signature of the source files stored in the cache and grid files"""
+    files = _source_files(shapefile_path)
+    return {"files": _file_stats(files), "sha1": _hash_files(files)}
+
+
+def _check_source(shapefile_path: Path, source: dict) -> Tuple[bool, bool]:
+    """
+    Compare a stored source signature with the current files.
+    
+    Size/mtime match is enough; otherwise the file was touched or copied
+    and may still be unchanged, so compare content.
+    
+    Returns:
+        (valid, stats_match) - stats_match False means the signature needs refreshing
+    """
+    files = _source_files(shapefile_path)
+    if _file_stats(files) == source.get("files"):
+        return True, True
+    return _hash_files(files) == source.get("sha1"), False
+
+
+def region_around(latitude: float, longitude: float,
+                  radius_deg: float) -> Tuple[float, float, float, float]:
+    """Bounding box (min_lat, min_lon, max_lat, max_lon) centered on a point"""
+    return (latitude - radius_deg, longitude - radius_deg,
+            latitude + radius_deg, longitude + radius_deg)
+
+
+class _RegionFilter:
+    """Which counties a partial load keeps (by state and/or bounding box)"""
+    
+    def __init__(self, states: Optional[Iterable[str]] = None,
+                 bbox: Optional[Tuple[float, float, float, float]] = None):
+        self.states = {s.strip().upper() for s in states} if states else None
+        # Stored in shapely/pyshp (x, y) order: (min_lon, min_lat, max_lon, max_lat)
+        self.xy_bbox = (bbox[1], bbox[0], bbox[3], bbox[2]) if bbox else None
+    
+    @property
+    def is_partial(self) -> bool:
+        return self.states is not None or self.xy_bbox is not None
+    
+    def matches_state(self, info: CountyInfo) -> bool:
+        return (self.states is None or info.state_abbrev.upper() in self.states
+                or info.state_fips in self.states)
+    
+    def matches(self, info: CountyInfo, bounds: List[float]) -> bool:
+        if not self.matches_state(info):
+            return False
+        if self.xy_bbox is None:
+            return True
+        min_x, min_y, max_x, max_y = self.xy_bbox
+        return not (bounds[0] > max_x or bounds[2] < min_x or
+                    bounds[1] > max_y or bounds[3] < min_y)
+    
+    def describe(self) -> str:
+        parts = []
+        if self.states:
+            parts.append("states " + ",".join(sorted(self.states)))
+        if self.xy_bbox:
+            min_x, min_y, max_x, max_y = self.xy_bbox
+            parts.append(f"lat {min_y:.2f}..{max_y:.2f}, lon {min_x:.2f}..{max_x:.2f}")
+        return "; ".join(parts)
+
+
+class CountyGridIndex:
+    """
+    Precomputed lat/lon cell -> county table for O(1) lookups.
+    
+    The globe is split into 1 degree tiles; only tiles touching a county get
+    a block of cells_per_degree^2 cells, so the table stays a few MB. Each
+    cell holds:
+        >= 0        county index (cell lies entirely inside that county)
+        GRID_EMPTY  no county at all
+        <= -2       'ambiguous' cell straddling a county line - a short
+                    candidate list for the exact polygon test
+    
+    Indices refer to the CountyLookupService geometry list the table was
+    built from; the stored FIPS list guards against a different load order.
+    """
+    
+    def __init__(self, cells_per_degree: int, tile_map: np.ndarray, blocks: np.ndarray,
+                 ambiguous_offsets: np.ndarray, ambiguous_items: np.ndarray, fips: List[str]):
+        self.cells_per_degree = cells_per_degree
+        self.fips = fips
+        self._tile_map = tile_map              # (180, 360) tile id per 1 degree tile, -1 = none
+        self._blocks = blocks                  # (tiles, cells_per_degree^2) cell values
+        self._ambiguous_offsets = ambiguous_offsets
+        self._ambiguous_items = ambiguous_items
+    
+    @property
+    def ambiguous_count(self) -> int:
+        return len(self._ambiguous_offsets) - 1
+    
+    def cell_value(self, latitude: float, longitude: float) -> int:
+        """Raw cell value for a point (see class docstring)"""
+        x = longitude + 180.0
+        y = latitude + 90.0
+        if not (0.0 <= x < 360.0 and 0.0 <= y < 180.0):
+            return GRID_EMPTY
+        per = self.cells_per_degree
+        gx = int(x * per)
+        gy = int(y * per)
+        tile = self._tile_map[gy // per, gx // per]
+        if tile < 0:
+            return GRID_EMPTY
+        return int(self._blocks[tile, (gy % per) * per + gx % per])
+    
+    def candidates(self, value: int) -> np.ndarray:
+        """County indices to test for an ambiguous cell value"""
+        amb = -value - 2
+        return self._ambiguous_items[self._ambiguous_offsets[amb]:self._ambiguous_offsets[amb + 1]]
+    
+    @classmethod
+    def build(cls, geometries: List, fips: List[str],
+              cells_per_degree: int = GRID_CELLS_PER_DEGREE,
+              progress_callback: Optional[Callable[[int], None]] = None) -> "CountyGridIndex":
+        """
+        Rasterize county polygons into the cell table.
+        
+        Each county's bounding box cells are classified with vectorized
+        shapely predicates: fully contained cells get the county index,
+        cells that only intersect it become ambiguous.
+        """
+        per = cells_per_degree
+        nx = 360 * per
+        keys, owners, full_flags = [], [], []
+        
+        for i, geom in enumerate(geometries):
+            min_x, min_y, max_x, max_y = geom.bounds
+            gx0 = max(0, int((min_x + 180.0) * per))
+            gx1 = min(nx - 1, int((max_x + 180.0) * per))
+            gy0 = max(0, int((min_y + 90.0) * per))
+            gy1 = min(180 * per - 1, int((max_y + 90.0) * per))
+            gx, gy = np.meshgrid(np.arange(gx0, gx1 + 1), np.arange(gy0, gy1 + 1))
+            gx, gy = gx.ravel(), gy.ravel()
+            
+            boxes = shapely.box(gx / per - 180.0, gy / per - 90.0,
+                                (gx + 1) / per - 180.0, (gy + 1) / per - 90.0)
+            was_prepared = shapely.is_prepared(geom)
+            shapely.prepare(geom)
+            touched = shapely.intersects(geom, boxes)
+            full = shapely.contains(geom, boxes) & touched
+            if not was_prepared:
+                shapely.destroy_prepared(geom)  # Keep memory down; locate() prepares its own
+            
+            keys.append(gy[touched].astype(np.int64) * nx + gx[touched])
+            owners.append(np.full(int(touched.sum()), i, dtype=np.int32))
+            full_flags.append(full[touched])
+            
+            if progress_callback and (i + 1) % 100 == 0:
+                progress_callback(int((i + 1) * 100 / len(geometries)))
+        
+        keys = np.concatenate(keys) if keys else np.zeros(0, dtype=np.int64)
+        owners = np.concatenate(owners) if owners else np.zeros(0, dtype=np.int32)
+        full_flags = np.concatenate(full_flags) if full_flags else np.zeros(0, dtype=bool)
+        
+        # Group entries by cell with any 'fully inside' entry first
+        order = np.lexsort((~full_flags, keys))
+        keys, owners, full_flags = keys[order], owners[order], full_flags[order]
+        cell_keys, first, counts = np.unique(keys, return_index=True, return_counts=True)
+        
+        ambiguous = ~full_flags[first]
+        amb_rank = np.cumsum(ambiguous) - 1
+        values = np.where(ambiguous, -2 - amb_rank, owners[first]).astype(np.int32)
+        entry_cell = np.repeat(np.arange(len(cell_keys)), counts)
+        ambiguous_items = owners[ambiguous[entry_cell]]
+        ambiguous_offsets = np.concatenate(([0], np.cumsum(counts[ambiguous]))).astype(np.int64)
+        
+        # Pack cells into 1 degree tiles
+        cell_gx = cell_keys % nx
+        cell_gy = cell_keys // nx
+        tile_keys = (cell_gy // per) * 360 + cell_gx // per
+        tiles, tile_ids = np.unique(tile_keys, return_inverse=True)
+        tile_map = np.full((180, 360), -1, dtype=np.int32)
+        tile_map.ravel()[tiles] = np.arange(len(tiles), dtype=np.int32)
+        blocks = np.full((len(tiles), per * per), GRID_EMPTY, dtype=np.int32)
+        blocks[tile_ids, (cell_gy % per) * per + cell_gx % per] = values
+        
+        return cls(per, tile_map, blocks, ambiguous_offsets, ambiguous_items, list(fips))
+    
+    def save(self, grid_path: Path, source: dict):
+        """Write the table to disk (atomically replaces any existing file)"""
+        meta = {"version": GRID_VERSION, "cells_per_degree": self.cells_per_degree,
+                "source": source}
+        tmp_path = grid_path.with_name(grid_path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(f, meta=np.array(json.dumps(meta)), fips=np.array(self.fips),
+                     tile_map=self._tile_map, blocks=self._blocks,
+                     ambiguous_offsets=self._ambiguous_offsets,
+                     ambiguous_items=self._ambiguous_items)
+        os.replace(tmp_path, grid_path)
+    
+    @classmethod
+    def load(cls, grid_path: Path) -> Tuple["CountyGridIndex", dict]:
+        """
+        Read a table written by save().
+        
+        Returns:
+            (grid, meta) - caller validates meta["source"] against the shapefile
+        """
+        with np.load(grid_path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            if meta.get("version") != GRID_VERSION:
+                raise ValueError(f"unsupported grid version {meta.get('version')}")
+            grid = cls(meta["cells_per_degree"], data["tile_map"], data["blocks"],
+                       data["ambiguous_offsets"], data["ambiguous_items"],
+                       data["fips"].tolist())
+        return grid, meta
+
+
 class CountyLookupService:
     """
     Fast point-in-polygon county lookup using shapefile + spatial index.
@@ -89,6 +416,23 @@ class CountyLookupService:
         self._spatial_index: Optional[STRtree] = None
         self._geom_to_info: dict = {}  # Map geometry index -> CountyInfo
         self._is_loaded = False
+        self._load_finished = threading.Event()  # Set when a load attempt ends (ok or not)
+        self._cache_needs_refresh = False
+        
+        # Partial (per-state / bounding box) loading
+        self._source_path: Optional[Path] = None
+        self._use_cache = True
+        self._region: Optional[_RegionFilter] = None  # None = whole shapefile loaded
+        self._coverage = None       # Area known to be fully loaded
+        self._coverage_core = None  # Coverage shrunk by EXPAND_MARGIN_DEG (prepared)
+        
+        # Optional cell lookup table, valid only for the geometry list it was built from
+        self._grid: Optional[CountyGridIndex] = None
+        self._grid_geometries: Optional[list] = None
+        
+        # locate() fast path
+        self._last: Optional[_LastCounty] = None
+        self._last_info: Optional[CountyInfo] = None
     
     @property
     def is_loaded(self) -> bool:
@@ -100,14 +444,53 @@ class CountyLookupService:
         """Number of counties loaded"""
         return len(self._counties)
     
+    @staticmethod
+    def cache_path_for(shapefile_path: str) -> Path:
+        """Location of the compiled index cache for a shapefile"""
+        return Path(shapefile_path).with_suffix(CACHE_SUFFIX)
+    
+    @staticmethod
+    def grid_path_for(shapefile_path: str) -> Path:
+        """Location of the optional cell lookup table for a shapefile"""
+        path = Path(shapefile_path)
+        return path.with_name(path.stem + GRID_SUFFIX)
+    
+    @property
+    def has_grid(self) -> bool:
+        """True if the cell lookup table is attached"""
+        return self._grid is not None and self._grid_geometries is self._geometries
+    
+    @property
+    def is_partial(self) -> bool:
+        """True if only some states / a region of the shapefile are loaded"""
+        return self._region is not None
+    
     def load_shapefile(self, shapefile_path: str, 
-                       progress_callback: Optional[Callable[[int], None]] = None):
+                       progress_callback: Optional[Callable[[int], None]] = None,
+                       use_cache: bool = True,
+                       states: Optional[Iterable[str]] = None,
+                       bbox: Optional[Tuple[float, float, float, float]] = None,
+                       use_grid: bool = False):
         """
         Load county boundaries from a shapefile.
         
         Args:
             shapefile_path: Path to .shp file
             progress_callback: Optional callback(percent) for progress updates
+            use_cache: Load from / write to the compiled index cache next to
+                the shapefile. A stale or unreadable cache falls back to
+                parsing the shapefile and is rebuilt.
+            states: Only load counties in these states (abbreviations like
+                'OK' or FIPS codes like '40')
+            bbox: Only load counties intersecting this box, given as
+                (min_lat, min_lon, max_lat, max_lon)
+            use_grid: Also attach the cell lookup table (see load_grid_index),
+                building it on first use. Ignored for partial loads.
+        
+        With states or bbox the load is partial: only matching records are
+        read (via the .shx offsets or the cache's bounds table) and
+        ensure_coverage() grows the region as the rover approaches its edge.
+        Partial loads never write the index cache - run one full load for that.
         
         Supported shapefiles:
         - Census TIGER/Line: tl_2024_us_county.shp (or 2025)
@@ -120,35 +503,245 @@ class CountyLookupService:
         if not path.exists():
             raise FileNotFoundError(f"Shapefile not found: {shapefile_path}")
         
-        self._counties.clear()
-        self._geometries.clear()
-        self._geom_to_info.clear()
-        self._spatial_index = None
-        self._is_loaded = False
+        self._load_finished.clear()
+        try:
+            self._load(path, progress_callback, use_cache, _RegionFilter(states, bbox))
+        finally:
+            self._load_finished.set()
         
-        # Read shapefile
-        sf = shapefile.Reader(str(path))
-        total = len(sf)
+        # Lookups already work off the STRtree while the grid loads/builds
+        if use_grid and self._region is None:
+            self.load_grid_index()
+    
+    def load_grid_index(self, build_if_missing: bool = True,
+                        cells_per_degree: int = GRID_CELLS_PER_DEGREE,
+                        progress_callback: Optional[Callable[[int], None]] = None) -> bool:
+        """
+        Attach the precomputed cell lookup table (CountyGridIndex).
+        
+        Loads it from next to the shapefile if it matches the source files and
+        the loaded counties; otherwise builds it (several seconds for the
+        Natural Earth file) and saves it for next time.
         
-        # Get field indices
-        field_names = [f[0] for f in sf.fields[1:]]
+        Returns:
+            True if the table is attached
+        """
+        if not self._is_loaded or self._region is not None or not self._geometries:
+            return False
         
-        # Map field names (handle different shapefile formats)
-        def get_field_idx(names):
-            for name in names:
-                if name in field_names:
-                    return field_names.index(name)
-            return -1
+        geometries = self._geometries
+        fips = [info.fips for _, info in self._counties]
+        grid_path = self.grid_path_for(str(self._source_path))
         
-        state_fips_idx = get_field_idx(['STATEFP', 'STATE_FIPS', 'STATEFP10'])
-        geoid_idx = get_field_idx(['GEOID', 'GEO_ID', 'GEOID10'])
-        name_idx = get_field_idx(['NAME', 'NAMELSAD', 'COUNTY_NAM'])
-        state_abbrev_idx = get_field_idx(['STUSPS', 'STATE', 'STATE_ABBR'])
+        grid = None
+        if grid_path.exists():
+            try:
+                grid, meta = CountyGridIndex.load(grid_path)
+                valid, _ = _check_source(self._source_path, meta.get("source", {}))
+                if not valid or grid.fips != fips or grid.cells_per_degree != cells_per_degree:
+                    print(f"County Lookup: Grid table {grid_path.name} is stale")
+                    grid = None
+            except (OSError, ValueError, KeyError) as e:
+                print(f"County Lookup: Ignoring unreadable grid table {grid_path.name}: {e}")
+                grid = None
         
-        self._geometries = []  # Keep reference for index lookups
+        if grid is None:
+            if not build_if_missing:
+                return False
+            print(f"County Lookup: Building grid table ({cells_per_degree} cells/degree)...")
+            grid = CountyGridIndex.build(geometries, fips, cells_per_degree, progress_callback)
+            try:
+                grid.save(grid_path, _source_signature(self._source_path))
+                print(f"County Lookup: Wrote grid table {grid_path.name}")
+            except OSError as e:
+                print(f"County Lookup: Could not write grid table: {e}")
+        
+        # A reload may have swapped the geometry list while we were building
+        if geometries is not self._geometries:
+            return False
+        self._grid, self._grid_geometries = grid, geometries
+        print(f"County Lookup: Grid table attached ({grid.ambiguous_count} boundary cells)")
+        return True
+    
+    def load_in_background(self, shapefile_path: str,
+                           progress_callback: Optional[Callable[[int], None]] = None,
+                           done_callback: Optional[Callable[[Optional[Exception]], None]] = None,
+                           **load_kwargs) -> threading.Thread:
+        """
+        Load county boundaries on a daemon thread so callers don't block.
+        
+        is_loaded stays False until the index is ready. Both callbacks run on
+        the loader thread - GUI code must marshal back to its own thread.
+        
+        Args:
+            shapefile_path: Path to .shp file
+            progress_callback: Optional callback(percent) for progress updates
+            done_callback: Optional callback(error) - error is None on success
+            **load_kwargs: Passed to load_shapefile (use_cache, states, bbox, use_grid)
+        """
+        # Cleared here (not in the thread) so wait_until_loaded() can't race the start
+        self._load_finished.clear()
+        use_grid = load_kwargs.pop('use_grid', False)
         
-        for i, (shp_rec, db_rec) in enumerate(zip(sf.shapes(), sf.records())):
+        def worker():
+            error = None
             try:
+                self.load_shapefile(shapefile_path, progress_callback, **load_kwargs)
+            except Exception as e:
+                error = e
+                self._load_finished.set()
+            if done_callback:
+                done_callback(error)
+            # Attach the grid table after reporting ready - STRtree lookups work meanwhile
+            if use_grid and error is None:
+                try:
+                    self.load_grid_index()
+                except Exception as e:
+                    print(f"County Lookup: Grid table unavailable: {e}")
+        
+        thread = threading.Thread(target=worker, daemon=True)
+        thread.start()
+        return thread
+    
+    def wait_until_loaded(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until an in-progress load finishes (or timeout).
+        
+        Returns:
+            True if the index is loaded and ready for lookups
+        """
+        self._load_finished.wait(timeout)
+        return self._is_loaded
+    
+    def ensure_coverage(self, latitude: float, longitude: float) -> bool:
+        """
+        Grow a partial load when a fix nears the edge of the loaded region.
+        
+        Cheap no-op (one prepared point test) while the fix is comfortably
+        inside. Otherwise loads the counties within EXPAND_WINDOW_DEG of the
+        fix that aren't loaded yet and rebuilds the spatial index.
+        
+        Returns:
+            True if new counties were loaded
+        """
+        if self._region is None or not self._is_loaded:
+            return False
+        if shapely.contains_xy(self._coverage_core, longitude, latitude):
+            return False
+        
+        window = region_around(latitude, longitude, EXPAND_WINDOW_DEG)
+        region = _RegionFilter(bbox=window)
+        loaded_fips = {info.fips for _, info in self._counties}
+        
+        added = None
+        if self._use_cache:
+            added = self._read_cache(self._source_path, region, skip_fips=loaded_fips)
+        if added is None:
+            added = self._read_shapefile(self._source_path, region, skip_fips=loaded_fips)
+        
+        if added:
+            self._set_counties(self._counties + added)
+        self._set_coverage(self._coverage.union(shapely.box(*region.xy_bbox)))
+        
+        if added:
+            print(f"County Lookup: Expanded loaded region near ({latitude:.3f}, {longitude:.3f}) "
+                  f"by {len(added)} counties ({len(self._counties)} total)")
+        return bool(added)
+    
+    def _load(self, path: Path, progress_callback: Optional[Callable[[int], None]],
+              use_cache: bool, region: "_RegionFilter"):
+        """Load from the index cache or the shapefile (see load_shapefile)"""
+        # Mark unloaded first so lookups from other threads back off while we rebuild
+        self._is_loaded = False
+        self._set_counties([])
+        self._source_path = path
+        self._use_cache = use_cache
+        self._region = region if region.is_partial else None
+        self._coverage = None
+        self._coverage_core = None
+        
+        counties = None
+        from_cache = False
+        if use_cache:
+            counties = self._read_cache(path, region, progress_callback)
+            from_cache = counties is not None
+        if counties is None:
+            counties = self._read_shapefile(path, region, progress_callback)
+        
+        self._set_counties(counties)
+        
+        if self._region is not None:
+            coverage = shapely.union_all(self._geometries) if self._geometries else shapely.Polygon()
+            if region.xy_bbox:
+                coverage = coverage.union(shapely.box(*region.xy_bbox))
+            self._set_coverage(coverage)
+        
+        self._is_loaded = True
+        
+        # Write (or refresh the signature of) the cache - full loads only,
+        # a partial cache would be missing counties
+        if use_cache and self._region is None and (not from_cache or self._cache_needs_refresh):
+            self._save_cache(path)
+        
+        if progress_callback:
+            progress_callback(100)
+        
+        source_name = self.cache_path_for(str(path)).name + " (cached index)" if from_cache else path.name
+        scope = f" [{region.describe()}]" if self._region is not None else ""
+        print(f"Loaded {len(self._counties)} counties from {source_name}{scope}")
+    
+    def _set_counties(self, counties: List[tuple]):
+        """Replace the loaded (geometry, CountyInfo) list and rebuild the spatial index"""
+        geometries = [geom for geom, _ in counties]
+        geom_to_info = {i: info for i, (_, info) in enumerate(counties)}
+        # STRtree construction is native code; only the shapefile parse is slow
+        spatial_index = STRtree(geometries) if geometries else None
+        
+        # Swap in whole lists so concurrent lookups see either old or new state
+        self._counties = counties
+        self._geometries = geometries
+        self._geom_to_info = geom_to_info
+        self._spatial_index = spatial_index
+    
+    def _set_coverage(self, coverage):
+        """Record the area a partial load covers, plus its shrunken 'safe' core"""
+        self._coverage = coverage.simplify(EXPAND_MARGIN_DEG / 10)
+        core = self._coverage.buffer(-EXPAND_MARGIN_DEG)
+        shapely.prepare(core)
+        self._coverage_core = core
+    
+    def _read_shapefile(self, path: Path, region: "_RegionFilter",
+                        progress_callback: Optional[Callable[[int], None]] = None,
+                        skip_fips: Set[str] = frozenset()) -> List[tuple]:
+        """
+        Read matching counties straight from the shapefile.
+        
+        Full loads stream every record. Partial loads use random access via
+        the .shx offsets: state filters read the (small) .dbf record first,
+        bbox filters let pyshp compare the shape header's box and skip the
+        point data entirely for non-matching records.
+        """
+        counties = []
+        sf = shapefile.Reader(str(path))
+        try:
+            total = len(sf)
+            
+            # Get field indices
+            field_names = [f[0] for f in sf.fields[1:]]
+            
+            # Map field names (handle different shapefile formats)
+            def get_field_idx(names):
+                for name in names:
+                    if name in field_names:
+                        return field_names.index(name)
+                return -1
+            
+            state_fips_idx = get_field_idx(['STATEFP', 'STATE_FIPS', 'STATEFP10'])
+            geoid_idx = get_field_idx(['GEOID', 'GEO_ID', 'GEOID10'])
+            name_idx = get_field_idx(['NAME', 'NAMELSAD', 'COUNTY_NAM'])
+            state_abbrev_idx = get_field_idx(['STUSPS', 'STATE', 'STATE_ABBR'])
+            
+            def make_info(db_rec):
                 # Extract county info
                 state_fips = str(db_rec[state_fips_idx]) if state_fips_idx >= 0 else ""
                 geoid = str(db_rec[geoid_idx]) if geoid_idx >= 0 else ""
@@ -161,41 +754,146 @@ class CountyLookupService:
                 else:
                     state_name = STATE_FIPS_MAP.get(state_fips, ("", "Unknown"))[1]
                 
-                # Create geometry
-                geom = shape(shp_rec.__geo_interface__)
-                if geom.is_empty:
-                    continue
-                
-                info = CountyInfo(
+                return CountyInfo(
                     state_fips=state_fips,
                     state_abbrev=state_abbrev,
                     state_name=state_name,
                     fips=geoid or (state_fips + str(db_rec[1])),  # Fallback to STATEFP + COUNTYFP
                     name=name
                 )
-                
-                self._counties.append((geom, info))
-                self._geom_to_info[len(self._geometries)] = info  # Use index as key
-                self._geometries.append(geom)
-                
-            except Exception as e:
-                # Skip invalid features
-                continue
             
-            # Progress callback
-            if progress_callback and (i + 1) % 100 == 0:
-                progress_callback(int((i + 1) * 100 / total))
+            if region.is_partial:
+                def matching_records():
+                    for i in range(total):
+                        info = None
+                        if region.states is not None:
+                            info = make_info(sf.record(i))
+                            if not region.matches_state(info):
+                                continue
+                        shp_rec = sf.shape(i, bbox=region.xy_bbox)
+                        if shp_rec is None:
+                            continue
+                        yield i, shp_rec, info or make_info(sf.record(i))
+                records = matching_records()
+            else:
+                records = ((i, shp_rec, make_info(db_rec))
+                           for i, (shp_rec, db_rec) in enumerate(zip(sf.shapes(), sf.records())))
+            
+            for i, shp_rec, info in records:
+                try:
+                    if info.fips in skip_fips:
+                        continue
+                    
+                    # Create geometry
+                    geom = shape(shp_rec.__geo_interface__)
+                    if geom.is_empty:
+                        continue
+                    
+                    counties.append((geom, info))
+                    
+                except Exception as e:
+                    # Skip invalid features
+                    continue
+                
+                # Progress callback
+                if progress_callback and (i + 1) % 100 == 0:
+                    progress_callback(int((i + 1) * 100 / total))
+        finally:
+            sf.close()
+        
+        return counties
+    
+    def _read_cache(self, path: Path, region: "_RegionFilter",
+                    progress_callback: Optional[Callable[[int], None]] = None,
+                    skip_fips: Set[str] = frozenset()) -> Optional[List[tuple]]:
+        """
+        Read matching counties from the compiled index cache.
         
-        # Build spatial index
-        if self._geometries:
-            self._spatial_index = STRtree(self._geometries)
+        Partial loads filter on the cached state/bounds table and only
+        decode the WKB of the counties they keep.
         
-        self._is_loaded = True
+        Returns:
+            List of (geometry, CountyInfo), or None to fall back to the shapefile
+        """
+        self._cache_needs_refresh = False
+        cache_path = self.cache_path_for(str(path))
+        if not cache_path.exists():
+            return None
         
-        if progress_callback:
-            progress_callback(100)
+        try:
+            with open(cache_path, "rb") as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    magic, header_len = _CACHE_PREFIX.unpack_from(mm, 0)
+                    if magic != CACHE_MAGIC:
+                        return None
+                    
+                    header_start = _CACHE_PREFIX.size
+                    header = json.loads(mm[header_start:header_start + header_len])
+                    if header.get("version") != CACHE_VERSION:
+                        return None
+                    valid, stats_match = _check_source(path, header.get("source", {}))
+                    if not valid:
+                        print(f"County Lookup: Index cache {cache_path.name} is stale, rebuilding")
+                        return None
+                    
+                    infos = [CountyInfo(*row) for row in header["counties"]]
+                    bounds = header["bounds"]
+                    selected = [i for i, info in enumerate(infos)
+                                if info.fips not in skip_fips
+                                and region.matches(info, bounds[i])]
+                    
+                    # Decode the selected WKB geometries in one vectorized call
+                    blob_start = header_start + header_len
+                    offsets = header["offsets"]
+                    wkbs = [mm[blob_start + offsets[i]:blob_start + offsets[i + 1]]
+                            for i in selected]
+                    geometries = shapely.from_wkb(wkbs) if wkbs else []
+        except (OSError, ValueError, KeyError, IndexError, TypeError, struct.error,
+                shapely.errors.ShapelyError) as e:
+            print(f"County Lookup: Ignoring unreadable index cache {cache_path.name}: {e}")
+            return None
+        
+        # Same content, new mtime - refresh the signature so the next
+        # launch doesn't have to hash the shapefile again
+        self._cache_needs_refresh = not stats_match
         
-        print(f"Loaded {len(self._counties)} counties from {path.name}")
+        return [(geom, infos[i]) for i, geom in zip(selected, geometries)]
+    
+    def _save_cache(self, path: Path):
+        """Write the compiled index cache (atomically replaces any existing file)"""
+        cache_path = self.cache_path_for(str(path))
+        tmp_path = cache_path.with_suffix(cache_path.suffix + ".tmp")
+        
+        try:
+            wkbs = shapely.to_wkb(self._geometries) if self._geometries else []
+            offsets = [0]
+            for wkb in wkbs:
+                offsets.append(offsets[-1] + len(wkb))
+            
+            header = {
+                "version": CACHE_VERSION,
+                "source": _source_signature(path),
+                "counties": [[info.state_fips, info.state_abbrev, info.state_name,
+                              info.fips, info.name] for _, info in self._counties],
+                "bounds": [list(geom.bounds) for geom in self._geometries],
+                "offsets": offsets,
+            }
+            header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+            
+            with open(tmp_path, "wb") as f:
+                f.write(_CACHE_PREFIX.pack(CACHE_MAGIC, len(header_bytes)))
+                f.write(header_bytes)
+                for wkb in wkbs:
+                    f.write(wkb)
+            os.replace(tmp_path, cache_path)
+            print(f"County Lookup: Wrote index cache {cache_path.name}")
+        except OSError as e:
+            # Read-only install directory etc. - the shapefile path still works
+            print(f"County Lookup: Could not write index cache: {e}")
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
     
     def lookup(self, latitude: float, longitude: float) -> Optional[CountyInfo]:
         """
@@ -208,22 +906,159 @@ class CountyLookupService:
         Returns:
             CountyInfo if found, None if not in any county (e.g., in water or outside US)
         """
-        if not self._is_loaded or self._spatial_index is None:
+        if not self._is_loaded:
             raise RuntimeError("Shapefile not loaded. Call load_shapefile() first.")
         
-        point = Point(longitude, latitude)  # Note: shapely uses (x, y) = (lon, lat)
+        # Snapshot - ensure_coverage() may swap these in from another thread
+        spatial_index, geometries, geom_to_info = (
+            self._spatial_index, self._geometries, self._geom_to_info)
+        if spatial_index is None:
+            return None  # Partial load with nothing in the region
         
-        # Query spatial index for candidate indices
-        candidate_indices = self._spatial_index.query(point)
+        idx = self._find_index(spatial_index, geometries, latitude, longitude)
+        return geom_to_info.get(idx) if idx is not None else None
+    
+    def _find_index(self, spatial_index, geometries, latitude: float, longitude: float) -> Optional[int]:
+        """Index of the county containing the point (grid table first, then STRtree)"""
+        if self._grid is not None and self._grid_geometries is geometries:
+            value = self._grid.cell_value(latitude, longitude)
+            if value >= 0:
+                return value  # Cell entirely inside one county - no polygon test
+            if value == GRID_EMPTY:
+                return None
+            candidate_indices = self._grid.candidates(value)
+        else:
+            # Query spatial index for candidate indices
+            point = Point(longitude, latitude)  # Note: shapely uses (x, y) = (lon, lat)
+            candidate_indices = spatial_index.query(point)
         
         # Precise point-in-polygon test
         for idx in candidate_indices:
-            geom = self._geometries[idx]
-            if geom.contains(point):
-                return self._geom_to_info.get(idx)
+            if shapely.contains_xy(geometries[idx], longitude, latitude):
+                return int(idx)
         
         return None
     
+    def locate(self, latitude: float, longitude: float) -> CountyFix:
+        """
+        Locality-aware lookup for a moving rover (one call per GPS fix).
+        
+        A rover is almost always still in the county of the previous fix, so:
+        1. Inside the last county's interior box -> same county, no polygon test
+        2. Inside the last county's (prepared) polygon -> same county, no index query
+        3. Otherwise a full lookup (grid table if attached, else STRtree)
+        
+        The interior box is the square inscribed in the circle of clearance
+        around the point where the county was last confirmed, so anything in
+        it is guaranteed to be inside the county.
+        
+        Unlike lookup(), this keeps state between calls - use it for the
+        GPS track only, and lookup() for arbitrary points.
+        
+        Returns:
+            CountyFix with the county and whether it changed since the last call
+        """
+        if not self._is_loaded:
+            raise RuntimeError("Shapefile not loaded. Call load_shapefile() first.")
+        
+        # Snapshot - ensure_coverage() may swap these in from another thread
+        spatial_index, geometries, geom_to_info = (
+            self._spatial_index, self._geometries, self._geom_to_info)
+        
+        last = self._last
+        if last is not None and last.geometries is geometries:
+            box = last.interior_box
+            if box and box[0] <= longitude <= box[2] and box[1] <= latitude <= box[3]:
+                clearance = last.clearance_at(longitude, latitude)
+                return CountyFix(self._last_info, changed=False, fast_path=True,
+                                 boundary_distance_mi=degrees_to_miles(clearance, latitude))
+            
+            if shapely.contains_xy(geometries[last.idx], longitude, latitude):
+                last.measure(longitude, latitude)
+                return CountyFix(self._last_info, changed=False, fast_path=True,
+                                 boundary_distance_mi=degrees_to_miles(last.clearance, latitude))
+        
+        # Full lookup through the grid table / spatial index
+        match = None
+        if spatial_index is not None:
+            match = self._find_index(spatial_index, geometries, latitude, longitude)
+        
+        old_info = self._last_info
+        distance_mi = None
+        if match is None:
+            self._last = None
+            self._last_info = None
+        else:
+            geom = geometries[match]
+            # Prepare lazily - a rover only ever visits a handful of counties
+            shapely.prepare(geom)
+            self._last = _LastCounty(geometries, match, geom.boundary)
+            self._last.measure(longitude, latitude)
+            self._last_info = geom_to_info.get(match)
+            distance_mi = degrees_to_miles(self._last.clearance, latitude)
+        
+        changed = (old_info is None) != (self._last_info is None) or (
+            old_info is not None and old_info.fips != self._last_info.fips)
+        return CountyFix(self._last_info, changed=changed, fast_path=False,
+                         boundary_distance_mi=distance_mi)
+    
+    def boundary_distance(self, latitude: float, longitude: float) -> Tuple[Optional[CountyInfo], Optional[float]]:
+        """
+        Stateless county lookup plus distance to that county's nearest edge.
+        
+        Returns:
+            (CountyInfo, miles) - both None if the point isn't in a loaded county
+        """
+        if not self._is_loaded:
+            raise RuntimeError("Shapefile not loaded. Call load_shapefile() first.")
+        
+        spatial_index, geometries, geom_to_info = (
+            self._spatial_index, self._geometries, self._geom_to_info)
+        if spatial_index is None:
+            return None, None
+        
+        point = Point(longitude, latitude)
+        for idx in spatial_index.query(point):
+            geom = geometries[idx]
+            if geom.contains(point):
+                clearance = float(shapely.distance(geom.boundary, point))
+                return geom_to_info.get(idx), degrees_to_miles(clearance, latitude)
+        return None, None
+    
+    def lookup_many(self, latitudes, longitudes) -> List[Optional[CountyInfo]]:
+        """
+        Look up the counties for many points in one vectorized call.
+        
+        Uses a single STRtree bulk query with a 'within' predicate, so
+        thousands of points (a GPS track, a weekend of QSOs) resolve without
+        a Python-level loop over geometries.
+        
+        Args:
+            latitudes: Sequence / NumPy array of latitudes
+            longitudes: Sequence / NumPy array of longitudes (same length)
+        
+        Returns:
+            List of CountyInfo (or None) in the same order as the input
+        """
+        if not self._is_loaded:
+            raise RuntimeError("Shapefile not loaded. Call load_shapefile() first.")
+        
+        lats = np.asarray(latitudes, dtype=float)
+        lons = np.asarray(longitudes, dtype=float)
+        if lats.shape != lons.shape:
+            raise ValueError("latitudes and longitudes must be the same length")
+        
+        spatial_index, geom_to_info = self._spatial_index, self._geom_to_info
+        if spatial_index is None or lats.size == 0:
+            return [None] * lats.size
+        
+        points = shapely.points(lons, lats)  # shapely uses (x, y) = (lon, lat)
+        point_idx, county_idx = spatial_index.query(points, predicate="within")
+        
+        matches = np.full(lats.size, -1, dtype=np.int64)
+        matches[point_idx] = county_idx
+        return [geom_to_info.get(int(idx)) if idx >= 0 else None for idx in matches]
+    
     def get_counties_in_state(self, state_abbrev: str) -> List[CountyInfo]:
         """Get all counties in a given state"""
         state = state_abbrev.upper()
@@ -0,0 +1,144 @@
+"""
+County Mapping Registry
+
+Maps Census FIPS codes (and county names) to QSO Party county abbreviations
+using the per-state files in data/county_mappings/ (e.g. OK.json):
+
+    { "_metadata": {...}, "40001": { "name": "Adair", "code": "ADA" }, ... }
+
+Every file is parsed once into a FIPS index and a normalized-name index.
+refresh() re-stats the directory and re-reads only files that were added,
+changed or removed, so lookups never touch the disk.
+
+Usage:
+    from modules.county_mappings import CountyMappingRegistry
+    
+    registry = CountyMappingRegistry("data/county_mappings")
+    registry.code_for("OK", "40109")              # "OKL"
+    registry.code_for("OK", None, "Le Flore")     # "LEF"
+"""
+
+import json
+import re
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+DEFAULT_MAPPING_DIR = "data/county_mappings"
+
+# Stripped when normalizing names so "Oklahoma County" matches "Oklahoma"
+_NAME_SUFFIXES = (" COUNTY", " PARISH", " BOROUGH", " MUNICIPALITY",
+                  " CENSUS AREA", " CITY AND BOROUGH")
+
+
+def normalize_county_name(name: str) -> str:
+    """Upper-case, drop punctuation/extra spaces and county suffixes ("St. Mary's Parish" -> "ST MARYS")"""
+    result = re.sub(r"[.']", "", name.upper())
+    result = " ".join(result.replace("-", " ").split())
+    for suffix in _NAME_SUFFIXES:
+        if result.endswith(suffix):
+            result = result[:-len(suffix)]
+            break
+    return result
+
+
+class _StateMapping:
+    """Indexes for one state's mapping file"""
+    
+    def __init__(self, entries: dict, stamp: Tuple[int, int]):
+        self.stamp = stamp  # (size, mtime_ns) of the file when read
+        self.by_fips: Dict[str, dict] = {}
+        self.by_name: Dict[str, dict] = {}
+        for fips, entry in entries.items():
+            if fips.startswith('_') or not isinstance(entry, dict):
+                continue  # _metadata
+            self.by_fips[fips] = entry
+            if entry.get('name'):
+                self.by_name.setdefault(normalize_county_name(entry['name']), entry)
+
+
+class CountyMappingRegistry:
+    """FIPS / county name -> QSO Party abbreviation, for every state file in a directory"""
+    
+    def __init__(self, directory: str = DEFAULT_MAPPING_DIR):
+        self.directory = Path(directory)
+        self._states: Dict[str, _StateMapping] = {}
+        self._lock = threading.Lock()  # Serializes refresh(); lookups read a snapshot
+        self.refresh()
+    
+    @property
+    def states(self):
+        """State abbreviations with a mapping file loaded"""
+        return sorted(self._states)
+    
+    def refresh(self) -> bool:
+        """
+        Re-read mapping files that were added, changed or removed since the last call.
+        
+        Returns:
+            True if any mapping changed
+        """
+        with self._lock:
+            current = self._states
+            updated = {}
+            changed = False
+            
+            for path in sorted(self.directory.glob("*.json")) if self.directory.is_dir() else []:
+                state = path.stem.upper()
+                try:
+                    st = path.stat()
+                except OSError:
+                    continue
+                stamp = (st.st_size, st.st_mtime_ns)
+                
+                existing = current.get(state)
+                if existing is not None and existing.stamp == stamp:
+                    updated[state] = existing
+                    continue
+                
+                try:
+                    with open(path, encoding='utf-8') as f:
+                        updated[state] = _StateMapping(json.load(f), stamp)
+                    changed = True
+                    action = "Reloaded" if existing else "Loaded"
+                    print(f"County Mapping: {action} {path.name} ({len(updated[state].by_fips)} counties)")
+                except (OSError, ValueError) as e:
+                    print(f"County mapping error: {path.name}: {e}")
+                    if existing is not None:
+                        updated[state] = existing  # Keep the last good copy
+            
+            if set(updated) != set(current):
+                changed = True
+            if changed:
+                self._states = updated  # Swap whole dict; readers never see a partial update
+            return changed
+    
+    def entry_for(self, state: str, fips: Optional[str], county_name: Optional[str] = None) -> Optional[dict]:
+        """
+        Find the mapping entry for a county.
+        
+        Args:
+            state: State abbreviation (mapping file name, e.g. "OK")
+            fips: 5-digit county FIPS code, or None
+            county_name: County name used when the FIPS code isn't mapped
+        
+        Returns:
+            Entry dict ({"name": ..., "code": ...}) or None
+        """
+        mapping = self._states.get((state or '').upper())
+        if mapping is None:
+            return None
+        entry = mapping.by_fips.get(fips) if fips else None
+        if entry is None and county_name:
+            entry = mapping.by_name.get(normalize_county_name(county_name))
+        return entry
+    
+    def code_for(self, state: str, fips: Optional[str], county_name: Optional[str] = None) -> Optional[str]:
+        """QSO Party abbreviation for a county (see entry_for), or None"""
+        entry = self.entry_for(state, fips, county_name)
+        return entry.get('code') if entry else None
+    
+    def name_for(self, state: str, fips: Optional[str], default: Optional[str] = None) -> Optional[str]:
+        """County name as spelled in the mapping file (used for MY_CNTY), else default"""
+        entry = self.entry_for(state, fips)
+        return (entry.get('name') or default) if entry else default
@@ -8,39 +8,7 @@ import pynmea2
 import threading
 import time
 
-def latlon_to_grid(lat, lon):
-    """Convert latitude/longitude to Maidenhead grid square (6-character)"""
-    
-    # Adjust longitude
-    lon = lon + 180
-    lat = lat + 90
-    
-    # Field (first pair)
-    field_lon = int(lon / 20)
-    field_lat = int(lat / 10)
-    
-    # Square (second pair)
-    lon = lon - (field_lon * 20)
-    lat = lat - (field_lat * 10)
-    square_lon = int(lon / 2)
-    square_lat = int(lat)
-    
-    # Subsquare (third pair)
-    lon = (lon - (square_lon * 2)) * 12
-    lat = (lat - square_lat) * 24
-    subsquare_lon = int(lon)
-    subsquare_lat = int(lat)
-    
-    grid = (
-        chr(ord('A') + field_lon) +
-        chr(ord('A') + field_lat) +
-        str(square_lon) +
-        str(square_lat) +
-        chr(ord('a') + subsquare_lon) +
-        chr(ord('a') + subsquare_lat)
-    )
-    
-    return grid
+from modules.maidenhead import latlon_to_grid  # Re-exported for existing callers
 
 class GPSMonitor:
     def __init__(self, port, callback, grid_precision=4, lock_callback=None):
@@ -75,8 +43,7 @@ class GPSMonitor:
         
         # If we have a position, recalculate and notify if grid changed
         if self.current_lat and self.current_lon:
-            full_grid = latlon_to_grid(self.current_lat, self.current_lon)
-            new_grid = full_grid[:precision]
+            new_grid = latlon_to_grid(self.current_lat, self.current_lon, precision)
             old_grid = self.current_grid
             
             if new_grid != old_grid:
@@ -127,9 +94,7 @@ class GPSMonitor:
                                     lat = msg.latitude
                                     lon = msg.longitude
                                     
-                                    # Calculate full 6-char grid, then truncate to precision
-                                    full_grid = latlon_to_grid(lat, lon)
-                                    grid = full_grid[:self.grid_precision]
+                                    grid = latlon_to_grid(lat, lon, self.grid_precision)
                                     
                                     # Always update stored position
                                     self.current_lat = lat
@@ -0,0 +1,285 @@
+"""
+Contest Logger Link
+
+One long-lived TCP connection to a contest logger (N1MM+ JTDX port or the
+N3FJP API), shared by the QSO relay thread and the grid updates.
+
+The connection is opened on first use and kept open. Several records can
+be pipelined in one write. A dropped connection is noticed by a health
+check (the peer closing shows up as a readable socket with no data), and
+reconnects use exponential backoff so a logger that is not running is not
+hammered - but a send always makes one immediate attempt, so a QSO is
+never refused just because a background reconnect recently failed.
+
+Replies (N3FJP answers commands) are drained without blocking and passed
+to a callback instead of waiting on recv() after every command.
+
+RelayPacer decides when the relay thread may write next: it backs off
+after failed writes and, for a logger that answers (N3FJP), keeps the gap
+no shorter than the logger's reply time.
+
+Usage:
+    from modules.logger_link import LoggerConnection, RelayPacer
+    
+    n3fjp = LoggerConnection("N3FJP", "127.0.0.1", 1100, response_callback=print)
+    n3fjp.send("<CMD><PROGRAM></CMD>")
+    n1mm = LoggerConnection("N1MM+", "127.0.0.1", 52001)
+    n1mm.send_many([record1, record2, record3])   # One write for the burst
+    n1mm.close()
+    
+    pacer = RelayPacer()
+    time.sleep(pacer.wait_time())
+    pacer.on_success(reply_time) / pacer.on_success() / pacer.on_failure()
+"""
+
+import select
+import socket
+import threading
+import time
+from typing import Callable, Iterable, Optional, Union
+
+CONNECT_TIMEOUT = 2.0
+SEND_TIMEOUT = 5.0
+HEALTH_CHECK_INTERVAL = 5.0   # Seconds between idle liveness checks
+BACKOFF_MIN = 0.5
+BACKOFF_MAX = 30.0
+
+
+class LoggerConnection:
+    """Thread-safe, persistent TCP connection with health checks and reconnect backoff"""
+    
+    def __init__(self, name: str, host: str, port: int,
+                 response_callback: Optional[Callable[[str], None]] = None,
+                 keep_alive: bool = True):
+        """
+        Args:
+            name: Logger name for messages ("N1MM+", "N3FJP")
+            host: Logger host
+            port: Logger TCP port
+            response_callback: Called with text the logger sends back
+            keep_alive: False closes the connection after every send (connection per message)
+        """
+        self.name = name
+        self.host = host
+        self.port = port
+        self.response_callback = response_callback
+        self.keep_alive = keep_alive
+        
+        self._lock = threading.Lock()   # Relay thread, GPS grid updates and Tk all send
+        self._sock = None
+        self._last_used = 0.0
+        self._backoff = 0.0             # Current reconnect delay (0 = connect freely)
+        self._next_attempt = 0.0        # Background reconnects wait until this time
+        self.connects = 0               # Successful connects (reconnect count is connects - 1)
+        self.messages_sent = 0
+    
+    @property
+    def connected(self) -> bool:
+        return self._sock is not None
+    
+    def send(self, message: Union[str, bytes]) -> bool:
+        """
+        Send one message (connecting if needed).
+        
+        Returns:
+            True if it was written to the connection
+        """
+        return self.send_many([message])
+    
+    def send_many(self, messages: Iterable[Union[str, bytes]]) -> bool:
+        """
+        Pipeline several messages in a single write.
+        
+        If the kept-open connection turns out to be dead, the write is
+        retried once on a fresh connection.
+        
+        Returns:
+            True if all of them were written
+        """
+        messages = list(messages)
+        payload = b''.join(m.encode('utf-8') if isinstance(m, str) else m for m in messages)
+        if not payload:
+            return True
+        
+        with self._lock:
+            if self._sock is not None:
+                self._drain()  # Notices a connection the logger closed since the last send
+            for _ in range(2):
+                fresh = self._sock is None
+                if fresh and not self._connect():
+                    return False
+                try:
+                    self._sock.sendall(payload)
+                except OSError as e:
+                    self._drop(f"send failed: {e}")
+                    if not fresh:
+                        continue  # Stale kept-open connection - one try on a new one
+                    return False
+                self._last_used = time.monotonic()
+                self.messages_sent += len(messages)
+                self._drain()
+                if not self.keep_alive:
+                    self._drop()
+                return True
+            return False
+    
+    def poll(self, timeout: float) -> bool:
+        """
+        Wait up to `timeout` seconds for the logger to send something, and
+        pass it to the response callback.
+        
+        Returns:
+            True if anything arrived (or the logger closed the connection)
+        """
+        sock = self._sock
+        if sock is None:
+            return False
+        try:
+            # Wait without the lock so grid updates are not held up meanwhile
+            readable, _, _ = select.select([sock], [], [], timeout)
+        except (OSError, ValueError):
+            readable = True  # Closed meanwhile - _drain notices
+        with self._lock:
+            self._drain()
+        return bool(readable)
+    
+    def check(self) -> bool:
+        """
+        Health check for idle periods: notice a connection the logger has
+        closed, and reconnect (subject to backoff) so the next send is
+        immediate.
+        
+        Returns:
+            True if connected afterwards
+        """
+        if not self._lock.acquire(blocking=False):
+            return self._sock is not None  # A send is in progress
+        try:
+            if self._sock is not None:
+                if time.monotonic() - self._last_used >= HEALTH_CHECK_INTERVAL:
+                    self._drain()
+                    self._last_used = time.monotonic()
+            elif self.keep_alive and time.monotonic() >= self._next_attempt:
+                self._connect(quiet=self._backoff > 0)
+            return self._sock is not None
+        finally:
+            self._lock.release()
+    
+    def close(self):
+        """Close the connection (the next send reconnects)"""
+        with self._lock:
+            self._drop()
+    
+    def _connect(self, quiet: bool = False) -> bool:
+        """Open the connection - caller holds the lock"""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.settimeout(CONNECT_TIMEOUT)
+        try:
+            sock.connect((self.host, self.port))
+        except OSError as e:
+            sock.close()
+            self._backoff = min(BACKOFF_MAX, self._backoff * 2 if self._backoff else BACKOFF_MIN)
+            self._next_attempt = time.monotonic() + self._backoff
+            if not quiet:
+                if isinstance(e, ConnectionRefusedError):
+                    print(f"Logger Link: {self.name} not listening on TCP port {self.port}")
+                else:
+                    print(f"Logger Link: Could not connect to {self.name} at {self.host}:{self.port}: {e}")
+            return False
+        
+        sock.settimeout(SEND_TIMEOUT)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        self._sock = sock
+        self._last_used = 0.0
+        self._backoff = 0.0
+        self._next_attempt = 0.0
+        self.connects += 1
+        if self.keep_alive:
+            print(f"Logger Link: Connected to {self.name} at {self.host}:{self.port}")
+        return True
+    
+    def _drain(self):
+        """Read whatever the logger has sent without blocking - caller holds the lock"""
+        while self._sock is not None:
+            try:
+                readable, _, _ = select.select([self._sock], [], [], 0)
+                if not readable:
+                    return
+                data = self._sock.recv(4096)
+            except (OSError, ValueError) as e:
+                self._drop(f"connection error: {e}")
+                return
+            if not data:
+                self._drop("closed by logger")
+                return
+            if self.response_callback:
+                self.response_callback(data.decode('utf-8', errors='replace'))
+    
+    def _drop(self, reason: Optional[str] = None):
+        """Close the socket - caller holds the lock"""
+        if self._sock is None:
+            return
+        try:
+            self._sock.close()
+        except OSError:
+            pass
+        self._sock = None
+        self._last_used = 0.0
+        if reason:
+            print(f"Logger Link: {self.name} connection {reason}")
+
+
+class RelayPacer:
+    """
+    Decides the gap to leave between relay writes to a logger.
+    
+    Every failure doubles the gap, up to max_gap, which spaces out the
+    retries of the QSOs that failed; the first success afterwards starts
+    again from start_gap, and each further success halves it down to
+    min_gap.
+    
+    A successful write only shows the bytes reached the local socket, not
+    that the logger has processed them. So the gap only tracks the
+    logger's speed when there is a reply to time: on_success(reply_time)
+    (N3FJP answers its API commands) keeps the gap no shorter than the
+    smoothed reply time. N1MM+ sends nothing back, so for N1MM+ the pacer
+    only backs off on failures - writes go out back to back otherwise.
+    """
+    
+    def __init__(self, min_gap: float = 0.02, start_gap: float = 0.1, max_gap: float = 30.0,
+                 retry_gap: float = 0.5):
+        """
+        Args:
+            min_gap: Shortest gap between writes (seconds)
+            start_gap: Gap before anything has been learned
+            max_gap: Longest gap (after repeated failures)
+            retry_gap: Gap after the first failure
+        """
+        self.min_gap = min_gap
+        self.max_gap = max_gap
+        self.retry_gap = retry_gap
+        self.start_gap = start_gap
+        self.gap = start_gap
+        self.latency = 0.0          # Smoothed time the logger takes to reply (0 = no replies timed)
+        self.failures = 0           # Consecutive failed sends
+        self._next_send = 0.0
+    
+    def wait_time(self) -> float:
+        """Seconds until the next write is due (0 = now)"""
+        return max(0.0, self._next_send - time.monotonic())
+    
+    def on_success(self, latency: Optional[float] = None):
+        """A write succeeded; `latency` is the seconds until the logger replied, if it does"""
+        if latency is not None:
+            self.latency = latency if self.latency == 0.0 else 0.8 * self.latency + 0.2 * latency
+        gap = self.start_gap if self.failures else self.gap / 2  # Recovered - drop the retry spacing
+        self.failures = 0
+        self.gap = min(self.max_gap, max(self.min_gap, gap, self.latency))
+        self._next_send = time.monotonic() + self.gap
+    
+    def on_failure(self):
+        """A write failed"""
+        self.failures += 1
+        self.gap = min(self.max_gap, max(self.retry_gap, self.gap * 2))
+        self._next_send = time.monotonic() + self.gap
@@ -0,0 +1,415 @@
+"""
+Maidenhead Grid Locator
+
+Shared grid square math for the GPS monitor, logger updates and QSY tables:
+  - latlon_to_grid / grid_to_latlon at 4, 6, 8 or 10 characters
+  - grid_bounds, grid_neighbors
+  - distance_miles / bearing_deg between points, grid_distance / grid_bearing
+  - *_many batch variants on NumPy arrays (numpy imported on first use)
+
+Characters alternate longitude/latitude in pairs:
+  field (A-R, 20 x 10 deg), square (0-9), subsquare (a-x),
+  extended square (0-9), extended subsquare (a-x)
+
+Usage:
+    from modules.maidenhead import latlon_to_grid, grid_to_latlon, grid_distance
+    
+    latlon_to_grid(35.4676, -97.5164)        # "EM15fl"
+    grid_to_latlon("EM15")                   # (35.5, -97.0) - center of the square
+    grid_distance("EM15", "EM25")            # miles between square centers
+"""
+
+import math
+from collections import OrderedDict
+from functools import lru_cache
+
+EARTH_RADIUS_MI = 3959  # Same radius the rest of Co-Pilot uses
+
+PRECISIONS = (4, 6, 8, 10)
+
+# Divisions per pair (lon and lat split the same way) and the letters/digits used
+_DIVISIONS = (18, 10, 24, 10, 24)
+_ALPHABETS = ("ABCDEFGHIJKLMNOPQR", "0123456789", "abcdefghijklmnopqrstuvwx",
+              "0123456789", "abcdefghijklmnopqrstuvwx")
+
+# Cells per axis at each precision, e.g. 6 chars: 18*10*24 = 4320 across 360 deg of longitude
+_CELLS = {4: 180, 6: 4320, 8: 43200, 10: 1036800}
+
+# Two-character lookup tables: _PAIRS[level][lon_index][lat_index] -> "Em", "15", ...
+_PAIRS = tuple(tuple(tuple(alphabet[x] + alphabet[y] for y in range(n)) for x in range(n))
+               for n, alphabet in zip(_DIVISIONS, _ALPHABETS))
+
+_SUBSQUARES = _PAIRS[2]
+
+# Every 4-character square ("EM15"), indexed by column * 180 + row
+_SQUARES = tuple(_PAIRS[0][x // 10][y // 10] + _PAIRS[1][x % 10][y % 10]
+                 for x in range(180) for y in range(180))
+
+
+def _pair_offsets():
+    """Per level: {pair of characters (any case): (lon, lat) offset in degrees}"""
+    offsets = []
+    size_lon, size_lat = 360.0, 180.0
+    for n, alphabet in zip(_DIVISIONS, _ALPHABETS):
+        size_lon /= n
+        size_lat /= n
+        table = {}
+        for xi, a in enumerate(alphabet):
+            for yi, b in enumerate(alphabet):
+                offset = (xi * size_lon, yi * size_lat)
+                for key in {a + b, a.upper() + b.upper(), a.lower() + b.lower(),
+                            a.upper() + b.lower(), a.lower() + b.upper()}:
+                    table[key] = offset
+        offsets.append(table)
+    return tuple(offsets)
+
+
+_OFFSETS = _pair_offsets()
+
+# (height, width) of a grid square in degrees at each precision
+_SIZES = {length: (180.0 / cells, 360.0 / cells) for length, cells in _CELLS.items()}
+
+
+def latlon_to_grid(lat, lon, precision=6):
+    """
+    Convert latitude/longitude to a Maidenhead grid square.
+    
+    Args:
+        lat: Latitude in degrees
+        lon: Longitude in degrees
+        precision: 4, 6, 8 or 10 characters (default 6)
+    
+    Returns:
+        Grid string, e.g. "EM15fl"
+    """
+    cells = _CELLS.get(precision)
+    if cells is None:
+        raise ValueError(f"Grid precision must be one of {PRECISIONS}, not {precision}")
+    
+    # Cell column/row at this precision (latitude clamps at the poles, longitude wraps)
+    x = int((lon + 180.0) % 360.0 * cells / 360.0)
+    y = int((lat + 90.0) * cells / 180.0)
+    if x >= cells:
+        x = cells - 1
+    if y >= cells:
+        y = cells - 1
+    elif y < 0:
+        y = 0
+    
+    if precision == 4:
+        return _SQUARES[x * 180 + y]
+    if precision == 6:
+        x, xi = divmod(x, 24)
+        y, yi = divmod(y, 24)
+        return _SQUARES[x * 180 + y] + _SUBSQUARES[xi][yi]
+    
+    # Peel pairs off from the finest level, then prepend the 4-character square
+    tail = ""
+    for level in range(precision // 2 - 1, 1, -1):
+        n = _DIVISIONS[level]
+        x, xi = divmod(x, n)
+        y, yi = divmod(y, n)
+        tail = _PAIRS[level][xi][yi] + tail
+    return _SQUARES[x * 180 + y] + tail
+
+
+@lru_cache(maxsize=8192)
+def _decode(grid):
+    """(south, west, height, width) of a grid in any case, or None if invalid (cached)"""
+    try:
+        field = _OFFSETS[0][grid[0:2]]
+        square = _OFFSETS[1][grid[2:4]]
+    except (KeyError, TypeError):
+        # Not a grid, unless it only needed surrounding whitespace removed
+        stripped = grid.strip() if isinstance(grid, str) else ""
+        return _decode(stripped) if stripped and stripped != grid else None
+    
+    lon = field[0] + square[0] - 180.0
+    lat = field[1] + square[1] - 90.0
+    
+    # Finer pairs; a trailing odd character or blanks end the grid
+    length = len(grid)
+    level = 2
+    while level < 5 and 2 * level + 2 <= length:
+        pair = grid[2 * level:2 * level + 2]
+        offset = _OFFSETS[level].get(pair)
+        if offset is None:
+            if pair.strip():
+                return None
+            break
+        lon += offset[0]
+        lat += offset[1]
+        level += 1
+    height, width = _SIZES[2 * level]
+    return lat, lon, height, width
+
+
+def _normalize(grid):
+    """Canonical case (field upper, subsquares lower), trimmed to an even length"""
+    if not grid:
+        return ""
+    grid = grid.strip()
+    grid = grid[:min(len(grid) & ~1, 10)]
+    return grid[:2].upper() + grid[2:4] + grid[4:6].lower() + grid[6:8] + grid[8:10].lower()
+
+
+def is_valid_grid(grid):
+    """True for a well-formed 4, 6, 8 or 10 character grid"""
+    return bool(grid) and len(grid.strip()) in _CELLS and _decode(grid) is not None
+
+
+def grid_bounds(grid):
+    """
+    Bounding box of a grid square.
+    
+    Returns:
+        (south, west, north, east) in degrees, or None if invalid
+    """
+    cell = _decode(grid)
+    if cell is None:
+        return None
+    south, west, height, width = cell
+    return south, west, south + height, west + width
+
+
+def grid_to_latlon(grid):
+    """
+    Convert a Maidenhead grid square to lat/lon (center of the square).
+    
+    Args:
+        grid: 4, 6, 8 or 10 character grid (odd trailing characters are ignored)
+    
+    Returns:
+        (lat, lon) tuple or (None, None) if invalid
+    """
+    cell = _decode(grid)
+    if cell is None:
+        return None, None
+    south, west, height, width = cell
+    return south + height / 2, west + width / 2
+
+
+def grid_neighbors(grid):
+    """
+    The 8 surrounding grids at the same precision (N, NE, E, SE, S, SW, W, NW).
+    
+    Longitude wraps at the antimeridian; rows past a pole are omitted.
+    """
+    grid = _normalize(grid)
+    cell = _decode(grid)
+    if cell is None:
+        return []
+    south, west, height, width = cell
+    precision = len(grid)
+    lat, lon = south + height / 2, west + width / 2
+    neighbors = []
+    for dlat, dlon in ((1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1), (0, -1), (1, -1)):
+        n_lat = lat + dlat * height
+        if not -90.0 < n_lat < 90.0:
+            continue
+        neighbors.append(latlon_to_grid(n_lat, lon + dlon * width, precision))
+    return neighbors
+
+
+def distance_miles(lat1, lon1, lat2, lon2):
+    """Great-circle (haversine) distance in miles between two lat/lon points"""
+    lat1_rad = math.radians(lat1)
+    lat2_rad = math.radians(lat2)
+    a = (math.sin(math.radians(lat2 - lat1) / 2) ** 2 +
+         math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(math.radians(lon2 - lon1) / 2) ** 2)
+    return EARTH_RADIUS_MI * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+def bearing_deg(lat1, lon1, lat2, lon2):
+    """Initial great-circle bearing in degrees (0-360) from point 1 to point 2"""
+    lat1_rad = math.radians(lat1)
+    lat2_rad = math.radians(lat2)
+    delta_lon = math.radians(lon2 - lon1)
+    x = math.sin(delta_lon) * math.cos(lat2_rad)
+    y = (math.cos(lat1_rad) * math.sin(lat2_rad) -
+         math.sin(lat1_rad) * math.cos(lat2_rad) * math.cos(delta_lon))
+    return (math.degrees(math.atan2(x, y)) + 360) % 360
+
+
+def grid_distance(grid1, grid2):
+    """Miles between grid centers, or None if either grid is invalid"""
+    lat1, lon1 = grid_to_latlon(grid1)
+    lat2, lon2 = grid_to_latlon(grid2)
+    if lat1 is None or lat2 is None:
+        return None
+    return distance_miles(lat1, lon1, lat2, lon2)
+
+
+def grid_bearing(grid1, grid2):
+    """Bearing in degrees from grid1's center to grid2's, or None if either is invalid"""
+    lat1, lon1 = grid_to_latlon(grid1)
+    lat2, lon2 = grid_to_latlon(grid2)
+    if lat1 is None or lat2 is None:
+        return None
+    return bearing_deg(lat1, lon1, lat2, lon2)
+
+
+class GridPathCache:
+    """
+    Bounded LRU memo of (miles, bearing) from one origin grid to other grids.
+    
+    Results for a grid pair never change, so table redraws only pay for the
+    math once per station grid. Changing the origin (our current grid)
+    empties the cache.
+    """
+    
+    def __init__(self, maxsize=8192):
+        self.maxsize = maxsize
+        self.origin = None
+        self._origin_latlon = (None, None)
+        self._paths = OrderedDict()  # their grid -> (miles, bearing) or None
+    
+    def set_origin(self, grid):
+        """Measure from this grid from now on (no-op if unchanged)"""
+        if grid == self.origin:
+            return
+        self.origin = grid
+        self._origin_latlon = grid_to_latlon(grid)
+        self._paths.clear()
+    
+    def clear(self):
+        """Forget all cached paths (keeps the origin)"""
+        self._paths.clear()
+    
+    def __len__(self):
+        return len(self._paths)
+    
+    def path_to(self, grid):
+        """
+        Distance and bearing from the origin grid's center to grid's center.
+        
+        Returns:
+            (miles, bearing_deg) tuple, or None if either grid is invalid
+        """
+        paths = self._paths
+        try:
+            paths.move_to_end(grid)
+            return paths[grid]
+        except KeyError:
+            pass
+        
+        my_lat, my_lon = self._origin_latlon
+        their_lat, their_lon = grid_to_latlon(grid)
+        if my_lat is None or their_lat is None:
+            path = None
+        else:
+            path = (distance_miles(my_lat, my_lon, their_lat, their_lon),
+                    bearing_deg(my_lat, my_lon, their_lat, their_lon))
+        paths[grid] = path
+        if len(paths) > self.maxsize:
+            paths.popitem(last=False)  # Least recently used
+        return path
+
+
+# === Batch (NumPy) variants ===
+
+def latlon_to_grid_many(lats, lons, precision=6):
+    """
+    Vectorized latlon_to_grid.
+    
+    Args:
+        lats, lons: Sequences or arrays of equal length
+        precision: 4, 6, 8 or 10 characters
+    
+    Returns:
+        List of grid strings
+    """
+    import numpy as np
+    
+    cells = _CELLS.get(precision)
+    if cells is None:
+        raise ValueError(f"Grid precision must be one of {PRECISIONS}, not {precision}")
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+    x = np.minimum(((lons + 180.0) % 360.0 * cells / 360.0).astype(np.int64), cells - 1)
+    y = np.clip(((lats + 90.0) * cells / 180.0).astype(np.int64), 0, cells - 1)
+    
+    # Character codes for every grid at once, then one view as fixed-width bytes
+    codes = np.empty((len(lats), precision), dtype=np.uint8)
+    for level in range(precision // 2 - 1, -1, -1):
+        n = _DIVISIONS[level]
+        first = np.uint8(ord(_ALPHABETS[level][0]))
+        x, xi = np.divmod(x, n)
+        y, yi = np.divmod(y, n)
+        codes[:, 2 * level] = xi.astype(np.uint8) + first
+        codes[:, 2 * level + 1] = yi.astype(np.uint8) + first
+    return codes.view(f"S{precision}").ravel().astype(str).tolist()
+
+
+def grid_to_latlon_many(grids):
+    """
+    Vectorized grid_to_latlon (same rules: any case, surrounding blanks,
+    odd trailing characters and blank subsquares are ignored).
+    
+    Returns:
+        (lats, lons) float arrays; invalid grids give NaN
+    """
+    import numpy as np
+    
+    # One row of Unicode code points per grid, zero padded to 10 characters
+    cleaned = [grid.strip().upper() if isinstance(grid, str) else '' for grid in grids]
+    text = np.array(cleaned, dtype='U10').reshape(-1)
+    codes = text.view(np.uint32).reshape(len(text), 10).astype(np.int64)
+    lengths = np.char.str_len(text)
+    
+    lats = np.full(len(text), -90.0)
+    lons = np.full(len(text), -180.0)
+    valid = lengths >= 4
+    going = valid.copy()         # Still reading pairs
+    levels = np.zeros(len(text), dtype=np.int64)  # Pairs read
+    size_lon, size_lat = 360.0, 180.0
+    for level, (n, alphabet) in enumerate(zip(_DIVISIONS, _ALPHABETS)):
+        size_lon /= n
+        size_lat /= n
+        pair = codes[:, 2 * level:2 * level + 2]
+        index = pair - ord(alphabet[0].upper())
+        pair_ok = ((index >= 0) & (index < n)).all(axis=1)
+        active = going & (lengths >= 2 * level + 2)
+        if level < 2:
+            valid &= pair_ok  # Field and square are required
+        else:
+            # A blank pair ends the grid; anything else that is not a pair makes it invalid
+            blank = np.isin(pair, (9, 10, 11, 12, 13, 32)).all(axis=1)
+            valid &= ~(active & ~pair_ok & ~blank)
+        step = active & pair_ok & valid
+        lons += np.where(step, index[:, 0] * size_lon, 0.0)
+        lats += np.where(step, index[:, 1] * size_lat, 0.0)
+        levels += step
+        going = step
+    
+    cells = np.array([1, 18, 180, 4320, 43200, 1036800], dtype=np.float64)[levels]
+    lats += 90.0 / cells
+    lons += 180.0 / cells
+    lats[~valid] = np.nan
+    lons[~valid] = np.nan
+    return lats, lons
+
+
+def distance_miles_many(lat, lon, lats, lons):
+    """Haversine miles from one point to arrays of points (NaN in, NaN out)"""
+    import numpy as np
+    
+    lat_rad = math.radians(lat)
+    lats_rad = np.radians(np.asarray(lats, dtype=np.float64))
+    lons = np.asarray(lons, dtype=np.float64)
+    a = (np.sin((lats_rad - lat_rad) / 2) ** 2 +
+         math.cos(lat_rad) * np.cos(lats_rad) * np.sin(np.radians(lons - lon) / 2) ** 2)
+    return EARTH_RADIUS_MI * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+def bearing_deg_many(lat, lon, lats, lons):
+    """Bearings in degrees from one point to arrays of points"""
+    import numpy as np
+    
+    lat_rad = math.radians(lat)
+    lats_rad = np.radians(np.asarray(lats, dtype=np.float64))
+    delta_lon = np.radians(np.asarray(lons, dtype=np.float64) - lon)
+    x = np.sin(delta_lon) * np.cos(lats_rad)
+    y = (math.cos(lat_rad) * np.sin(lats_rad) -
+         math.sin(lat_rad) * np.cos(lats_rad) * np.cos(delta_lon))
+    return (np.degrees(np.arctan2(x, y)) + 360) % 360
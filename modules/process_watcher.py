@@ -0,0 +1,305 @@
+"""
+Process Watcher
+
+Notices when a helper process (WSJT-X's jt9 decoder) exits or a new one
+starts, without forking a process lister every few seconds.
+
+Backends:
+    ProcBackend      Linux: one listdir of /proc per scan (names cached per
+                     PID), and pidfd exit notifications so a jt9 that exits
+                     wakes the watcher at once
+    PsutilBackend    Windows / macOS with psutil installed: psutil's process
+                     table, and wait_procs() for exits
+    TasklistBackend  Windows without psutil: `tasklist` (one fork per scan)
+    FakeProcessBackend  Scripted PIDs for tests
+
+While nothing happens the watcher scans every `interval` seconds (or
+sleeps on the exit notifications). After a watched process exits it scans
+every `restart_interval` seconds for `restart_window` seconds, so the
+replacement that WSJT-X starts is seen within a fraction of a second.
+
+Usage:
+    from modules.process_watcher import ProcessWatcher
+    
+    def on_change(started, exited):
+        print(f"jt9 started {started}, exited {exited}")
+    
+    watcher = ProcessWatcher(('jt9',), on_change)   # Matches jt9 and jt9.exe
+    watcher.start()
+    ...
+    watcher.stop()
+"""
+
+import os
+import select
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional, Set
+
+IDLE_INTERVAL = 2.0       # Seconds between scans while nothing changes
+RESTART_INTERVAL = 0.25   # Seconds between scans just after a watched process exited
+RESTART_WINDOW = 10.0     # How long to scan quickly after an exit
+
+
+def _image_name(name: str) -> str:
+    """Comparable process name: lower case, without .exe"""
+    name = name.strip().lower()
+    return name[:-4] if name.endswith('.exe') else name
+
+
+class ProcBackend:
+    """Linux /proc scanner with pidfd exit notifications"""
+    
+    def __init__(self, proc_root: str = '/proc'):
+        self.proc_root = proc_root
+        self._names: Dict[int, str] = {}   # PID -> image name (a PID's name is read once)
+        self._pidfds: Dict[int, int] = {}  # Watched PID -> pidfd
+    
+    @staticmethod
+    def available() -> bool:
+        return sys.platform.startswith('linux') and os.path.isdir('/proc/self')
+    
+    def scan(self, names: Set[str]) -> Set[int]:
+        """PIDs of running processes whose image name is in `names`"""
+        names_by_pid = {}
+        for entry in os.listdir(self.proc_root):
+            if not entry.isdigit():
+                continue
+            pid = int(entry)
+            name = self._names.get(pid)
+            if name is None:
+                name = self._read_name(pid)
+                if name is None:
+                    continue  # Exited while scanning
+            names_by_pid[pid] = name
+        self._names = names_by_pid
+        return {pid for pid, name in names_by_pid.items() if name in names}
+    
+    def _read_name(self, pid: int) -> Optional[str]:
+        try:
+            with open(f"{self.proc_root}/{pid}/comm", 'r', encoding='utf-8', errors='replace') as f:
+                return _image_name(f.read())
+        except OSError:
+            return None
+    
+    def wait_exit(self, pids: Set[int], timeout: float) -> bool:
+        """
+        Sleep until one of `pids` exits or `timeout` passes.
+        
+        Returns:
+            True if woken by an exit
+        """
+        for pid in list(self._pidfds):
+            if pid not in pids:
+                os.close(self._pidfds.pop(pid))
+        for pid in pids - self._pidfds.keys():
+            try:
+                self._pidfds[pid] = os.pidfd_open(pid)
+            except (AttributeError, OSError):
+                pass  # Python < 3.9, kernel < 5.3 or already gone - the next scan notices
+        if not self._pidfds:
+            time.sleep(timeout)
+            return False
+        readable, _, _ = select.select(list(self._pidfds.values()), [], [], timeout)
+        return bool(readable)
+    
+    def close(self):
+        for fd in self._pidfds.values():
+            os.close(fd)
+        self._pidfds = {}
+
+
+class PsutilBackend:
+    """Cross-platform scanner using psutil"""
+    
+    def __init__(self):
+        import psutil
+        self._psutil = psutil
+        self._procs = {}  # Watched PID -> psutil.Process (for wait_procs)
+    
+    @staticmethod
+    def available() -> bool:
+        try:
+            import psutil  # noqa: F401
+        except ImportError:
+            return False
+        return True
+    
+    def scan(self, names: Set[str]) -> Set[int]:
+        pids = set()
+        # process_iter() caches Process objects between calls, so names are not re-read
+        for proc in self._psutil.process_iter(['name']):
+            name = proc.info.get('name')
+            if name and _image_name(name) in names:
+                pids.add(proc.pid)
+        return pids
+    
+    def wait_exit(self, pids: Set[int], timeout: float) -> bool:
+        procs = []
+        for pid in pids:
+            proc = self._procs.get(pid)
+            if proc is None:
+                try:
+                    proc = self._psutil.Process(pid)
+                except self._psutil.Error:
+                    return True  # Already gone
+            procs.append(proc)
+        self._procs = {proc.pid: proc for proc in procs}
+        if not procs:
+            time.sleep(timeout)
+            return False
+        gone, _ = self._psutil.wait_procs(procs, timeout=timeout)
+        return bool(gone)
+    
+    def close(self):
+        self._procs = {}
+
+
+class TasklistBackend:
+    """Windows fallback without psutil: runs tasklist for every scan"""
+    
+    @staticmethod
+    def available() -> bool:
+        return sys.platform == 'win32'
+    
+    def scan(self, names: Set[str]) -> Set[int]:
+        import subprocess
+        pids = set()
+        for name in names:
+            result = subprocess.run(
+                ['tasklist', '/FI', f'IMAGENAME eq {name}.exe', '/FO', 'CSV', '/NH'],
+                capture_output=True, text=True, timeout=5,
+                creationflags=getattr(subprocess, 'CREATE_NO_WINDOW', 0)
+            )
+            for line in result.stdout.strip().split('\n'):
+                # CSV format: "jt9.exe","1234","Console","1","12,345 K"
+                parts = line.split(',')
+                if len(parts) >= 2 and _image_name(parts[0].strip('"')) == name:
+                    try:
+                        pids.add(int(parts[1].strip().strip('"')))
+                    except ValueError:
+                        pass
+        return pids
+    
+    def wait_exit(self, pids: Set[int], timeout: float) -> bool:
+        time.sleep(timeout)
+        return False
+    
+    def close(self):
+        pass
+
+
+class FakeProcessBackend:
+    """Scripted process table for tests: start()/exit() PIDs by hand"""
+    
+    def __init__(self, processes: Optional[Dict[int, str]] = None):
+        self.processes = dict(processes or {})  # PID -> image name
+        self.scans = 0
+        self._changed = threading.Event()
+        self._lock = threading.Lock()
+    
+    def start(self, pid: int, name: str = 'jt9'):
+        with self._lock:
+            self.processes[pid] = name
+        self._changed.set()
+    
+    def exit(self, pid: int):
+        with self._lock:
+            self.processes.pop(pid, None)
+        self._changed.set()
+    
+    def scan(self, names: Set[str]) -> Set[int]:
+        with self._lock:
+            self.scans += 1
+            return {pid for pid, name in self.processes.items() if _image_name(name) in names}
+    
+    def wait_exit(self, pids: Set[int], timeout: float) -> bool:
+        woken = self._changed.wait(timeout)
+        self._changed.clear()
+        return woken
+    
+    def close(self):
+        pass
+
+
+def default_backend():
+    """Best backend for this platform (None if processes cannot be listed)"""
+    for backend in (ProcBackend, PsutilBackend, TasklistBackend):
+        if backend.available():
+            return backend()
+    return None
+
+
+class ProcessWatcher:
+    """Background thread reporting processes of the given names starting and exiting"""
+    
+    def __init__(self, names: Iterable[str], on_change: Callable[[Set[int], Set[int]], None],
+                 backend=None, interval: float = IDLE_INTERVAL,
+                 restart_interval: float = RESTART_INTERVAL, restart_window: float = RESTART_WINDOW):
+        """
+        Args:
+            names: Process image names to watch ('jt9' also matches jt9.exe)
+            on_change: Called on the watcher thread with (started PIDs, exited PIDs)
+            backend: Process table backend (default_backend() if not given)
+            interval: Seconds between scans while nothing changes
+            restart_interval: Seconds between scans right after an exit
+            restart_window: Seconds to keep scanning quickly after an exit
+        """
+        self.names = {_image_name(name) for name in names}
+        self.on_change = on_change
+        self.backend = backend if backend is not None else default_backend()
+        self.interval = interval
+        self.restart_interval = restart_interval
+        self.restart_window = restart_window
+        self.pids: Set[int] = set()
+        self.running = False
+        self._thread = None
+    
+    @property
+    def available(self) -> bool:
+        return self.backend is not None
+    
+    def start(self) -> bool:
+        """
+        Take the first scan and start the watcher thread.
+        
+        Returns:
+            False if no backend works on this platform
+        """
+        if self.backend is None:
+            return False
+        self.pids = self.backend.scan(self.names)
+        self.running = True
+        self._thread = threading.Thread(target=self._watch_loop, daemon=True)
+        self._thread.start()
+        return True
+    
+    def stop(self):
+        """Stop the watcher (no callbacks after this; the thread exits within one interval)"""
+        self.running = False
+        self._thread = None
+    
+    def _watch_loop(self):
+        quick_until = 0.0  # Scan quickly until this time (a restart is expected)
+        while self.running:
+            try:
+                quick = time.monotonic() < quick_until
+                self.backend.wait_exit(self.pids, self.restart_interval if quick else self.interval)
+                if not self.running:
+                    break
+                
+                current = self.backend.scan(self.names)
+                started = current - self.pids
+                exited = self.pids - current
+                self.pids = current
+                if exited:
+                    quick_until = time.monotonic() + self.restart_window
+                if started:
+                    quick_until = 0.0
+                if started or exited:
+                    self.on_change(started, exited)
+            except Exception as e:
+                print(f"Process Watcher: Error watching {', '.join(sorted(self.names))}: {e}")
+                time.sleep(self.interval)
+        self.backend.close()
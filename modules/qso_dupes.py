@@ -0,0 +1,150 @@
+"""
+QSO Duplicate Detector
+
+Recognizes the same contact arriving more than once from WSJT-X: repeated
+QSO Logged broadcasts, the Logged ADIF message that follows every QSO
+Logged, and rebroadcasts after a Co-Pilot restart (the detector is seeded
+from the daily ADIF logs).
+
+A contact is (call, band, time). Times within a small tolerance match, so
+a QSO Logged (time off to the second) and an ADIF record (possibly only
+HHMM) of the same QSO are recognized as one. Entries older than the
+window are evicted, and the total is capped, so memory stays bounded for
+the whole contest.
+
+Usage:
+    from modules.qso_dupes import QsoDupeDetector
+    
+    dupes = QsoDupeDetector()
+    dupes.seed_from_adif(["logs/n5zy_copilot_20260614.adi"])
+    if dupes.check_and_add("K5TR", "2m", qso_time, source='qso'):
+        print("Duplicate")
+"""
+
+import datetime
+import threading
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from modules.adif import parse_adif_datetime, read_adif_file
+
+DEFAULT_WINDOW_HOURS = 12
+DEFAULT_TOLERANCE_SECONDS = 90
+DEFAULT_MAX_ENTRIES = 50000
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+
+
+def _timestamp(when: datetime.datetime) -> float:
+    """Naive UTC (or aware) datetime -> seconds since the epoch"""
+    if when.tzinfo is not None:
+        when = when.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return (when - _EPOCH).total_seconds()
+
+
+def adif_record_time(record: Dict[str, str]) -> Optional[datetime.datetime]:
+    """QSO time of a parsed ADIF record: date/time off if present, else date/time on"""
+    return (parse_adif_datetime(record.get('qso_date_off'), record.get('time_off'))
+            or parse_adif_datetime(record.get('qso_date'), record.get('time_on')))
+
+
+class QsoDupeDetector:
+    """Thread-safe, time-windowed set of recently logged contacts"""
+    
+    def __init__(self, window_hours: float = DEFAULT_WINDOW_HOURS,
+                 tolerance_seconds: float = DEFAULT_TOLERANCE_SECONDS,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Args:
+            window_hours: Contacts older than this (by QSO time) are forgotten
+            tolerance_seconds: Times this close are the same contact
+            max_entries: Hard cap on remembered contacts (oldest dropped first)
+        """
+        self.window = window_hours * 3600
+        self.tolerance = tolerance_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()  # Listener threads for every WSJT-X port share one detector
+        self._by_contact: Dict[Tuple[str, str], List[Tuple[float, str]]] = {}  # (call, band) -> [(time, source)]
+        self._order = deque()  # (time, (call, band)) in insertion order, for eviction
+    
+    def __len__(self):
+        with self._lock:
+            return len(self._order)
+    
+    @staticmethod
+    def _contact(call: str, band: str) -> Tuple[str, str]:
+        return ((call or '').strip().upper(), (band or '').strip().lower())
+    
+    def check_and_add(self, call: str, band: str, when: Optional[datetime.datetime],
+                      source: str = 'qso', match: Optional[Iterable[str]] = None) -> bool:
+        """
+        Check a contact and remember it (one atomic step).
+        
+        Args:
+            call: Their callsign
+            band: ADIF band ("2m")
+            when: QSO time (naive UTC); None never matches and is not remembered
+            source: What reported it ('qso' = QSO Logged, 'adif' = Logged ADIF, 'log' = ADIF file)
+            match: Sources an earlier report must come from to count as a duplicate
+                   (default: any)
+        
+        Returns:
+            True if this contact was already seen
+        """
+        if when is None:
+            return False
+        t = _timestamp(when)
+        contact = self._contact(call, band)
+        match = None if match is None else set(match)
+        
+        with self._lock:
+            self._evict()
+            if t < self._cutoff():
+                return False  # Too old to track
+            
+            seen = self._by_contact.get(contact)
+            if seen:
+                for seen_t, seen_source in seen:
+                    if abs(seen_t - t) <= self.tolerance and (match is None or seen_source in match):
+                        return True
+            
+            self._by_contact.setdefault(contact, []).append((t, source))
+            self._order.append((t, contact))
+            if len(self._order) > self.max_entries:
+                self._evict()
+            return False
+    
+    def seed_from_adif(self, paths: Iterable[str]) -> int:
+        """
+        Remember the contacts in ADIF files (source 'log') - run at startup.
+        
+        Returns:
+            Number of contacts added
+        """
+        before = len(self)
+        for path in paths:
+            try:
+                for record in read_adif_file(path):
+                    if record.get('call'):
+                        self.check_and_add(record['call'], record.get('band', ''),
+                                           adif_record_time(record), source='log')
+            except OSError as e:
+                print(f"QSO Dupes: Could not read {path}: {e}")
+        return len(self) - before
+    
+    def _cutoff(self) -> float:
+        return _timestamp(datetime.datetime.now(datetime.timezone.utc)) - self.window
+    
+    def _evict(self):
+        """Drop contacts past the window (and beyond max_entries) - caller holds the lock"""
+        cutoff = self._cutoff()
+        order = self._order
+        while order and (order[0][0] < cutoff or len(order) > self.max_entries):
+            t, contact = order.popleft()
+            seen = self._by_contact.get(contact, [])
+            for i, entry in enumerate(seen):
+                if entry[0] == t:
+                    del seen[i]
+                    break
+            if not seen:
+                self._by_contact.pop(contact, None)
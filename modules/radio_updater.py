@@ -5,13 +5,26 @@ Sends grid square updates to WSJT-X instances and contest loggers (N1MM+ or N3FJ
 Implements WSJT-X NetworkMessage protocol without external dependencies
 """
 
+import os
+import queue
+import selectors
 import socket
-import struct
 import datetime
 import threading
 import time
 
+from modules.adif import AdifWriter, parse_records
+from modules.logger_link import LoggerConnection, RelayPacer
+from modules.maidenhead import grid_to_latlon
+from modules.process_watcher import ProcessWatcher
+from modules.qso_dupes import QsoDupeDetector, adif_record_time
+from modules.relay_journal import RelayJournal, relay_key
+from modules.udp_sender import UdpSender
+from modules import wsjtx_protocol
+
 class RadioUpdater:
+    N1MM_ROVERQTH_PORT = 13064  # N1MM+ RoverQTH (v1.0.11082+)
+    
     # WSJT-X Protocol Constants
     MAGIC = 0xADBCCBDA
     SCHEMA = 3  # Schema 3 for WSJT-X 2.x (Qt 5.4+)
@@ -32,6 +45,11 @@ class RadioUpdater:
     MSG_LOGGED_ADIF = 12
     MSG_HIGHLIGHT_CALLSIGN = 13
     
+    # Sends of a QSO to the contest logger before it goes to the dead-letter list
+    RELAY_MAX_ATTEMPTS = 6
+    # Longest wait for N3FJP's reply to a relayed QSO (paces the next write)
+    N3FJP_REPLY_TIMEOUT = 1.0
+    
     @staticmethod
     def to_adif_latitude(latitude):
         """
@@ -56,6 +74,26 @@ class RadioUpdater:
         minutes = (abs_lon - degrees) * 60
         return f"{hemisphere}{degrees:03d} {minutes:06.3f}"
     
+    @staticmethod
+    def from_adif_location(value):
+        """
+        Convert ADIF latitude/longitude (e.g. "N035 28.056", "W097 30.984")
+        back to decimal degrees. Returns None if the value can't be parsed.
+        """
+        try:
+            value = value.strip().upper()
+            hemisphere = value[0]
+            degrees, minutes = value[1:].split()
+            result = int(degrees) + float(minutes) / 60
+        except (AttributeError, IndexError, ValueError):
+            return None
+        
+        if hemisphere in ('S', 'W'):
+            return -result
+        if hemisphere in ('N', 'E'):
+            return result
+        return None
+    
     @staticmethod
     def map_contest_id(contest_name):
         """
@@ -94,7 +132,10 @@ class RadioUpdater:
     
     def __init__(self, wsjt_instances, n1mm_host='127.0.0.1', n1mm_port=52001, 
                  n3fjp_host='127.0.0.1', n3fjp_port=1100, contest_logger='n1mm',
-                 qso_callback=None, location_stamper=None):
+                 qso_callback=None, location_stamper=None, adif_writer=None,
+                 decode_callback=None, status_callback=None, logger_keep_alive=True,
+                 relay_failed_callback=None, relay_journal=None,
+                 process_backend=None):
         """
         Initialize radio updater
         
@@ -107,6 +148,14 @@ class RadioUpdater:
             contest_logger: 'n1mm' or 'n3fjp'
             qso_callback: Function to call when QSO is logged (qso_data dict)
             location_stamper: Function to stamp GPS location onto QSO for ADIF (qso_data) -> qso_data
+            adif_writer: Shared AdifWriter for the daily log (one is created if not given)
+            decode_callback: Function called with each Decode / WSPR Decode / Clear message (dict)
+            status_callback: Function called with each Status message (dict)
+            logger_keep_alive: Keep the N1MM+ / N3FJP TCP connection open between QSOs
+            relay_failed_callback: Function called with a dead-letter entry when a QSO
+                                   could not be relayed to the logger
+            relay_journal: Shared RelayJournal of QSOs waiting for the logger (one is created if not given)
+            process_backend: Process table for the jt9 watcher (platform default if not given)
         """
         self.wsjt_instances = wsjt_instances
         self.n1mm_host = n1mm_host
@@ -117,38 +166,117 @@ class RadioUpdater:
         self.qso_callback = qso_callback
         self.location_stamper = location_stamper  # For GPS-stamping ADIF records
         
+        # Long-lived TCP connections to the contest loggers (opened on first use)
+        self.n1mm_link = LoggerConnection("N1MM+", n1mm_host, n1mm_port, keep_alive=logger_keep_alive)
+        self.n3fjp_link = LoggerConnection("N3FJP", n3fjp_host, n3fjp_port, keep_alive=logger_keep_alive,
+                                           response_callback=self._on_n3fjp_response)
+        
+        # Daily ADIF log - one writer thread for every source of QSOs
+        if adif_writer is None:
+            adif_writer = AdifWriter(os.path.join(os.path.dirname(__file__), '..', 'logs'))
+        self.adif_writer = adif_writer
+        
         # Track WSJT-X instance IDs (learned from HeartBeat packets)
         self.wsjtx_ids = {}  # {port: (wsjtx_id, last_seen)}
         
-        # Track logged QSOs to avoid duplicates
-        self.logged_qsos = set()  # Set of (datetime, callsign, band) tuples
+        # Latest Status message per instance (dial frequency, mode, TX state)
+        self.decode_callback = decode_callback
+        self.status_callback = status_callback
+        self.wsjtx_status = {}  # {wsjtx_id: status message dict}
+        
+        # Track logged QSOs to avoid duplicates (windowed, shared by all listener threads)
+        # Seeded from the recent daily logs so rebroadcasts after a restart are caught
+        self.logged_qsos = QsoDupeDetector()
+        self._seed_logged_qsos()
         
         # QSO relay queue - thread-safe buffer for logger relay
-        import queue
         self.qso_queue = queue.Queue()
         self.relay_thread = None
         
-        # UDP sockets for listening to WSJT-X (one per configured port)
+        # Every QSO is journaled before it is queued, so QSOs the logger has
+        # not taken yet survive a restart or crash (and are never sent twice)
+        if relay_journal is None:
+            relay_journal = RelayJournal(os.path.join(os.path.dirname(__file__), '..', 'logs', 'relay_queue.jsonl'))
+        self.relay_journal = relay_journal
+        self.relay_pacer = RelayPacer()
+        self._n3fjp_reply_at = None  # When N3FJP answered the last relay write (monotonic)
+        
+        # QSOs the logger never took (after RELAY_MAX_ATTEMPTS) - kept for the UI to retry
+        self.relay_failed_callback = relay_failed_callback
+        self.dead_letters = []  # [{'qso': qso_data, 'logger': name, 'reason': str, 'time': datetime}]
+        self._dead_letter_lock = threading.Lock()
+        
+        # UDP sockets for listening to WSJT-X (one per configured port), all
+        # serviced by a single selector thread
         self.listen_socks = []
         self.running = False
-        self.listen_threads = []
+        self.listen_thread = None
+        self._selector = None
+        self._wake_send = None       # Socket pair that interrupts select() on stop
+        self._wake_recv = None
+        self.reply_sock = None       # The outbound socket, while the listener drains it
+        
+        # One long-lived socket (and datagram cache) for LocationChange / RoverQTH
+        self.udp_sender = UdpSender()
         
         # Current grid (for resending after jt9.exe restart)
         self.current_grid = None
         
         # jt9.exe process monitoring
         self.jt9_pids = set()  # Track known jt9.exe PIDs
-        self.jt9_monitor_thread = None
+        self.jt9_watcher = ProcessWatcher(('jt9',), self._on_jt9_change, backend=process_backend)
         
         # Start listening for WSJT-X packets on ALL configured ports
         self.start_listener()
         
-        # Start the N1MM+ relay thread
+        # Start the N1MM+ relay thread (with any QSOs left over from the last run)
+        self._resume_pending_relays()
         self._start_relay_thread()
         
         # Start jt9.exe process monitor
         self._start_jt9_monitor()
     
+    def _seed_logged_qsos(self):
+        """Load contacts from today's and yesterday's ADIF logs into the duplicate detector"""
+        self.adif_writer.flush(timeout=2.0)  # Include records still queued by a previous RadioUpdater
+        now = datetime.datetime.now(datetime.timezone.utc)
+        paths = [self.adif_writer.path_for(now - datetime.timedelta(days=days_ago)) for days_ago in (1, 0)]
+        added = self.logged_qsos.seed_from_adif(path for path in paths if os.path.exists(path))
+        if added:
+            print(f"Radio Update: Loaded {added} recent QSOs for duplicate detection")
+    
+    def _resume_pending_relays(self):
+        """Queue the QSOs the journal still holds (logger not running last time, crash, restart)"""
+        pending = self.relay_journal.pending()
+        for key, qso_data in pending:
+            qso_data = dict(qso_data)
+            qso_data.pop('_relay_attempts', None)
+            qso_data['_relay_key'] = key
+            self.qso_queue.put(qso_data)
+        if pending:
+            print(f"Radio Update: Resuming relay of {len(pending)} QSO(s) from {self.relay_journal.path}")
+    
+    def _journal_and_queue(self, qso_data):
+        """
+        Journal a QSO, then queue it for the relay thread
+        
+        Returns:
+            False if this QSO is already queued or was already relayed
+        """
+        key = relay_key(qso_data)
+        try:
+            added = self.relay_journal.add(key, qso_data)
+        except OSError as e:
+            # Still relay it - it just will not survive a restart
+            print(f"Radio Update: Error writing relay journal: {e}")
+            added = True
+        if not added:
+            print(f"Radio Update: QSO with {qso_data.get('dx_call')} already queued or relayed - not sent again")
+            return False
+        qso_data['_relay_key'] = key
+        self.qso_queue.put(qso_data)
+        return True
+    
     def _start_relay_thread(self):
         """Start the QSO relay thread"""
         self.relay_thread = threading.Thread(target=self._relay_loop, daemon=True)
@@ -158,50 +286,168 @@ class RadioUpdater:
     
     def _relay_loop(self):
         """
-        Relay thread - sends QSOs to contest logger one at a time with delays.
-        This prevents race conditions when multiple WSJT-X instances
-        log QSOs at nearly the same moment.
+        Relay thread - sends QSOs to the contest logger over its kept-open
+        connection. QSOs that arrive together (several radios logging at
+        nearly the same moment) are pipelined in one write, in queue order.
+        
+        Writes are paced by self.relay_pacer: spaced out after failures and,
+        for N3FJP, by how long it takes to answer. A failed batch stays in the
+        outbox and is retried; a QSO that fails RELAY_MAX_ATTEMPTS times
+        moves to the dead-letter list.
         """
         qso_offset = 0  # Offset counter to differentiate same-callsign QSOs
+        outbox = []  # Taken from the queue, not yet delivered (oldest first)
         
         while self.running:
             try:
-                # Wait for a QSO (with timeout so we can check self.running)
-                try:
-                    qso_data = self.qso_queue.get(timeout=1.0)
-                except:
-                    continue
+                if not outbox:
+                    # Wait for a QSO (with timeout so we can check self.running)
+                    try:
+                        outbox.append(self.qso_queue.get(timeout=1.0))
+                    except queue.Empty:
+                        # Idle - make sure the logger connection is still up
+                        self._logger_link().check()
+                        continue
                 
-                # Add offset to differentiate QSOs with same callsign
-                qso_data['_time_offset'] = qso_offset
-                qso_offset += 1
-                if qso_offset > 59:  # Reset after 60 seconds
-                    qso_offset = 0
+                # Not due yet (QSOs keep queuing meanwhile and join this batch)
+                delay = self.relay_pacer.wait_time()
+                if delay > 0:
+                    time.sleep(min(delay, 1.0))
+                    continue
                 
-                # Send to appropriate logger based on configuration
-                if self.contest_logger == 'n3fjp':
-                    success = self._send_qso_to_n3fjp(qso_data)
-                else:
-                    success = self._send_qso_to_n1mm(qso_data)
+                while True:
+                    try:
+                        outbox.append(self.qso_queue.get_nowait())
+                    except queue.Empty:
+                        break
                 
-                # Mark as done
-                self.qso_queue.task_done()
+                for qso_data in outbox:
+                    if '_time_offset' not in qso_data:
+                        # Add offset to differentiate QSOs with same callsign
+                        qso_data['_time_offset'] = qso_offset
+                        qso_offset += 1
+                        if qso_offset > 59:  # Reset after 60 seconds
+                            qso_offset = 0
                 
-                # CRITICAL: Wait before sending next QSO
-                # This gives the logger time to process each QSO
-                remaining = self.qso_queue.qsize()
-                if remaining > 0:
-                    print(f"Radio Update: Waiting 500ms before next QSO ({remaining} remaining in queue)")
-                time.sleep(0.5)
+                outbox = self._relay_batch(outbox)
                 
             except Exception as e:
                 print(f"Radio Update: Relay thread error: {e}")
                 time.sleep(1)
-
+    
+    def _relay_batch(self, batch):
+        """
+        One paced write of QSOs to the logger
+        
+        Returns:
+            The QSOs to try again
+        """
+        link = self._logger_link()
+        messages, ready = [], []
+        for qso_data in batch:
+            if self.relay_journal.is_delivered(qso_data.get('_relay_key')):
+                self.qso_queue.task_done()  # Taken by the logger already (exactly once)
+                continue
+            try:
+                messages.append(self._build_logger_message(qso_data))
+                ready.append(qso_data)
+            except Exception as e:
+                self._dead_letter(qso_data, link.name, f"could not build record: {e}")
+        if not ready:
+            return []
+        
+        print(f"Radio Update: Sending {len(ready)} QSO(s) to {link.name} TCP:{link.port}:")
+        for message in messages:
+            print(f"              {message.strip()}")
+        
+        self._n3fjp_reply_at = None
+        start = time.monotonic()
+        if link.send_many(messages):
+            try:
+                self.relay_journal.mark_done(qso_data['_relay_key'] for qso_data in ready
+                                             if '_relay_key' in qso_data)
+            except OSError as e:
+                print(f"Radio Update: Error writing relay journal: {e}")
+            for qso_data in ready:
+                print(f"Radio Update: ✅ Sent QSO to {link.name} ({qso_data['dx_call']} on {qso_data['band']})")
+                self.qso_queue.task_done()
+            # N1MM+ never answers, so only N3FJP's speed can be measured
+            self.relay_pacer.on_success(self._n3fjp_reply_time(start) if link is self.n3fjp_link else None)
+            return []
+        
+        self.relay_pacer.on_failure()
+        retry = []
+        for qso_data in ready:
+            qso_data['_relay_attempts'] = qso_data.get('_relay_attempts', 0) + 1
+            if qso_data['_relay_attempts'] >= self.RELAY_MAX_ATTEMPTS:
+                self._dead_letter(qso_data, link.name, f"not accepted after {self.RELAY_MAX_ATTEMPTS} attempts")
+            else:
+                retry.append(qso_data)
+        if retry:
+            print(f"Radio Update: ❌ {link.name} did not take {len(retry)} QSO(s) - "
+                  f"retrying in {self.relay_pacer.gap:.1f}s")
+        return retry
+    
+    def _n3fjp_reply_time(self, start):
+        """
+        Seconds from a relay write (at monotonic `start`) to N3FJP's reply
+        
+        Returns:
+            The reply time, N3FJP_REPLY_TIMEOUT if no reply came in time,
+            or None if the connection is gone (nothing to time)
+        """
+        if self._n3fjp_reply_at is None:
+            self.n3fjp_link.poll(self.N3FJP_REPLY_TIMEOUT)
+        if self._n3fjp_reply_at is not None:
+            return max(0.0, self._n3fjp_reply_at - start)
+        return self.N3FJP_REPLY_TIMEOUT if self.n3fjp_link.connected else None
+    
+    def _build_logger_message(self, qso_data):
+        """Record for the configured logger: ADIF for N1MM+, an UPDATEANDLOG command for N3FJP"""
+        if self.contest_logger == 'n3fjp':
+            return f"<CMD>{self._build_n3fjp_qso_command(qso_data)}</CMD>"
+        return self._build_adif_for_n1mm(qso_data)
+    
+    def _dead_letter(self, qso_data, logger_name, reason):
+        """Give up on relaying a QSO - keep it for the UI (relay thread)"""
+        entry = {'qso': qso_data, 'logger': logger_name, 'reason': reason,
+                 'time': datetime.datetime.now(datetime.timezone.utc)}
+        with self._dead_letter_lock:
+            self.dead_letters.append(entry)
+        print(f"Radio Update: ❌ QSO with {qso_data.get('dx_call')} NOT relayed to {logger_name}: {reason}")
+        if self.relay_failed_callback:
+            self.relay_failed_callback(entry)
+        self.qso_queue.task_done()
+    
+    def get_dead_letters(self):
+        """Copy of the QSOs that could not be relayed (oldest first)"""
+        with self._dead_letter_lock:
+            return list(self.dead_letters)
+    
+    def retry_dead_letters(self):
+        """
+        Queue every dead-lettered QSO for relay again
+        
+        Returns:
+            Number of QSOs queued
+        """
+        with self._dead_letter_lock:
+            entries, self.dead_letters = self.dead_letters, []
+        for entry in entries:
+            entry['qso'].pop('_relay_attempts', None)
+            self.qso_queue.put(entry['qso'])
+        if entries:
+            print(f"Radio Update: Retrying {len(entries)} QSO(s) that were not relayed")
+        return len(entries)
+    
+    def _logger_link(self):
+        """Connection to the configured contest logger"""
+        return self.n3fjp_link if self.contest_logger == 'n3fjp' else self.n1mm_link
     
     def start_listener(self):
-        """Start listening for WSJT-X HeartBeat packets on all configured ports"""
+        """Start listening for WSJT-X packets on all configured ports (one selector thread)"""
         self.running = True
+        self._selector = selectors.DefaultSelector()
         
         # Get unique ports from configured instances
         ports = set()
@@ -210,102 +456,85 @@ class RadioUpdater:
             ports.add(port)
             print(f"Radio Update: Config has '{instance.get('name', 'Unknown')}' on UDP port {port}")
         
-        # Start a listener thread for each port
-        for port in ports:
-            thread = threading.Thread(target=self._listen_loop, args=(port,), daemon=True)
-            thread.start()
-            self.listen_threads.append(thread)
-            print(f"Radio Update: Started listener thread for port {port}")
+        for port in sorted(ports):
+            listen_sock = self._open_listen_socket(port)
+            if listen_sock:
+                self.listen_socks.append(listen_sock)
+                self._selector.register(listen_sock, selectors.EVENT_READ, port)
+        
+        # Everything sent to WSJT-X goes out through the shared sender's socket; it is
+        # registered too so errors from a closed WSJT-X port (Windows reports them on recv) are drained
+        self.reply_sock = self.udp_sender.sock
+        self._selector.register(self.reply_sock, selectors.EVENT_READ, None)
+        
+        # Socket pair so stop_listener() wakes the loop immediately
+        self._wake_recv, self._wake_send = socket.socketpair()
+        self._wake_recv.setblocking(False)
+        self._selector.register(self._wake_recv, selectors.EVENT_READ, 'wake')
+        
+        self.listen_thread = threading.Thread(target=self._listen_loop, daemon=True)
+        self.listen_thread.start()
+        print(f"Radio Update: Started listener thread for {len(self.listen_socks)} port(s)")
     
     def stop_listener(self):
-        """Stop the listener threads"""
+        """Stop the listener and relay threads (returns as soon as they have exited)"""
         self.running = False
-        for thread in self.listen_threads:
-            if thread:
-                thread.join(timeout=2)
-        for sock in self.listen_socks:
+        if self._wake_send:
+            try:
+                self._wake_send.send(b'\0')
+            except OSError:
+                pass
+        if self.listen_thread:
+            self.listen_thread.join(timeout=2)
+        if self.relay_thread:
+            # QSOs it had not sent stay in the journal for the next RadioUpdater
+            self.relay_thread.join(timeout=2)
+        
+        for sock in self.listen_socks + [self._wake_recv, self._wake_send]:
             if sock:
                 sock.close()
+        if self._selector:
+            self._selector.close()
+        self.udp_sender.close()
+        self.listen_socks = []
+        self.reply_sock = self._wake_recv = self._wake_send = self._selector = None
+        
+        self.n1mm_link.close()
+        self.n3fjp_link.close()
+        self.jt9_watcher.stop()
     
     def _start_jt9_monitor(self):
-        """Start monitoring jt9.exe processes for restarts"""
-        self.jt9_monitor_thread = threading.Thread(target=self._jt9_monitor_loop, daemon=True)
-        self.jt9_monitor_thread.start()
-        print("Radio Update: Started jt9.exe process monitor")
-    
-    def _get_jt9_pids(self):
-        """Get set of current jt9.exe process IDs"""
-        pids = set()
-        try:
-            import subprocess
-            # Use tasklist on Windows to find jt9.exe processes
-            result = subprocess.run(
-                ['tasklist', '/FI', 'IMAGENAME eq jt9.exe', '/FO', 'CSV', '/NH'],
-                capture_output=True, text=True, timeout=5
-            )
-            for line in result.stdout.strip().split('\n'):
-                if line and 'jt9.exe' in line.lower():
-                    # CSV format: "jt9.exe","1234","Console","1","12,345 K"
-                    parts = line.split(',')
-                    if len(parts) >= 2:
-                        try:
-                            pid = int(parts[1].strip().strip('"'))
-                            pids.add(pid)
-                        except ValueError:
-                            pass
-        except Exception as e:
-            # Silently fail - might not be on Windows or tasklist unavailable
-            pass
-        return pids
-    
-    def _jt9_monitor_loop(self):
-        """Monitor jt9.exe processes and resend grid if they restart"""
-        import time
-        
-        # Initial scan
-        self.jt9_pids = self._get_jt9_pids()
+        """Start watching jt9.exe processes for restarts"""
+        if not self.jt9_watcher.start():
+            print("Radio Update: jt9.exe restart detection unavailable on this system (pip install psutil)")
+            return
+        self.jt9_pids = set(self.jt9_watcher.pids)
         if self.jt9_pids:
             print(f"Radio Update: Found {len(self.jt9_pids)} jt9.exe process(es): {self.jt9_pids}")
-        
-        while self.running:
-            try:
-                time.sleep(3)  # Check every 3 seconds
-                
-                current_pids = self._get_jt9_pids()
-                
-                # Check for new PIDs (process restarted)
-                new_pids = current_pids - self.jt9_pids
-                gone_pids = self.jt9_pids - current_pids
-                
-                if new_pids and self.current_grid:
-                    print(f"Radio Update: jt9.exe restarted! New PID(s): {new_pids}, Gone: {gone_pids}")
-                    print(f"Radio Update: Resending grid {self.current_grid} to all WSJT-X instances...")
-                    
-                    # Wait a moment for WSJT-X to stabilize after mode change
-                    time.sleep(2)
-                    
-                    # Resend grid to all instances
-                    self._resend_grid_to_all()
-                
-                self.jt9_pids = current_pids
-                
-            except Exception as e:
-                print(f"Radio Update: jt9 monitor error: {e}")
-                time.sleep(5)
+        backend = type(self.jt9_watcher.backend).__name__
+        print(f"Radio Update: Started jt9.exe process monitor ({backend})")
+    
+    def _on_jt9_change(self, started, exited):
+        """jt9.exe started or exited (process watcher thread) - resend the grid after a restart"""
+        self.jt9_pids = set(self.jt9_watcher.pids)
+        if started and self.current_grid:
+            print(f"Radio Update: jt9.exe restarted! New PID(s): {started}, Gone: {exited}")
+            print(f"Radio Update: Resending grid {self.current_grid} to all WSJT-X instances...")
+            
+            # Wait a moment for WSJT-X to stabilize after mode change
+            time.sleep(2)
+            
+            # Resend grid to all instances
+            self._resend_grid_to_all()
     
     def _resend_grid_to_all(self):
         """Resend current grid to all discovered WSJT-X instances"""
         if not self.current_grid:
             return
-        
-        for source_port, (wsjtx_id, last_seen) in self.wsjtx_ids.items():
-            try:
-                self._send_wsjt_location(wsjtx_id, source_port, self.current_grid)
-            except Exception as e:
-                print(f"Radio Update: Error resending to '{wsjtx_id}': {e}")
+        self._send_wsjt_locations(self.current_grid)
     
-    def _listen_loop(self, port):
-        """Listen for WSJT-X HeartBeat packets on a specific port"""
+    def _open_listen_socket(self, port):
+        """Bind a non-blocking UDP socket for WSJT-X broadcasts on a port (None on failure)"""
         try:
             listen_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
             listen_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
@@ -318,63 +547,113 @@ class RadioUpdater:
             
             # Bind to all interfaces on the specified port
             listen_sock.bind(('', port))
-            listen_sock.settimeout(1.0)
-            self.listen_socks.append(listen_sock)
+            listen_sock.setblocking(False)
             
             print(f"Radio Update: Listening for WSJT-X broadcasts on port {port}")
+            return listen_sock
+        
+        except Exception as e:
+            print(f"Radio Update: Could not start listener on port {port}: {e}")
+            return None
+    
+    def _listen_loop(self):
+        """Service every WSJT-X port from one thread until stop_listener()"""
+        while self.running:
+            try:
+                events = self._selector.select()
+            except (OSError, ValueError) as e:
+                if self.running:
+                    print(f"Radio Update: Listener select error: {e}")
+                    time.sleep(1)
+                continue
             
-            while self.running:
-                try:
-                    data, addr = listen_sock.recvfrom(4096)
-                    
-                    # Extract source port - THIS is where WSJT-X is listening!
-                    source_ip, source_port = addr
-                    
-                    # Try to parse packet
+            for key, _ in events:
+                if key.data == 'wake':
+                    return
+                
+                # Drain every datagram waiting on this socket
+                while True:
                     try:
-                        msg_type, wsjtx_id = self._parse_packet_header(data)
-                        
-                        # If it's a HeartBeat, save the ID AND source port
-                        if msg_type == self.MSG_HEARTBEAT:
-                            # Match this to a configured instance by port
-                            # For now, just save it with the source port as key
-                            if source_port not in self.wsjtx_ids:
-                                print(f"Radio Update: Discovered WSJT-X instance '{wsjtx_id}' listening on port {source_port}")
-                            
-                            self.wsjtx_ids[source_port] = (wsjtx_id, time.time())
-                        
-                        # If it's a QSO Logged message, parse and relay
-                        elif msg_type == self.MSG_QSO_LOGGED:
-                            try:
-                                qso_data = self._parse_qso_logged(data)
-                                if qso_data:
-                                    self._handle_qso_logged(qso_data, wsjtx_id)
-                            except Exception as e:
-                                print(f"Radio Update: Error parsing QSO Logged: {e}")
-                        
-                        # If it's an ADIF Logged message, also handle it
-                        elif msg_type == self.MSG_LOGGED_ADIF:
-                            try:
-                                adif_data = self._parse_adif_logged(data)
-                                if adif_data:
-                                    self._handle_adif_logged(adif_data, wsjtx_id)
-                            except Exception as e:
-                                print(f"Radio Update: Error parsing ADIF Logged: {e}")
+                        data, addr = key.fileobj.recvfrom(4096)
+                    except (BlockingIOError, InterruptedError):
+                        break
+                    except OSError as e:
+                        # ICMP port unreachable etc. - reply socket errors are expected
+                        if self.running and key.data is not None:
+                            print(f"Radio Update: Error in listener on port {key.data}: {e}")
+                        break
                     
-                    except Exception as e:
-                        # Ignore packets we can't parse
-                        pass
-                
-                except socket.timeout:
-                    # No data, continue
-                    pass
-                except Exception as e:
-                    if self.running:  # Only print errors if we're still supposed to be running
-                        print(f"Radio Update: Error in listener on port {port}: {e}")
-                        time.sleep(1)
+                    if key.data is not None:
+                        self._handle_packet(data, addr, key.data)
+    
+    def _handle_packet(self, data, addr, listen_port=None):
+        """Decode one WSJT-X datagram and dispatch it by message type"""
+        try:
+            message = wsjtx_protocol.decode_message(data)
+        except ValueError:
+            return  # Ignore packets we can't parse
         
-        except Exception as e:
-            print(f"Radio Update: Could not start listener on port {port}: {e}")
+        # Extract source port - THIS is where WSJT-X is listening!
+        message['source_port'] = addr[1]
+        message['listen_port'] = listen_port
+        
+        handler = self._message_handlers.get(message['type'])
+        if handler:
+            try:
+                handler(self, message)
+            except Exception as e:
+                print(f"Radio Update: Error handling {message['name']} from '{message['id']}': {e}")
+    
+    def _on_heartbeat(self, message):
+        """HeartBeat: save the instance ID AND the port it listens on"""
+        source_port = message['source_port']
+        if source_port not in self.wsjtx_ids:
+            print(f"Radio Update: Discovered WSJT-X instance '{message['id']}' listening on port {source_port}")
+        self.wsjtx_ids[source_port] = (message['id'], time.time())
+    
+    def _on_status(self, message):
+        """Status: dial frequency, mode and TX state (sent on every change)"""
+        dial_hz = message.get('dial_frequency')
+        message['band'] = self._freq_to_band(dial_hz / 1_000_000) if dial_hz else ''
+        self.wsjtx_status[message['id']] = message
+        if self.status_callback:
+            self.status_callback(message)
+    
+    def _on_decode(self, message):
+        """Decode / WSPR Decode / Clear: tag with the instance's band and pass on"""
+        status = self.wsjtx_status.get(message['id'], {})
+        message['band'] = status.get('band', '')
+        message['dial_frequency'] = status.get('dial_frequency')
+        message['de_call'] = status.get('de_call', '')
+        if self.decode_callback:
+            self.decode_callback(message)
+    
+    def _on_close(self, message):
+        """Close: WSJT-X is shutting down - forget the instance"""
+        print(f"Radio Update: WSJT-X instance '{message['id']}' closed")
+        self.wsjtx_status.pop(message['id'], None)
+        for port, (wsjtx_id, last_seen) in list(self.wsjtx_ids.items()):
+            if wsjtx_id == message['id']:
+                del self.wsjtx_ids[port]
+    
+    def _on_qso_logged(self, message):
+        qso_data = self._qso_data_from_message(message)
+        self._handle_qso_logged(qso_data, message['id'])
+    
+    def _on_logged_adif(self, message):
+        adif_data = {'wsjtx_id': message['id'], 'adif_record': message['adif_text'] or ''}
+        self._handle_adif_logged(adif_data, message['id'])
+    
+    _message_handlers = {
+        wsjtx_protocol.MSG_HEARTBEAT: _on_heartbeat,
+        wsjtx_protocol.MSG_STATUS: _on_status,
+        wsjtx_protocol.MSG_DECODE: _on_decode,
+        wsjtx_protocol.MSG_WSPR_DECODE: _on_decode,
+        wsjtx_protocol.MSG_CLEAR: _on_decode,
+        wsjtx_protocol.MSG_CLOSE: _on_close,
+        wsjtx_protocol.MSG_QSO_LOGGED: _on_qso_logged,
+        wsjtx_protocol.MSG_LOGGED_ADIF: _on_logged_adif,
+    }
     
     def _parse_packet_header(self, data):
         """
@@ -383,18 +662,7 @@ class RadioUpdater:
         Returns:
             (msg_type, wsjtx_id)
         """
-        if len(data) < 12:
-            raise ValueError("Packet too short")
-        
-        # Parse header: Magic (4) + Schema (4) + Type (4)
-        magic, schema, msg_type = struct.unpack('>III', data[0:12])
-        
-        if magic != self.MAGIC:
-            raise ValueError("Invalid magic number")
-        
-        # Parse ID (QString)
-        wsjtx_id, _ = self._decode_qstring(data, 12)
-        
+        msg_type, _, wsjtx_id = wsjtx_protocol.decode_header(data)
         return msg_type, wsjtx_id
     
     def update_grid(self, grid_square):
@@ -417,13 +685,7 @@ class RadioUpdater:
             print("Radio Update: WARNING - No WSJT-X instances discovered yet!")
             print("              Make sure WSJT-X is running and broadcasting heartbeats")
         else:
-            for source_port, (wsjtx_id, last_seen) in self.wsjtx_ids.items():
-                try:
-                    # Send to the port where WSJT-X is listening (source port of heartbeat)
-                    self._send_wsjt_location(wsjtx_id, source_port, grid_square)
-                    
-                except Exception as e:
-                    print(f"Radio Update: Error updating '{wsjtx_id}' on port {source_port}: {e}")
+            self._send_wsjt_locations(grid_square)
         
         # Update contest logger (N1MM+ or N3FJP) - always, even if no WSJT-X instances
         try:
@@ -431,74 +693,48 @@ class RadioUpdater:
         except Exception as e:
             print(f"Radio Update: Error updating {self.contest_logger.upper()}: {e}")
     
-    def _send_wsjt_location(self, wsjtx_id, port, grid_square):
+    def _location_packet(self, wsjtx_id, grid_square):
+        """LocationChange datagram for an instance (encoded once per instance and grid)"""
+        return self.udp_sender.cached(
+            ('location', wsjtx_id, grid_square),
+            lambda: wsjtx_protocol.encode_message(self.MSG_LOCATION, wsjtx_id,
+                                                  {'location': grid_square}, schema=self.SCHEMA))
+    
+    def _send_wsjt_locations(self, grid_square):
         """
-        Send location update to WSJT-X via UDP
+        Send LocationChange to every discovered WSJT-X instance in one pass
         
         Args:
-            wsjtx_id: WSJT-X instance identifier
-            port: UDP port to send to
             grid_square: Grid square to set (4 or 6 characters)
         """
-        # Build LocationChange message
-        # Format: Magic + Schema + Type + ID + Location
-        
-        # Send with plain grid square
-        message = struct.pack('>I', self.MAGIC)  # Magic number
-        message += struct.pack('>I', self.SCHEMA)  # Schema version
-        message += struct.pack('>I', self.MSG_LOCATION)  # Message type: LocationChange
-        message += self._encode_qstring(wsjtx_id)  # Application ID
-        message += self._encode_qstring(grid_square)  # Grid square (location)
-        
-        # Send to the port where WSJT-X is listening
-        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        sock.sendto(message, ('127.0.0.1', port))
-        sock.close()
-        
-        print(f"  WSJT-X: Sent LocationChange to '{wsjtx_id}' on port {port} with grid '{grid_square}'")
-    
-    def _encode_qstring(self, text):
-        """
-        Encode a string as QString for WSJT-X protocol
-        
-        QString/utf8 format: 32-bit length (in bytes) + UTF-8 encoded string
-        Special case: 0xFFFFFFFF for null string
-        """
-        if text is None or text == '':
-            # Null string
-            return struct.pack('>I', 0xFFFFFFFF)
-        
-        # Encode as UTF-8
-        encoded = text.encode('utf-8')
-        length = len(encoded)  # Length in BYTES
-        
-        return struct.pack('>I', length) + encoded
+        # Send to the port where each WSJT-X is listening (source port of its heartbeats)
+        instances = [(port, wsjtx_id) for port, (wsjtx_id, last_seen) in list(self.wsjtx_ids.items())]
+        datagrams = [(self._location_packet(wsjtx_id, grid_square), ('127.0.0.1', port))
+                     for port, wsjtx_id in instances]
+        for (port, wsjtx_id), elapsed in zip(instances, self.udp_sender.send_batch(datagrams)):
+            if elapsed is None:
+                error = self.udp_sender.stats()[('127.0.0.1', port)]['last_error']
+                print(f"Radio Update: Error updating '{wsjtx_id}' on port {port}: {error}")
+            else:
+                print(f"  WSJT-X: Sent LocationChange to '{wsjtx_id}' on port {port} with grid '{grid_square}' "
+                      f"({elapsed * 1e6:.0f} us)")
     
-    def _decode_qstring(self, data, offset):
+    def _send_roverqth(self, text):
         """
-        Decode a QString from WSJT-X packet
+        Send a RoverQTH update (grid or county) to N1MM+ over the shared UDP socket
         
         Returns:
-            (string, new_offset)
+            Seconds the send took, or None (error kept in udp_sender.stats())
         """
-        if len(data) < offset + 4:
-            raise ValueError("Not enough data for QString length")
-        
-        length = struct.unpack('>I', data[offset:offset+4])[0]
-        offset += 4
-        
-        if length == 0xFFFFFFFF:
-            # Null string
-            return '', offset
-        
-        if len(data) < offset + length:
-            raise ValueError("Not enough data for QString content")
-        
-        # Decode as UTF-8
-        string = data[offset:offset+length].decode('utf-8')
-        offset += length
-        
-        return string, offset
+        # Per N1MM+ developer: "std xml header and <RoverQTH>FN31</RoverQTH>"
+        packet = self.udp_sender.cached(
+            ('roverqth', text),
+            lambda: (f'<?xml version="1.0" encoding="utf-8"?>'
+                     f'<RoverQTH>{text}</RoverQTH>').encode('utf-8'))
+        return self.udp_sender.send(packet, (self.n1mm_host, self.N1MM_ROVERQTH_PORT))
+    
+    def _roverqth_error(self):
+        return self.udp_sender.stats().get((self.n1mm_host, self.N1MM_ROVERQTH_PORT), {}).get('last_error')
     
     def _send_n1mm_roverqth(self, grid_square):
         """
@@ -507,25 +743,10 @@ class RadioUpdater:
         N1MM+ v1.0.11082+ accepts RoverQTH updates on port 13064
         Format: std XML header + <RoverQTH>grid</RoverQTH>
         """
-        # N1MM+ experimental RoverQTH support (v1.0.11082+)
-        # Port 13064, XML format with RoverQTH tag
-        N1MM_ROVERQTH_PORT = 13064
-        
-        # Per N1MM+ developer: "std xml header and <RoverQTH>FN31</RoverQTH>"
-        xml_message = (
-            f'<?xml version="1.0" encoding="utf-8"?>'
-            f'<RoverQTH>{grid_square}</RoverQTH>'
-        )
-        
-        try:
-            # Create socket and send to the new RoverQTH port
-            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            sock.sendto(xml_message.encode('utf-8'), (self.n1mm_host, N1MM_ROVERQTH_PORT))
-            sock.close()
-            
-            print(f"  N1MM+: Sent RoverQTH '{grid_square}' to UDP port {N1MM_ROVERQTH_PORT}")
-        except Exception as e:
-            print(f"  N1MM+: Error sending RoverQTH: {e}")
+        if self._send_roverqth(grid_square) is None:
+            print(f"  N1MM+: Error sending RoverQTH: {self._roverqth_error()}")
+        else:
+            print(f"  N1MM+: Sent RoverQTH '{grid_square}' to UDP port {self.N1MM_ROVERQTH_PORT}")
     
     def send_n1mm_roverqth_county(self, county_abbrev):
         """
@@ -537,35 +758,36 @@ class RadioUpdater:
         Args:
             county_abbrev: County abbreviation (e.g., 'CAN' for Canadian County, OK)
         """
-        N1MM_ROVERQTH_PORT = 13064
-        
-        xml_message = (
-            f'<?xml version="1.0" encoding="utf-8"?>'
-            f'<RoverQTH>{county_abbrev}</RoverQTH>'
-        )
+        if self._send_roverqth(county_abbrev) is None:
+            print(f"  N1MM+: Error sending county: {self._roverqth_error()}")
+        else:
+            print(f"  N1MM+: Sent county '{county_abbrev}' to UDP port {self.N1MM_ROVERQTH_PORT}")
+    
+    def get_send_stats(self):
+        """
+        Outbound UDP timing per destination
         
-        try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            sock.sendto(xml_message.encode('utf-8'), (self.n1mm_host, N1MM_ROVERQTH_PORT))
-            sock.close()
-            
-            print(f"  N1MM+: Sent county '{county_abbrev}' to UDP port {N1MM_ROVERQTH_PORT}")
-        except Exception as e:
-            print(f"  N1MM+: Error sending county: {e}")
+        Returns:
+            {(host, port): {'sent', 'errors', 'last_us', 'avg_us', 'max_us', 'last_error'}}
+        """
+        return self.udp_sender.stats()
     
     # ==================== N3FJP Methods ====================
     
     def set_logger(self, logger):
         """Change the contest logger ('n1mm' or 'n3fjp')"""
         self.contest_logger = logger
+        # Drop the connection to the logger no longer in use
+        (self.n1mm_link if logger == 'n3fjp' else self.n3fjp_link).close()
         print(f"RadioUpdater: Contest logger set to {logger}")
     
     def _send_n3fjp_command(self, command):
         """
         Send a command to N3FJP via TCP
         
-        N3FJP uses a TCP connection on port 1100 (default)
-        Commands are XML-like: <CMD>...</CMD>
+        N3FJP uses a TCP connection on port 1100 (default), kept open between
+        commands. Commands are XML-like: <CMD>...</CMD>. Responses are read
+        as they arrive (_on_n3fjp_response) instead of waiting for each one.
         
         Args:
             command: The command string (without outer <CMD> tags)
@@ -573,31 +795,18 @@ class RadioUpdater:
         Returns:
             True on success, False on error
         """
-        full_command = f"<CMD>{command}</CMD>"
-        
-        try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(2.0)
-            sock.connect((self.n3fjp_host, self.n3fjp_port))
-            sock.sendall(full_command.encode('utf-8'))
-            
-            # Try to read response (may not always get one)
-            try:
-                response = sock.recv(4096).decode('utf-8')
-                if response:
-                    print(f"  N3FJP: Response: {response[:100]}")  # First 100 chars
-            except socket.timeout:
-                pass  # No response is OK for some commands
-            
-            sock.close()
-            return True  # Success - we sent the command
-            
-        except ConnectionRefusedError:
-            print(f"  N3FJP: Connection refused on port {self.n3fjp_port} - is N3FJP running with API enabled?")
-            return False
-        except Exception as e:
-            print(f"  N3FJP: Error sending command: {e}")
-            return False
+        success = self.n3fjp_link.send(f"<CMD>{command}</CMD>")
+        if not success:
+            print(f"  N3FJP: Could not send command on port {self.n3fjp_port} - is N3FJP running with API enabled?")
+        return success
+    
+    def _on_n3fjp_response(self, response):
+        """Text N3FJP sent back on the API connection"""
+        # First reply after a relay write times it (replies carry no id - one to a grid
+        # command sent in between would be counted instead, which only shortens one gap)
+        if self._n3fjp_reply_at is None:
+            self._n3fjp_reply_at = time.monotonic()
+        print(f"  N3FJP: Response: {response[:100]}")  # First 100 chars
     
     def _send_n3fjp_grid(self, grid_square):
         """
@@ -625,40 +834,12 @@ class RadioUpdater:
         Convert Maidenhead grid square to lat/lon (center of square)
         
         Args:
-            grid: 4 or 6 character grid square (e.g., EM15 or EM15fp)
+            grid: 4-10 character grid square (e.g., EM15 or EM15fp)
             
         Returns:
             (lat, lon) tuple or (None, None) if invalid
         """
-        grid = grid.upper().strip()
-        
-        if len(grid) < 4:
-            return None, None
-        
-        try:
-            # First two characters: field (A-R)
-            lon = (ord(grid[0]) - ord('A')) * 20 - 180
-            lat = (ord(grid[1]) - ord('A')) * 10 - 90
-            
-            # Next two characters: square (0-9)
-            lon += int(grid[2]) * 2
-            lat += int(grid[3]) * 1
-            
-            # If 6-char grid, add subsquare
-            if len(grid) >= 6:
-                lon += (ord(grid[4]) - ord('A')) * (2/24)
-                lat += (ord(grid[5]) - ord('A')) * (1/24)
-                # Center of subsquare
-                lon += (2/24) / 2
-                lat += (1/24) / 2
-            else:
-                # Center of 4-char square
-                lon += 1  # Half of 2 degrees
-                lat += 0.5  # Half of 1 degree
-            
-            return lat, lon
-        except (IndexError, ValueError):
-            return None, None
+        return grid_to_latlon(grid)
     
     def send_n3fjp_qso(self, callsign, band, mode, freq, rst_sent, rst_rcvd, grid, 
                        date_str=None, time_on=None, time_off=None):
@@ -783,9 +964,8 @@ class RadioUpdater:
             f'</contactinfo>'
         )
         
-        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        sock.sendto(xml_message.encode('utf-8'), (self.n1mm_host, self.n1mm_port))
-        sock.close()
+        if self.udp_sender.send(xml_message.encode('utf-8'), (self.n1mm_host, self.n1mm_port)) is None:
+            raise OSError(self.udp_sender.stats()[(self.n1mm_host, self.n1mm_port)]['last_error'])
         
         print(f"  N1MM+: Logged contact with {callsign} on {band}MHz")
     
@@ -796,137 +976,40 @@ class RadioUpdater:
         Returns dict with QSO data or None if parsing fails
         """
         try:
-            offset = 12  # Skip Magic (4) + Schema (4) + Type (4)
-            
-            # Parse ID (QString)
-            wsjtx_id, offset = self._decode_qstring(data, offset)
-            
-            # Parse Date/Time Off (QDateTime)
-            datetime_off, offset = self._decode_qdatetime(data, offset)
-            
-            # Parse DX call (QString)
-            dx_call, offset = self._decode_qstring(data, offset)
-            
-            # Parse DX grid (QString)
-            dx_grid, offset = self._decode_qstring(data, offset)
-            
-            # Parse Tx frequency (quint64) - 8 bytes
-            tx_freq = struct.unpack('>Q', data[offset:offset+8])[0]
-            offset += 8
-            
-            # Parse Mode (QString)
-            mode, offset = self._decode_qstring(data, offset)
-            
-            # Parse Report sent (QString)
-            report_sent, offset = self._decode_qstring(data, offset)
-            
-            # Parse Report received (QString)
-            report_rcvd, offset = self._decode_qstring(data, offset)
-            
-            # Parse Tx power (QString)
-            tx_power, offset = self._decode_qstring(data, offset)
-            
-            # Parse Comments (QString)
-            comments, offset = self._decode_qstring(data, offset)
-            
-            # Parse Name (QString)
-            name, offset = self._decode_qstring(data, offset)
-            
-            # Parse Date/Time On (QDateTime)
-            datetime_on, offset = self._decode_qdatetime(data, offset)
-            
-            # Parse Operator call (QString)
-            operator_call, offset = self._decode_qstring(data, offset)
-            
-            # Parse My call (QString)
-            my_call, offset = self._decode_qstring(data, offset)
-            
-            # Parse My grid (QString)
-            my_grid, offset = self._decode_qstring(data, offset)
-            
-            # Parse Exchange sent (QString)
-            exchange_sent, offset = self._decode_qstring(data, offset)
-            
-            # Parse Exchange received (QString)
-            exchange_rcvd, offset = self._decode_qstring(data, offset)
-            
-            # Parse ADIF propagation mode (QString) - may not be present in older versions
-            adif_prop_mode = ''
-            try:
-                adif_prop_mode, offset = self._decode_qstring(data, offset)
-            except:
-                pass
-            
-            # Convert frequency to MHz and determine band
-            freq_mhz = tx_freq / 1_000_000
-            band = self._freq_to_band(freq_mhz)
-            
-            return {
-                'wsjtx_id': wsjtx_id,
-                'datetime_off': datetime_off,
-                'datetime_on': datetime_on,
-                'dx_call': dx_call,
-                'dx_grid': dx_grid,
-                'freq_hz': tx_freq,
-                'freq_mhz': freq_mhz,
-                'band': band,
-                'mode': mode,
-                'report_sent': report_sent,
-                'report_rcvd': report_rcvd,
-                'tx_power': tx_power,
-                'comments': comments,
-                'name': name,
-                'operator_call': operator_call,
-                'my_call': my_call,
-                'my_grid': my_grid,
-                'exchange_sent': exchange_sent,
-                'exchange_rcvd': exchange_rcvd,
-                'adif_prop_mode': adif_prop_mode
-            }
-            
+            return self._qso_data_from_message(wsjtx_protocol.decode_message(data))
         except Exception as e:
             print(f"Radio Update: Error parsing QSO Logged message: {e}")
-            import traceback
-            traceback.print_exc()
             return None
     
-    def _decode_qdatetime(self, data, offset):
-        """
-        Decode QDateTime from WSJT-X packet
-        
-        QDateTime format:
-        - quint64: Julian day number
-        - quint32: Milliseconds since midnight
-        - quint8: Time spec (0=local, 1=UTC)
-        
-        Returns:
-            (datetime, new_offset)
-        """
-        if len(data) < offset + 13:
-            raise ValueError("Not enough data for QDateTime")
-        
-        # Parse components
-        julian_day = struct.unpack('>Q', data[offset:offset+8])[0]
-        offset += 8
-        
-        msecs = struct.unpack('>I', data[offset:offset+4])[0]
-        offset += 4
-        
-        time_spec = struct.unpack('>B', data[offset:offset+1])[0]
-        offset += 1
-        
-        # Convert Julian day to datetime
-        # Julian day 2440588 = 1970-01-01
-        # Julian day 2451545 = 2000-01-01
-        days_since_epoch = julian_day - 2440588
-        
-        # Calculate datetime
-        dt = datetime.datetime(1970, 1, 1) + datetime.timedelta(
-            days=days_since_epoch,
-            milliseconds=msecs
-        )
-        
-        return dt, offset
+    def _qso_data_from_message(self, message):
+        """Decoded QSO Logged message -> qso_data dict used for ADIF, relay and the UI"""
+        # Convert frequency to MHz and determine band
+        tx_freq = message['tx_frequency'] or 0
+        freq_mhz = tx_freq / 1_000_000
+        band = self._freq_to_band(freq_mhz)
+        
+        return {
+            'wsjtx_id': message['id'],
+            'datetime_off': message['datetime_off'],
+            'datetime_on': message['datetime_on'],
+            'dx_call': message['dx_call'] or '',
+            'dx_grid': message['dx_grid'] or '',
+            'freq_hz': tx_freq,
+            'freq_mhz': freq_mhz,
+            'band': band,
+            'mode': message['mode'] or '',
+            'report_sent': message['report_sent'] or '',
+            'report_rcvd': message['report_received'] or '',
+            'tx_power': message['tx_power'] or '',
+            'comments': message['comments'] or '',
+            'name': message['dx_name'] or '',
+            'operator_call': message['operator_call'] or '',
+            'my_call': message['my_call'] or '',
+            'my_grid': message['my_grid'] or '',
+            'exchange_sent': message['exchange_sent'] or '',
+            'exchange_rcvd': message['exchange_received'] or '',
+            'adif_prop_mode': message['adif_propagation_mode'] or ''
+        }
     
     def _freq_to_band(self, freq_mhz):
         """Convert frequency in MHz to band string"""
@@ -986,19 +1069,14 @@ class RadioUpdater:
         - Notifies callback
         - Queues for N1MM+ relay (sent one at a time with delays)
         """
-        # Create unique key for duplicate detection
-        qso_key = (
-            qso_data['datetime_off'].strftime('%Y%m%d%H%M%S') if qso_data['datetime_off'] else '',
-            qso_data['dx_call'],
-            qso_data['band']
-        )
-        
-        if qso_key in self.logged_qsos:
+        # Duplicate of an earlier QSO Logged, or of a QSO already in the ADIF log
+        # (a Logged ADIF seen first does not count - this message still has to be relayed)
+        if self.logged_qsos.check_and_add(qso_data['dx_call'], qso_data['band'],
+                                          qso_data['datetime_off'] or qso_data.get('datetime_on'),
+                                          source='qso', match=('qso', 'log')):
             print(f"Radio Update: Duplicate QSO ignored: {qso_data['dx_call']} on {qso_data['band']}")
             return
         
-        self.logged_qsos.add(qso_key)
-        
         # Log to console
         print(f"\n{'='*60}")
         print(f"QSO LOGGED from {wsjtx_id}:")
@@ -1020,10 +1098,10 @@ class RadioUpdater:
         # Write to ADIF file (immediate - this is the backup)
         self._write_qso_to_adif(qso_data)
         
-        # Queue for N1MM+ relay (will be sent with delays to prevent race conditions)
-        self.qso_queue.put(qso_data)
-        queue_size = self.qso_queue.qsize()
-        print(f"Radio Update: QSO queued for N1MM+ relay (queue size: {queue_size})")
+        # Journal and queue for N1MM+ relay (survives a restart until the logger has it)
+        if self._journal_and_queue(qso_data):
+            queue_size = self.qso_queue.qsize()
+            print(f"Radio Update: QSO queued for N1MM+ relay (queue size: {queue_size})")
         
         # Notify callback (for UI updates)
         if self.qso_callback:
@@ -1033,39 +1111,11 @@ class RadioUpdater:
                 print(f"Radio Update: Error in QSO callback: {e}")
     
     def _write_qso_to_adif(self, qso_data):
-        """Write QSO to ADIF file for backup/import"""
+        """Write QSO to ADIF file for backup/import (queued to the ADIF writer thread)"""
         try:
-            import os
-            
-            # Get log directory
-            log_dir = os.path.join(os.path.dirname(__file__), '..', 'logs')
-            os.makedirs(log_dir, exist_ok=True)
-            
-            # Generate filename with date
-            today = datetime.datetime.now().strftime('%Y%m%d')
-            adif_path = os.path.join(log_dir, f'n5zy_copilot_{today}.adi')
-            
-            # Check if file exists (need header?)
-            write_header = not os.path.exists(adif_path)
-            
-            with open(adif_path, 'a') as f:
-                if write_header:
-                    # Write ADIF 3.1.4 header
-                    f.write(f"#++++++++++++++++++++++++++++++++++++\n")
-                    f.write(f"#   N5ZY Co-Pilot GPS-stamped log\n")
-                    f.write(f"#   Created: {datetime.datetime.now().strftime('%A, %B %d, %Y')}\n")
-                    f.write(f"#   For LoTW upload via Log4OM\n")
-                    f.write(f"#++++++++++++++++++++++++++++++++++++\n\n")
-                    f.write(f"<adif_ver:5>3.1.4\n")
-                    f.write(f"<programid:12>N5ZY-CoPilot\n")
-                    f.write(f"<programversion:6>1.8.32\n")
-                    f.write(f"<eoh>\n\n")
-                
-                # Build ADIF record
-                record = self._build_adif_record(qso_data)
-                f.write(record + "\n")
-            
-            print(f"Radio Update: QSO written to {adif_path}")
+            record = self._build_adif_record(qso_data)
+            self.adif_writer.write(record)
+            print(f"Radio Update: QSO queued for {self.adif_writer.current_path}")
             
         except Exception as e:
             print(f"Radio Update: Error writing ADIF: {e}")
@@ -1075,9 +1125,9 @@ class RadioUpdater:
         Public method to queue a QSO for relay to N1MM+
         Used by manual QSO entry - ADIF is written separately.
         """
-        self.qso_queue.put(qso_data)
-        queue_size = self.qso_queue.qsize()
-        print(f"Radio Update: Manual QSO queued for N1MM+ relay (queue size: {queue_size})")
+        if self._journal_and_queue(qso_data):
+            queue_size = self.qso_queue.qsize()
+            print(f"Radio Update: Manual QSO queued for N1MM+ relay (queue size: {queue_size})")
     
     def _build_adif_record(self, qso_data):
         """
@@ -1275,113 +1325,51 @@ class RadioUpdater:
         
         return prefix if found_digit else base_call
     
-    def _send_qso_to_n1mm(self, qso_data):
-        """
-        Send a single QSO to N1MM+ via TCP (JTDX protocol)
+    def _build_n3fjp_qso_command(self, qso_data):
+        """UPDATEANDLOG command (without <CMD> tags) for one QSO"""
+        # Extract QSO data
+        call = qso_data['dx_call']
+        grid = qso_data.get('dx_grid', '') or ''
+        mode = qso_data['mode']
+        freq_mhz = qso_data['freq_mhz']
+        rst_sent = qso_data.get('report_sent', '-10') or '-10'
+        rst_rcvd = qso_data.get('report_rcvd', '-10') or '-10'
         
-        Each QSO gets its own TCP connection - connect, send, close.
-        The relay thread handles the 500ms delay between connections.
-        """
-        try:
-            # Build ADIF record for this ONE QSO
-            adif_record = self._build_adif_for_n1mm(qso_data)
-            
-            print(f"Radio Update: Sending to N1MM+ TCP:{self.n1mm_port}:")
-            print(f"              {adif_record.strip()}")
-            
-            # Connect via TCP
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(5.0)
-            
-            try:
-                sock.connect((self.n1mm_host, self.n1mm_port))
-                sock.sendall(adif_record.encode('utf-8'))
-                
-                # Brief pause before closing
-                time.sleep(0.1)
-                
-                print(f"Radio Update: ✅ Sent QSO to N1MM+ ({qso_data['dx_call']} on {qso_data['band']})")
-                return True
-                
-            except ConnectionRefusedError:
-                print(f"Radio Update: ❌ N1MM+ not listening on TCP port {self.n1mm_port}")
-                return False
-            except socket.timeout:
-                print(f"Radio Update: ❌ Timeout connecting to N1MM+")
-                return False
-            finally:
-                sock.close()
-            
-        except Exception as e:
-            print(f"Radio Update: ❌ Error sending to N1MM+: {e}")
-            return False
-    
-    def _send_qso_to_n3fjp(self, qso_data):
-        """
-        Send a single QSO to N3FJP via TCP using UPDATEANDLOG command
+        # Convert band to N3FJP format (just the number, e.g., "2" for 2m)
+        band = qso_data['band']
+        # Remove 'MHz' or 'M' suffix if present
+        band_num = band.replace('MHz', '').replace('M', '').replace('m', '').strip()
         
-        This is the WSJT-X style logging command that N3FJP supports.
-        """
-        try:
-            # Extract QSO data
-            call = qso_data['dx_call']
-            grid = qso_data.get('dx_grid', '') or ''
-            mode = qso_data['mode']
-            freq_mhz = qso_data['freq_mhz']
-            rst_sent = qso_data.get('report_sent', '-10') or '-10'
-            rst_rcvd = qso_data.get('report_rcvd', '-10') or '-10'
-            
-            # Convert band to N3FJP format (just the number, e.g., "2" for 2m)
-            band = qso_data['band']
-            # Remove 'MHz' or 'M' suffix if present
-            band_num = band.replace('MHz', '').replace('M', '').replace('m', '').strip()
-            
-            # Format date and time
-            if qso_data.get('datetime_on'):
-                date_str = qso_data['datetime_on'].strftime('%Y/%m/%d')
-                time_on = qso_data['datetime_on'].strftime('%H:%M')
-            else:
-                import datetime
-                now = datetime.datetime.utcnow()
-                date_str = now.strftime('%Y/%m/%d')
-                time_on = now.strftime('%H:%M')
-            
-            if qso_data.get('datetime_off'):
-                time_off = qso_data['datetime_off'].strftime('%H:%M')
-            else:
-                time_off = time_on
-            
-            # Build UPDATEANDLOG command
-            command = (
-                f"<UPDATEANDLOG>"
-                f"<CALL>{call}</CALL>"
-                f"<BAND>{band_num}</BAND>"
-                f"<MODE>{mode}</MODE>"
-                f"<FREQ>{freq_mhz:.6f}</FREQ>"
-                f"<RSTS>{rst_sent}</RSTS>"
-                f"<RSTR>{rst_rcvd}</RSTR>"
-                f"<GRID>{grid}</GRID>"
-                f"<DATE>{date_str}</DATE>"
-                f"<TIMEON>{time_on}</TIMEON>"
-                f"<TIMEOFF>{time_off}</TIMEOFF>"
-                f"</UPDATEANDLOG>"
-            )
-            
-            print(f"Radio Update: Sending to N3FJP TCP:{self.n3fjp_port}:")
-            print(f"              <CMD>{command}</CMD>")
-            
-            success = self._send_n3fjp_command(command)
-            
-            if success:
-                print(f"Radio Update: ✅ Sent QSO to N3FJP ({call} on {band})")
-                return True
-            else:
-                print(f"Radio Update: ❌ Failed to send QSO to N3FJP")
-                return False
-                
-        except Exception as e:
-            print(f"Radio Update: ❌ Error sending to N3FJP: {e}")
-            return False
+        # Format date and time
+        if qso_data.get('datetime_on'):
+            date_str = qso_data['datetime_on'].strftime('%Y/%m/%d')
+            time_on = qso_data['datetime_on'].strftime('%H:%M')
+        else:
+            now = datetime.datetime.utcnow()
+            date_str = now.strftime('%Y/%m/%d')
+            time_on = now.strftime('%H:%M')
+        
+        if qso_data.get('datetime_off'):
+            time_off = qso_data['datetime_off'].strftime('%H:%M')
+        else:
+            time_off = time_on
+        
+        # Build UPDATEANDLOG command
+        command = (
+            f"<UPDATEANDLOG>"
+            f"<CALL>{call}</CALL>"
+            f"<BAND>{band_num}</BAND>"
+            f"<MODE>{mode}</MODE>"
+            f"<FREQ>{freq_mhz:.6f}</FREQ>"
+            f"<RSTS>{rst_sent}</RSTS>"
+            f"<RSTR>{rst_rcvd}</RSTR>"
+            f"<GRID>{grid}</GRID>"
+            f"<DATE>{date_str}</DATE>"
+            f"<TIMEON>{time_on}</TIMEON>"
+            f"<TIMEOFF>{time_off}</TIMEOFF>"
+            f"</UPDATEANDLOG>"
+        )
+        return command
     
     def _build_adif_for_n1mm(self, qso_data):
         """
@@ -1469,17 +1457,10 @@ class RadioUpdater:
         This message contains the raw ADIF record string
         """
         try:
-            offset = 12  # Skip Magic (4) + Schema (4) + Type (4)
-            
-            # Parse ID (QString)
-            wsjtx_id, offset = self._decode_qstring(data, offset)
-            
-            # Parse ADIF record (QString)
-            adif_record, offset = self._decode_qstring(data, offset)
-            
+            message = wsjtx_protocol.decode_message(data)
             return {
-                'wsjtx_id': wsjtx_id,
-                'adif_record': adif_record
+                'wsjtx_id': message['id'],
+                'adif_record': message['adif_text'] or ''
             }
             
         except Exception as e:
@@ -1495,19 +1476,18 @@ class RadioUpdater:
         print(f"Radio Update: Received ADIF from {wsjtx_id}:")
         print(f"  {adif_data['adif_record'][:100]}...")
         
-        # Append to daily ADIF file
+        # Skip it when the QSO Logged for the same contact (or a rebroadcast) was already logged
+        records = parse_records(adif_data['adif_record'])
+        if records and all(self.logged_qsos.check_and_add(record.get('call', ''), record.get('band', ''),
+                                                          adif_record_time(record), source='adif')
+                           for record in records):
+            print(f"Radio Update: Duplicate ADIF ignored: {records[0].get('call', '?')}")
+            return
+        
+        # Append to daily ADIF file (same writer thread as QSO Logged)
         try:
-            import os
-            log_dir = os.path.join(os.path.dirname(__file__), '..', 'logs')
-            os.makedirs(log_dir, exist_ok=True)
-            
-            today = datetime.datetime.now().strftime('%Y%m%d')
-            adif_path = os.path.join(log_dir, f'n5zy_copilot_{today}.adi')
-            
-            with open(adif_path, 'a') as f:
-                f.write(adif_data['adif_record'] + "\n")
-            
-            print(f"Radio Update: ADIF appended to {adif_path}")
+            self.adif_writer.write(adif_data['adif_record'])
+            print(f"Radio Update: ADIF queued for {self.adif_writer.current_path}")
             
         except Exception as e:
             print(f"Radio Update: Error writing ADIF: {e}")
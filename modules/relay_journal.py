@@ -0,0 +1,191 @@
+"""
+Relay Journal
+
+Write-ahead log for the contest logger relay (logs/relay_queue.jsonl).
+Every QSO is appended (and fsynced) before it is queued for N1MM+ / N3FJP,
+and marked delivered once the logger has taken it. QSOs still pending
+when Co-Pilot closes or crashes are handed back at the next start.
+
+Each QSO has a key (call, band, mode, time). A key is accepted once and
+delivered once: re-queuing a QSO that is pending or already delivered is
+refused, so a WSJT-X rebroadcast or a resume never sends a contact twice.
+(A crash between the logger taking a write and the delivery record
+reaching disk re-sends that batch once.)
+
+The file is one JSON object per line - {"op": "add", "key", "qso"} or
+{"op": "done", "key"}. It only grows while Co-Pilot runs; it is compacted
+(rewritten with just the pending QSOs and recent delivered keys) when it
+is opened and whenever enough history has built up.
+
+Usage:
+    from modules.relay_journal import RelayJournal, relay_key
+    
+    journal = RelayJournal("logs/relay_queue.jsonl")
+    for key, qso_data in journal.pending():
+        relay_queue.put(qso_data)               # Resume after a restart
+    key = relay_key(qso_data)
+    if journal.add(key, qso_data):
+        relay_queue.put(qso_data)
+    ...
+    journal.mark_done([key])
+"""
+
+import datetime
+import json
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Tuple
+
+DEFAULT_JOURNAL_PATH = "logs/relay_queue.jsonl"
+KEEP_DELIVERED = 5000       # Delivered keys kept for exactly-once checks after compaction
+COMPACT_AFTER = 2000        # Journal lines beyond the live entries before compacting
+
+_DATETIME_TAG = '__datetime__'
+
+
+def relay_key(qso_data: Dict) -> str:
+    """Identity of a QSO for exactly-once relay: CALL|band|MODE|YYYYMMDDHHMMSS"""
+    when = qso_data.get('datetime_off') or qso_data.get('datetime_on')
+    stamp = when.strftime('%Y%m%d%H%M%S') if isinstance(when, datetime.datetime) else uuid.uuid4().hex
+    return '|'.join(((qso_data.get('dx_call') or '').upper(), (qso_data.get('band') or '').lower(),
+                     (qso_data.get('mode') or '').upper(), stamp))
+
+
+def _encode_value(value):
+    if isinstance(value, datetime.datetime):
+        return {_DATETIME_TAG: value.isoformat()}
+    return str(value)
+
+
+def _decode_object(obj):
+    if len(obj) == 1 and _DATETIME_TAG in obj:
+        return datetime.datetime.fromisoformat(obj[_DATETIME_TAG])
+    return obj
+
+
+class RelayJournal:
+    """Append-only, fsynced journal of QSOs waiting for the contest logger (thread-safe)"""
+    
+    def __init__(self, path: str = DEFAULT_JOURNAL_PATH, keep_delivered: int = KEEP_DELIVERED):
+        """
+        Args:
+            path: Journal file (created if missing)
+            keep_delivered: Delivered keys remembered for duplicate checks
+        """
+        self.path = path
+        self.keep_delivered = keep_delivered
+        self._lock = threading.Lock()  # Listener thread, Tk (manual QSOs) and the relay thread
+        self._pending: "OrderedDict[str, Dict]" = OrderedDict()  # key -> qso_data, in arrival order
+        self._delivered: "OrderedDict[str, None]" = OrderedDict()  # Oldest first
+        self._lines = 0
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._load()
+        with self._lock:
+            self._compact()
+        if self._pending:
+            print(f"Relay Journal: {len(self._pending)} QSO(s) still waiting for the contest logger")
+    
+    def pending(self) -> List[Tuple[str, Dict]]:
+        """QSOs not yet delivered, oldest first"""
+        with self._lock:
+            return list(self._pending.items())
+    
+    def add(self, key: str, qso_data: Dict) -> bool:
+        """
+        Journal a QSO before it is queued (durable when this returns).
+        
+        Returns:
+            False if the key is already pending or delivered (do not queue it again)
+        """
+        # Relay bookkeeping ('_time_offset', ...) is not part of the QSO
+        qso = {name: value for name, value in qso_data.items() if not name.startswith('_')}
+        with self._lock:
+            if key in self._pending or key in self._delivered:
+                return False
+            self._append([{'op': 'add', 'key': key, 'qso': qso}])
+            self._pending[key] = qso_data
+            return True
+    
+    def mark_done(self, keys: Iterable[str]):
+        """Record QSOs as delivered (one write and fsync for the batch)"""
+        with self._lock:
+            keys = [key for key in keys if key in self._pending]
+            if not keys:
+                return
+            self._append([{'op': 'done', 'key': key} for key in keys])
+            for key in keys:
+                del self._pending[key]
+                self._delivered[key] = None
+            while len(self._delivered) > self.keep_delivered:
+                self._delivered.popitem(last=False)
+            if self._lines - len(self._pending) - len(self._delivered) > COMPACT_AFTER:
+                self._compact()
+    
+    def is_delivered(self, key: str) -> bool:
+        with self._lock:
+            return key in self._delivered
+    
+    def __len__(self):
+        """QSOs pending"""
+        with self._lock:
+            return len(self._pending)
+    
+    def _load(self):
+        """Replay the journal into pending / delivered"""
+        if not os.path.exists(self.path):
+            return
+        bad = 0
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                self._lines += 1
+                try:
+                    entry = json.loads(line, object_hook=_decode_object)
+                    if entry['op'] == 'add':
+                        if entry['key'] not in self._delivered:
+                            self._pending[entry['key']] = entry['qso']
+                    elif entry['op'] == 'done':
+                        self._pending.pop(entry['key'], None)
+                        self._delivered[entry['key']] = None
+                except (ValueError, KeyError, TypeError):
+                    bad += 1  # A line cut short by a crash
+        while len(self._delivered) > self.keep_delivered:
+            self._delivered.popitem(last=False)
+        if bad:
+            print(f"Relay Journal: Skipped {bad} unreadable line(s) in {self.path}")
+    
+    def _append(self, entries):
+        """Append journal lines and fsync - caller holds the lock"""
+        text = ''.join(json.dumps(entry, default=_encode_value) + '\n' for entry in entries)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        self._lines += len(entries)
+    
+    def _compact(self):
+        """Rewrite the journal with only the live entries - caller holds the lock"""
+        if self._lines == len(self._pending) + len(self._delivered):
+            return  # Nothing to drop
+        entries = [{'op': 'done', 'key': key} for key in self._delivered]
+        entries += [{'op': 'add', 'key': key,
+                     'qso': {name: value for name, value in qso.items() if not name.startswith('_')}}
+                    for key, qso in self._pending.items()]
+        temp_path = self.path + '.tmp'
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                for entry in entries:
+                    f.write(json.dumps(entry, default=_encode_value) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+            self._lines = len(entries)
+        except OSError as e:
+            print(f"Relay Journal: Could not compact {self.path}: {e}")
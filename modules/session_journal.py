@@ -0,0 +1,165 @@
+"""
+Session Journal
+
+Small SQLite database (logs/session.db) holding the QSOs of the current
+contest session: the QSO Log table rows and the (my_grid, band, call)
+tuples the QSY Advisor tracks. Each QSO is committed as it is logged, so
+after a crash or restart the session comes back with one indexed query
+instead of re-parsing days of ADIF files.
+
+The ADIF files stay the log of record - "Reload Contest Log" rebuilds the
+journal from them with replace().
+
+Usage:
+    from modules.session_journal import SessionJournal
+    
+    journal = SessionJournal("logs/session.db")
+    entry_id = journal.record(call="K5TR", band="2m", mode="FT8", grid="EM10",
+                              my_grid="EM15", values=("12:00:00", ...))
+    for entry in journal.entries():
+        print(entry.call, entry.values)
+    journal.close()
+"""
+
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Tuple
+
+DEFAULT_JOURNAL_PATH = "logs/session.db"
+DEFAULT_MAX_AGE_DAYS = 4  # Same window as Reload Contest Log (a full contest weekend)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS qsos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    logged_at REAL NOT NULL,
+    call TEXT NOT NULL,
+    band TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    grid TEXT NOT NULL,
+    my_grid TEXT NOT NULL,
+    time_shown TEXT NOT NULL,
+    my_grid_shown TEXT NOT NULL,
+    source TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS qsos_worked ON qsos (my_grid, band, call);
+CREATE INDEX IF NOT EXISTS qsos_logged_at ON qsos (logged_at);
+"""
+
+
+@dataclass
+class JournalEntry:
+    """One journaled QSO"""
+    id: int
+    logged_at: float   # time.time() when journaled
+    call: str
+    band: str          # ADIF band ("2m")
+    mode: str
+    grid: str          # Their grid
+    my_grid: str       # My grid at the time (full precision)
+    values: Tuple[str, ...]  # QSO Log row: (time, call, grid, band, mode, my grid, source)
+
+
+class SessionJournal:
+    """Append-only SQLite journal of the session's QSOs (thread-safe)"""
+    
+    def __init__(self, path: str = DEFAULT_JOURNAL_PATH, max_age_days: float = DEFAULT_MAX_AGE_DAYS):
+        """
+        Args:
+            path: Database file (created if missing)
+            max_age_days: Entries older than this are dropped when the journal is opened
+        """
+        self.path = path
+        self._lock = threading.Lock()  # One connection shared by the listener threads and Tk
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        # WAL + NORMAL: each commit is one sequential append, and a crash loses nothing committed
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        
+        cutoff = time.time() - max_age_days * 86400
+        with self._lock, self._conn:
+            expired = self._conn.execute("DELETE FROM qsos WHERE logged_at < ?", (cutoff,)).rowcount
+        if expired:
+            print(f"Session Journal: Dropped {expired} QSOs older than {max_age_days} days")
+    
+    def record(self, call: str, band: str, mode: str, grid: str, my_grid: str,
+               values: Iterable[str], logged_at: Optional[float] = None) -> int:
+        """
+        Journal one QSO (committed before returning).
+        
+        Args:
+            call, band, mode, grid, my_grid: QSO fields
+            values: QSO Log row as displayed (time, call, grid, band, mode, my grid, source)
+            logged_at: Timestamp (default now)
+        
+        Returns:
+            Entry id (keep it to forget() the QSO later)
+        """
+        row = self._row(call, band, mode, grid, my_grid, values, logged_at)
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO qsos (logged_at, call, band, mode, grid, my_grid, "
+                "time_shown, my_grid_shown, source) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", row)
+            return cursor.lastrowid
+    
+    def replace(self, qsos: Iterable[dict]) -> List[int]:
+        """
+        Replace the whole journal in one transaction (after an ADIF reload).
+        
+        Args:
+            qsos: Dicts with the record() arguments
+        
+        Returns:
+            Entry ids in the order given
+        """
+        rows = [self._row(**qso) for qso in qsos]
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM qsos")
+            ids = []
+            for row in rows:
+                ids.append(self._conn.execute(
+                    "INSERT INTO qsos (logged_at, call, band, mode, grid, my_grid, "
+                    "time_shown, my_grid_shown, source) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", row).lastrowid)
+            return ids
+    
+    @staticmethod
+    def _row(call, band, mode, grid, my_grid, values, logged_at=None):
+        values = tuple(str(v) for v in values)
+        if len(values) != 7:
+            raise ValueError(f"QSO Log row needs 7 values, got {len(values)}")
+        return (time.time() if logged_at is None else logged_at,
+                call or '', band or '', mode or '', grid or '', my_grid or '',
+                values[0], values[5], values[6])
+    
+    def forget(self, entry_ids: Iterable[int]):
+        """Remove entries (QSOs deleted from the display)"""
+        ids = [(entry_id,) for entry_id in entry_ids if entry_id is not None]
+        if ids:
+            with self._lock, self._conn:
+                self._conn.executemany("DELETE FROM qsos WHERE id = ?", ids)
+    
+    def clear(self):
+        """Remove every entry (display cleared)"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM qsos")
+    
+    def entries(self) -> List[JournalEntry]:
+        """All entries, oldest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, logged_at, call, band, mode, grid, my_grid, time_shown, "
+                "my_grid_shown, source FROM qsos ORDER BY id").fetchall()
+        return [JournalEntry(entry_id, logged_at, call, band, mode, grid, my_grid,
+                             (time_shown, call, grid, band, mode, my_grid_shown, source))
+                for entry_id, logged_at, call, band, mode, grid, my_grid, time_shown, my_grid_shown, source in rows]
+    
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM qsos").fetchone()[0]
+    
+    def close(self):
+        """Close the database"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,122 @@
+"""
+Station Search Index
+
+Search index over the QSY Advisor station database
+({call: {'bands': set, 'grids': set, 'last_seen': str, ...}}) so the QSY
+tab can filter thousands of stations per keystroke:
+  - callsign prefix lookup (also matches the part after a "/" - VE3/N5ZY)
+  - grid prefix lookup (EM, EM1, EM15)
+  - band-count buckets for the "Min Bands" filter
+
+Display strings (band list, grid list) are formatted once per station when
+the index is built. Rebuild with StationSearchIndex(stations) whenever the
+database changes.
+
+Usage:
+    from modules.station_index import StationSearchIndex
+    
+    index = StationSearchIndex(qsy_advisor.stations)
+    calls = index.search(call_prefix="N5", grid_prefix="EM1", min_bands=3)
+"""
+
+from bisect import bisect_left
+from typing import Dict, List, Optional
+
+# Band names - wavelength order (longest to shortest)
+BAND_NAMES = {
+    '50': '6m', '144': '2m', '222': '1.25m', '432': '70cm',
+    '902': '33cm', '1296': '23cm', '2304': '13cm', '3456': '9cm',
+    '5760': '5cm', '10368': '3cm', '10G': '3cm',
+    '24G': '1.2cm', '47G': '6mm', '78G': '4mm'
+}
+
+# Sort order for bands (by wavelength, longest first)
+BAND_ORDER = ['50', '144', '222', '432', '902', '1296', '2304', '3456', '5760', '10368', '10G', '24G', '47G', '78G']
+_BAND_RANK = {band: i for i, band in enumerate(BAND_ORDER)}
+
+
+class StationEntry:
+    """Pre-formatted display data for one station"""
+    
+    __slots__ = ('call', 'band_str', 'grid_str', 'band_count', 'first_grid', 'last_seen')
+    
+    def __init__(self, call: str, info: dict):
+        bands = info.get('bands', [])
+        grids = info.get('grids', [])
+        self.call = call
+        sorted_bands = sorted(bands, key=lambda b: _BAND_RANK.get(b, 99))
+        self.band_str = ', '.join(BAND_NAMES.get(b, b) for b in sorted_bands)
+        self.grid_str = ', '.join(sorted(grids)) if grids else ''
+        self.band_count = len(bands)
+        # grids is a set; distance/bearing use whichever grid it yields first
+        self.first_grid = next(iter(grids), None) if grids else None
+        self.last_seen = info.get('last_seen', '')
+
+
+class StationSearchIndex:
+    """Prefix and band-count index over a station dict"""
+    
+    def __init__(self, stations: Dict[str, dict]):
+        self.source_size = len(stations)
+        self.entries: Dict[str, StationEntry] = {}
+        self._order: Dict[str, int] = {}             # Call -> database order
+        call_keys = []                               # (search key, call), sorted
+        grid_keys = []                               # (grid, call), sorted
+        buckets: Dict[int, List[str]] = {}           # Band count -> calls
+        
+        for position, (call, info) in enumerate(stations.items()):
+            entry = StationEntry(call, info)
+            self.entries[call] = entry
+            self._order[call] = position
+            
+            keys = {call.upper()}
+            keys.update(part for part in call.upper().split('/') if len(part) > 2)
+            call_keys.extend((key, call) for key in keys)
+            grid_keys.extend((grid.upper(), call) for grid in info.get('grids', []) if grid)
+            buckets.setdefault(entry.band_count, []).append(call)
+        
+        call_keys.sort()
+        grid_keys.sort()
+        self._call_keys = call_keys
+        self._grid_keys = grid_keys
+        self._buckets = sorted(buckets.items())
+    
+    def __len__(self):
+        return len(self.entries)
+    
+    @staticmethod
+    def _prefix_matches(keys, prefix):
+        """Calls whose key starts with prefix (keys sorted by key)"""
+        matches = set()
+        i = bisect_left(keys, (prefix,))
+        while i < len(keys) and keys[i][0].startswith(prefix):
+            matches.add(keys[i][1])
+            i += 1
+        return matches
+    
+    def search(self, call_prefix: str = '', grid_prefix: str = '', min_bands: int = 1) -> List[str]:
+        """
+        Find stations matching all given filters.
+        
+        Args:
+            call_prefix: Start of the callsign (or of the call after a "/")
+            grid_prefix: Start of any of the station's grids
+            min_bands: Minimum number of bands the station has worked
+        
+        Returns:
+            Matching calls in database order
+        """
+        candidates: Optional[set] = None
+        if call_prefix:
+            candidates = self._prefix_matches(self._call_keys, call_prefix.upper())
+        if grid_prefix and (candidates is None or candidates):
+            grid_matches = self._prefix_matches(self._grid_keys, grid_prefix.upper())
+            candidates = grid_matches if candidates is None else candidates & grid_matches
+        
+        if candidates is None:
+            # No text filters: whole band-count buckets
+            candidates = [call for count, calls in self._buckets if count >= min_bands for call in calls]
+        else:
+            candidates = [call for call in candidates if self.entries[call].band_count >= min_bands]
+        
+        return sorted(candidates, key=self._order.__getitem__)
@@ -0,0 +1,137 @@
+"""
+Outbound UDP
+
+One long-lived UDP socket for the datagrams Co-Pilot sends on its own:
+LocationChange to every WSJT-X instance, RoverQTH (grid or county) to
+N1MM+, and contact info to N1MM+. A grid change reaches every WSJT-X
+instance in one pass over the shared socket, so no socket is created and
+closed for each message.
+
+Encoded datagrams are cached by key (e.g. instance Id and grid), because
+a rover sends the same few messages again and again: after every jt9
+restart, and every time it crosses back into a grid. Every sendto() is
+timed per destination, so a destination that is slow to accept datagrams
+shows up in stats().
+
+Usage:
+    from modules.udp_sender import UdpSender
+    
+    sender = UdpSender()
+    packet = sender.cached(('location', wsjtx_id, grid), lambda: build(wsjtx_id, grid))
+    sender.send_batch([(packet, ('127.0.0.1', 2237)), (roverqth, ('127.0.0.1', 13064))])
+    print(sender.stats())   # {('127.0.0.1', 2237): {'sent': 1, 'avg_us': 18.5, ...}}
+    sender.close()
+"""
+
+import socket
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+Address = Tuple[str, int]
+
+CACHE_SIZE = 256  # Encoded datagrams kept (instances x recent grids / counties)
+
+
+class UdpSender:
+    """Shared, thread-safe outbound UDP socket with a datagram cache and per-destination timing"""
+    
+    def __init__(self, cache_size: int = CACHE_SIZE):
+        """
+        Args:
+            cache_size: Encoded datagrams to keep (least recently used are dropped)
+        """
+        self.cache_size = cache_size
+        self._lock = threading.Lock()   # GPS thread, jt9 watcher and Tk all send
+        self._sock = None
+        self._cache: "OrderedDict[Hashable, bytes]" = OrderedDict()
+        self._stats: Dict[Address, Dict] = {}
+    
+    @property
+    def sock(self) -> socket.socket:
+        """The shared socket (opened on first use, and again after close())"""
+        with self._lock:
+            return self._open()
+    
+    def _open(self) -> socket.socket:
+        """Caller holds the lock"""
+        if self._sock is None:
+            self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self._sock.setblocking(False)
+        return self._sock
+    
+    def cached(self, key: Hashable, build: Callable[[], bytes]) -> bytes:
+        """Encoded datagram for `key`, built by `build()` the first time"""
+        with self._lock:
+            packet = self._cache.get(key)
+            if packet is not None:
+                self._cache.move_to_end(key)
+                return packet
+        packet = build()
+        with self._lock:
+            self._cache[key] = packet
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return packet
+    
+    def send(self, packet: bytes, address: Address) -> Optional[float]:
+        """
+        Send one datagram.
+        
+        Returns:
+            Seconds sendto() took, or None if it failed
+        """
+        return self.send_batch([(packet, address)])[0]
+    
+    def send_batch(self, datagrams: Iterable[Tuple[bytes, Address]]) -> list:
+        """
+        Send several datagrams in one pass.
+        
+        Returns:
+            Per datagram, the seconds sendto() took, or None if it failed
+            (the error is kept in stats() under its destination)
+        """
+        results = []
+        with self._lock:
+            sock = self._open()
+            for packet, address in datagrams:
+                start = time.perf_counter()
+                try:
+                    sock.sendto(packet, address)
+                except OSError as e:
+                    self._record(address, None, e)
+                    results.append(None)
+                    continue
+                elapsed = time.perf_counter() - start
+                self._record(address, elapsed)
+                results.append(elapsed)
+        return results
+    
+    def _record(self, address, elapsed, error=None):
+        """Update a destination's counters - caller holds the lock"""
+        stats = self._stats.get(address)
+        if stats is None:
+            stats = self._stats[address] = {'sent': 0, 'errors': 0, 'last_us': 0.0, 'avg_us': 0.0,
+                                             'max_us': 0.0, 'last_error': None}
+        if error is not None:
+            stats['errors'] += 1
+            stats['last_error'] = str(error)
+            return
+        micros = elapsed * 1e6
+        stats['avg_us'] = micros if stats['sent'] == 0 else 0.9 * stats['avg_us'] + 0.1 * micros
+        stats['sent'] += 1
+        stats['last_us'] = micros
+        stats['max_us'] = max(stats['max_us'], micros)
+    
+    def stats(self) -> Dict[Address, Dict]:
+        """Per destination: sent, errors, last_us / avg_us (smoothed) / max_us send time, last_error"""
+        with self._lock:
+            return {address: dict(stats) for address, stats in self._stats.items()}
+    
+    def close(self):
+        """Close the socket (the cache and stats are kept; the next send reopens it)"""
+        with self._lock:
+            if self._sock is not None:
+                self._sock.close()
+                self._sock = None
@@ -0,0 +1,345 @@
+"""
+Virtual Table
+
+Keeps table rows in a Python model and lets a ttk.Treeview show only the
+rows that fit on screen. The Treeview holds one item per visible line and
+those items are reused as the table scrolls, so loading, filtering or
+sorting tens of thousands of rows costs the same Tk work as a single
+screenful.
+
+The model supports sorting, filtering, inserting at the top (newest-first
+logs) and trimming. Selection is tracked on rows, not Treeview items, so it
+survives scrolling and re-sorting.
+
+Usage:
+    from modules.virtual_table import VirtualTable, TableRow
+    
+    tree = ttk.Treeview(frame, columns=columns, show='headings', height=15)
+    scrollbar = ttk.Scrollbar(frame, orient=tk.VERTICAL)
+    table = VirtualTable(tree, scrollbar, on_select=self.on_row_select)
+    
+    table.insert(TableRow(("12:00", "N5ZY", "EM15")), index=0)
+    table.set_rows([TableRow(values, key=call) for call, values in rows])
+    table.sort(key=lambda row: row.values[1])
+    for row in table.selected_rows():
+        print(row.values)
+"""
+
+from typing import Callable, Iterable, List, Optional
+
+DEFAULT_ROW_HEIGHT = 20  # Pixels, until a drawn row can be measured
+
+
+class TableRow:
+    """One table row: display values, Treeview tags and an optional identity key"""
+    
+    __slots__ = ('values', 'tags', 'key', 'data')
+    
+    def __init__(self, values, tags=(), key=None, data=None):
+        """
+        Args:
+            values: Tuple of column values as shown
+            tags: Treeview tags for the row (colors)
+            key: Stable identity (e.g. callsign) - keeps the row selected when
+                 set_rows() replaces the rows with new objects
+            data: Caller payload (e.g. a typed record to sort on)
+        """
+        self.values = tuple(values)
+        self.tags = tuple(tags)
+        self.key = key
+        self.data = data
+
+
+class VirtualTable:
+    """Model-backed ttk.Treeview that only materializes the visible rows"""
+    
+    def __init__(self, tree, scrollbar, on_select: Optional[Callable] = None):
+        """
+        Args:
+            tree: ttk.Treeview (show='headings') - its items are managed here
+            scrollbar: Vertical ttk.Scrollbar for the tree
+            on_select: Called with no arguments when the user changes the selection
+        """
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.on_select = on_select
+        
+        self._rows: List[TableRow] = []          # Model order
+        self._view: List[TableRow] = self._rows  # Filtered + sorted (same list when neither)
+        self._filter: Optional[Callable[[TableRow], bool]] = None
+        self._sort_key: Optional[Callable[[TableRow], object]] = None
+        self._sort_reverse = False
+        
+        self._selected = set()       # Selection keys (row.key, or the row itself)
+        self._cursor = 0             # View index for keyboard navigation
+        self._offset = 0             # View index of the top visible row
+        self._visible = max(1, int(tree.cget('height')))
+        self._row_height = 0         # Measured from a drawn row
+        self._header_height = 0
+        self._slots = []             # Treeview item ids, one per visible line
+        self._shown = []             # (row, values, tags) drawn in each slot
+        self._drawn_selection = set()  # Items we selected (their <<TreeviewSelect>> is not the user)
+        self._draw_pending = False
+        
+        scrollbar.configure(command=self._on_scrollbar)
+        tree.configure(yscrollcommand=lambda *args: None)  # Scrolling is ours, not the tree's
+        tree.bind('<<TreeviewSelect>>', self._on_tree_select, add='+')
+        tree.bind('<Configure>', lambda e: self._fit_rows(e.height), add='+')
+        tree.bind('<MouseWheel>', self._on_mousewheel)
+        tree.bind('<Button-4>', lambda e: self._scroll_by(-3))
+        tree.bind('<Button-5>', lambda e: self._scroll_by(3))
+        for key, step in (('<Up>', -1), ('<Down>', 1), ('<Prior>', 'page_up'), ('<Next>', 'page_down'),
+                          ('<Home>', 'home'), ('<End>', 'end')):
+            tree.bind(key, lambda e, s=step: self._on_key(s))
+    
+    # === Model ===
+    
+    def __len__(self):
+        """Rows currently in view (after filtering)"""
+        return len(self._view)
+    
+    @property
+    def total_count(self):
+        """All rows in the model, including filtered-out ones"""
+        return len(self._rows)
+    
+    @property
+    def rows(self) -> List[TableRow]:
+        """Rows in view order (do not modify the list)"""
+        return self._view
+    
+    def set_rows(self, rows: Iterable[TableRow]):
+        """Replace every row (keeps the selection for rows with a key, and the scroll position)"""
+        self._rows = list(rows)
+        live = {self._sel_key(row) for row in self._rows}
+        self._selected &= live
+        self._rebuild_view()
+    
+    def insert(self, row: TableRow, index=0):
+        """
+        Add a row.
+        
+        Args:
+            row: TableRow
+            index: Model position (0 = top, 'end' = bottom). With a sort
+                   active the row lands at its sorted position in the view.
+        """
+        if index == 'end':
+            self._rows.append(row)
+        else:
+            self._rows.insert(index, row)
+        
+        if self._view is self._rows:
+            # Keep the same rows on screen when something lands above them
+            if index != 'end' and 0 < self._offset and index <= self._offset:
+                self._offset += 1
+            self._schedule_draw()
+        else:
+            self._rebuild_view()
+    
+    def delete(self, rows: Iterable[TableRow]):
+        """Remove rows (by identity)"""
+        doomed = {id(row) for row in rows}
+        if not doomed:
+            return
+        self._rows = [row for row in self._rows if id(row) not in doomed]
+        self._selected = {key for key in self._selected
+                          if not (isinstance(key, TableRow) and id(key) in doomed)}
+        self._rebuild_view()
+    
+    def truncate(self, max_rows: int):
+        """Drop rows past the first max_rows of the model"""
+        if len(self._rows) > max_rows:
+            self.delete(self._rows[max_rows:])
+    
+    def clear(self):
+        """Remove all rows"""
+        self._selected.clear()
+        self._offset = self._cursor = 0
+        self.set_rows([])
+    
+    def update_row(self, row: TableRow, values=None, tags=None):
+        """Change a row's values/tags in place (redrawn if visible)"""
+        if values is not None:
+            row.values = tuple(values)
+        if tags is not None:
+            row.tags = tuple(tags)
+        self._schedule_draw()
+    
+    def set_filter(self, predicate: Optional[Callable[[TableRow], bool]]):
+        """Show only rows where predicate(row) is true (None shows all)"""
+        self._filter = predicate
+        self._offset = 0
+        self._rebuild_view()
+    
+    def sort(self, key: Optional[Callable[[TableRow], object]], reverse=False):
+        """
+        Sort the view in one pass (sort(None) restores model order).
+        
+        The sort stays in effect for rows added later.
+        """
+        self._sort_key = key
+        self._sort_reverse = reverse
+        self._rebuild_view()
+    
+    def _rebuild_view(self):
+        rows = self._rows
+        if self._filter is not None:
+            rows = [row for row in rows if self._filter(row)]
+        if self._sort_key is not None:
+            rows = sorted(rows, key=self._sort_key, reverse=self._sort_reverse)
+        self._view = rows
+        self._clamp_offset()
+        self._schedule_draw()
+    
+    # === Selection ===
+    
+    @staticmethod
+    def _sel_key(row):
+        return row if row.key is None else row.key
+    
+    def selected_rows(self) -> List[TableRow]:
+        """Selected rows in view order"""
+        if not self._selected:
+            return []
+        return [row for row in self._view if self._sel_key(row) in self._selected]
+    
+    def select(self, rows: Iterable[TableRow]):
+        """Replace the selection"""
+        self._selected = {self._sel_key(row) for row in rows}
+        self._schedule_draw()
+    
+    def _on_tree_select(self, event):
+        """User clicked rows: map the visible items back to model rows"""
+        chosen = set(self.tree.selection())
+        if chosen == self._drawn_selection:
+            return  # Our own selection_set from _draw
+        self._drawn_selection = chosen
+        
+        self._selected = {self._sel_key(shown[0]) for slot, shown in zip(self._slots, self._shown)
+                          if slot in chosen}
+        focus = self.tree.focus()
+        if focus in self._slots:
+            self._cursor = self._offset + self._slots.index(focus)
+        if self.on_select:
+            self.on_select()
+    
+    # === Scrolling ===
+    
+    def see(self, index: int):
+        """Scroll so the row at this view index is visible"""
+        if index < self._offset:
+            self._offset = index
+        elif index >= self._offset + self._visible:
+            self._offset = index - self._visible + 1
+        self._clamp_offset()
+        self._schedule_draw()
+    
+    def see_end(self):
+        """Scroll to the last row"""
+        if self._view:
+            self.see(len(self._view) - 1)
+    
+    def _clamp_offset(self):
+        self._offset = max(0, min(self._offset, len(self._view) - self._visible))
+    
+    def _scroll_by(self, lines):
+        self._offset += lines
+        self._clamp_offset()
+        self._schedule_draw()
+        return 'break'
+    
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == 'moveto':
+            self._offset = int(round(float(amount) * len(self._view)))
+            self._clamp_offset()
+            self._schedule_draw()
+        elif action == 'scroll':
+            step = self._visible - 1 if unit == 'pages' else 1
+            self._scroll_by(int(amount) * max(1, step))
+    
+    def _on_mousewheel(self, event):
+        # Windows deltas are multiples of 120; macOS sends small integers
+        notches = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+        return self._scroll_by(-3 * notches)
+    
+    def _on_key(self, step):
+        """Keyboard navigation over the whole view (not just the drawn rows)"""
+        if not self._view:
+            return 'break'
+        if step == 'home':
+            cursor = 0
+        elif step == 'end':
+            cursor = len(self._view) - 1
+        elif step == 'page_up':
+            cursor = self._cursor - max(1, self._visible - 1)
+        elif step == 'page_down':
+            cursor = self._cursor + max(1, self._visible - 1)
+        else:
+            cursor = self._cursor + step
+        self._cursor = max(0, min(cursor, len(self._view) - 1))
+        self.select([self._view[self._cursor]])
+        self.see(self._cursor)
+        if self.on_select:
+            self.on_select()
+        return 'break'
+    
+    def _fit_rows(self, height):
+        """Size the window of materialized rows to the widget height"""
+        if not self._row_height and self._slots:
+            bbox = self.tree.bbox(self._slots[0])
+            if bbox:
+                self._header_height, self._row_height = bbox[1], bbox[3]
+        row_height = self._row_height or DEFAULT_ROW_HEIGHT
+        header = self._header_height or row_height + 4
+        visible = max(1, (height - header) // row_height)
+        if visible != self._visible:
+            self._visible = visible
+            self._clamp_offset()
+            self._schedule_draw()
+    
+    # === Drawing ===
+    
+    def _schedule_draw(self):
+        """Coalesce model changes into one redraw when Tk is idle"""
+        if not self._draw_pending:
+            self._draw_pending = True
+            self.tree.after_idle(self._draw)
+    
+    def _draw(self):
+        """Show view[offset:offset + visible] in the reusable Treeview items"""
+        self._draw_pending = False
+        window = self._view[self._offset:self._offset + self._visible]
+        tree = self.tree
+        
+        # Grow/shrink the pool of items to the window size
+        while len(self._slots) < len(window):
+            self._slots.append(tree.insert('', 'end'))
+            self._shown.append((None, None, None))
+        if len(self._slots) > len(window):
+            tree.delete(*self._slots[len(window):])
+            del self._slots[len(window):]
+            del self._shown[len(window):]
+        
+        # Only items whose row content changed are touched
+        selection = []
+        for i, row in enumerate(window):
+            if self._shown[i][1] != row.values or self._shown[i][2] != row.tags:
+                tree.item(self._slots[i], values=row.values, tags=row.tags)
+            self._shown[i] = (row, row.values, row.tags)
+            if self._sel_key(row) in self._selected:
+                selection.append(self._slots[i])
+        if set(selection) != set(tree.selection()):
+            self._drawn_selection = set(selection)
+            tree.selection_set(selection)
+        
+        # First rows drawn: measure them and fit the window to the real widget height
+        if not self._row_height and self._slots and tree.winfo_ismapped():
+            self._fit_rows(tree.winfo_height())
+        
+        # Scrollbar shows the window's place in the whole view
+        total = len(self._view)
+        if total:
+            self.scrollbar.set(self._offset / total, min(1.0, (self._offset + len(window)) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
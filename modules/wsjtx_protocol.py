@@ -0,0 +1,438 @@
+"""
+WSJT-X UDP Protocol Codec
+
+Table-driven codec for every WSJT-X NetworkMessage type (see
+NetworkMessage.hpp in the WSJT-X sources). Each message layout is compiled
+once: every run of fixed-width fields becomes a single struct.Struct, so a
+Decode is read with two unpack_from calls plus its two strings, straight
+out of the datagram buffer. Outgoing messages are packed the same way and
+joined into the datagram with a single copy.
+
+Every message starts with Magic, Schema, Type and the instance Id. Fields
+added in later WSJT-X versions sit at the end of a message, so a datagram
+from an older WSJT-X simply ends early and its missing fields are None.
+
+Usage:
+    from modules.wsjtx_protocol import decode_message, encode_message, parse_standard_message
+    
+    message = decode_message(data)
+    if message['type'] == MSG_DECODE:
+        print(message['id'], message['snr'], message['message'])
+        parsed = parse_standard_message(message['message'])   # CQ/calls/grid
+    
+    packet = encode_message(MSG_LOCATION, "WSJT-X", {'location': "EM15"})
+"""
+
+import datetime
+import re
+import struct
+from functools import lru_cache
+from typing import Dict, Optional
+
+MAGIC = 0xADBCCBDA
+SCHEMA = 3  # Schema 3 for WSJT-X 2.x (Qt 5.4+)
+
+# Message types
+MSG_HEARTBEAT = 0
+MSG_STATUS = 1
+MSG_DECODE = 2
+MSG_CLEAR = 3
+MSG_REPLY = 4
+MSG_QSO_LOGGED = 5
+MSG_CLOSE = 6
+MSG_REPLAY = 7
+MSG_HALT_TX = 8
+MSG_FREE_TEXT = 9
+MSG_WSPR_DECODE = 10
+MSG_LOCATION = 11
+MSG_LOGGED_ADIF = 12
+MSG_HIGHLIGHT_CALLSIGN = 13
+MSG_SWITCH_CONFIGURATION = 14
+MSG_CONFIGURE = 15
+
+# Precompiled Qt QDataStream primitives (big-endian)
+HEADER_ID = struct.Struct('>IIII')  # Header + length of the Id
+U32 = struct.Struct('>I')
+I32 = struct.Struct('>i')
+QCOLOR = struct.Struct('>bHHHHH')  # Spec, alpha, red, green, blue, pad
+QDATETIME = struct.Struct('>qIB')  # Julian day, ms since midnight, time spec
+
+NULL_LENGTH = 0xFFFFFFFF  # Null QString / QByteArray / QTime
+JULIAN_DAY_1970 = 2440588
+_EPOCH = datetime.datetime(1970, 1, 1)
+
+
+# === Field readers: (buffer, offset) -> (value, new offset) ===
+
+def _read_utf8(buf, offset):
+    """QByteArray holding UTF-8 (null reads as '')"""
+    (length,) = U32.unpack_from(buf, offset)
+    offset += 4
+    if length == NULL_LENGTH:
+        return '', offset
+    end = offset + length
+    if end > len(buf):
+        raise struct.error("string runs past end of datagram")
+    return buf[offset:end].decode('utf-8', 'replace'), end
+
+
+def _reader(codec):
+    unpack_from = codec.unpack_from
+    size = codec.size
+    
+    def read(buf, offset):
+        return unpack_from(buf, offset)[0], offset + size
+    return read
+
+
+@lru_cache(maxsize=256)
+def _qtime_from_msecs(msecs):
+    """Every Decode of a period carries the same time - convert it once"""
+    if msecs == NULL_LENGTH:
+        return None
+    seconds, ms = divmod(msecs, 1000)
+    minutes, second = divmod(seconds, 60)
+    hour, minute = divmod(minutes, 60)
+    return datetime.time(hour % 24, minute, second, ms * 1000)
+
+
+def _msecs_from_qtime(value):
+    if value is None:
+        return NULL_LENGTH
+    return ((value.hour * 60 + value.minute) * 60 + value.second) * 1000 + value.microsecond // 1000
+
+
+def _read_qdatetime(buf, offset):
+    """QDateTime: Julian day, ms since midnight, time spec [, UTC offset] -> naive datetime"""
+    julian_day, msecs, time_spec = QDATETIME.unpack_from(buf, offset)
+    offset += QDATETIME.size
+    utc_offset = 0
+    if time_spec == 2:  # Qt::OffsetFromUTC carries the offset in seconds
+        (utc_offset,) = I32.unpack_from(buf, offset)
+        offset += 4
+    if julian_day <= 0 or msecs == NULL_LENGTH:
+        return None, offset  # Null date/time
+    value = _EPOCH + datetime.timedelta(days=julian_day - JULIAN_DAY_1970, milliseconds=msecs)
+    return value - datetime.timedelta(seconds=utc_offset), offset
+
+
+def _read_qcolor(buf, offset):
+    """QColor -> (spec, alpha, red, green, blue)"""
+    spec, alpha, red, green, blue, _ = QCOLOR.unpack_from(buf, offset)
+    return (spec, alpha >> 8, red >> 8, green >> 8, blue >> 8), offset + QCOLOR.size
+
+
+# Variable and multi-value kinds (fixed-width kinds are read by the compiled runs)
+READERS = {
+    'utf8': _read_utf8,
+    'qdatetime': _read_qdatetime,
+    'qcolor': _read_qcolor,
+}
+
+# Fields after the Id, in wire order (NetworkMessage.hpp). Names must not
+# repeat a header key ('type', 'name', 'schema', 'id') - QSO Logged's Name is 'dx_name'
+MESSAGE_FIELDS = {
+    MSG_HEARTBEAT: ('heartbeat', (
+        ('max_schema', 'u32'), ('version', 'utf8'), ('revision', 'utf8'))),
+    MSG_STATUS: ('status', (
+        ('dial_frequency', 'u64'), ('mode', 'utf8'), ('dx_call', 'utf8'), ('report', 'utf8'),
+        ('tx_mode', 'utf8'), ('tx_enabled', 'bool'), ('transmitting', 'bool'), ('decoding', 'bool'),
+        ('rx_df', 'u32'), ('tx_df', 'u32'), ('de_call', 'utf8'), ('de_grid', 'utf8'),
+        ('dx_grid', 'utf8'), ('tx_watchdog', 'bool'), ('sub_mode', 'utf8'), ('fast_mode', 'bool'),
+        ('special_operation_mode', 'u8'), ('frequency_tolerance', 'u32'), ('tr_period', 'u32'),
+        ('configuration_name', 'utf8'), ('tx_message', 'utf8'))),
+    MSG_DECODE: ('decode', (
+        ('new', 'bool'), ('time', 'qtime'), ('snr', 'i32'), ('delta_time', 'f64'),
+        ('delta_frequency', 'u32'), ('mode', 'utf8'), ('message', 'utf8'),
+        ('low_confidence', 'bool'), ('off_air', 'bool'))),
+    MSG_CLEAR: ('clear', (
+        ('window', 'u8'),)),
+    MSG_REPLY: ('reply', (
+        ('time', 'qtime'), ('snr', 'i32'), ('delta_time', 'f64'), ('delta_frequency', 'u32'),
+        ('mode', 'utf8'), ('message', 'utf8'), ('low_confidence', 'bool'), ('modifiers', 'u8'))),
+    MSG_QSO_LOGGED: ('qso_logged', (
+        ('datetime_off', 'qdatetime'), ('dx_call', 'utf8'), ('dx_grid', 'utf8'),
+        ('tx_frequency', 'u64'), ('mode', 'utf8'), ('report_sent', 'utf8'),
+        ('report_received', 'utf8'), ('tx_power', 'utf8'), ('comments', 'utf8'), ('dx_name', 'utf8'),
+        ('datetime_on', 'qdatetime'), ('operator_call', 'utf8'), ('my_call', 'utf8'),
+        ('my_grid', 'utf8'), ('exchange_sent', 'utf8'), ('exchange_received', 'utf8'),
+        ('adif_propagation_mode', 'utf8'))),
+    MSG_CLOSE: ('close', ()),
+    MSG_REPLAY: ('replay', ()),
+    MSG_HALT_TX: ('halt_tx', (
+        ('auto_tx_only', 'bool'),)),
+    MSG_FREE_TEXT: ('free_text', (
+        ('text', 'utf8'), ('send', 'bool'))),
+    MSG_WSPR_DECODE: ('wspr_decode', (
+        ('new', 'bool'), ('time', 'qtime'), ('snr', 'i32'), ('delta_time', 'f64'),
+        ('frequency', 'u64'), ('drift', 'i32'), ('callsign', 'utf8'), ('grid', 'utf8'),
+        ('power', 'i32'), ('off_air', 'bool'))),
+    MSG_LOCATION: ('location', (
+        ('location', 'utf8'),)),
+    MSG_LOGGED_ADIF: ('logged_adif', (
+        ('adif_text', 'utf8'),)),
+    MSG_HIGHLIGHT_CALLSIGN: ('highlight_callsign', (
+        ('callsign', 'utf8'), ('background', 'qcolor'), ('foreground', 'qcolor'),
+        ('highlight_last', 'bool'))),
+    MSG_SWITCH_CONFIGURATION: ('switch_configuration', (
+        ('configuration_name', 'utf8'),)),
+    MSG_CONFIGURE: ('configure', (
+        ('mode', 'utf8'), ('frequency_tolerance', 'u32'), ('sub_mode', 'utf8'),
+        ('fast_mode', 'bool'), ('tr_period', 'u32'), ('rx_df', 'u32'), ('dx_call', 'utf8'),
+        ('dx_grid', 'utf8'), ('generate_messages', 'bool'))),
+}
+
+# Fixed-width kinds, as struct codes - neighbouring ones are read with one struct.Struct
+_RUN_CODES = {'bool': '?', 'u8': 'B', 'u32': 'I', 'i32': 'i', 'u64': 'Q', 'f64': 'd', 'qtime': 'I'}
+_RUN_READERS = {kind: _reader(struct.Struct('>' + code)) for kind, code in _RUN_CODES.items()}
+
+
+def _compile(fields):
+    """
+    Group a message's fields into steps: each run of fixed-width fields
+    becomes one struct.Struct, and every other field is a step of its own.
+    
+    Returns:
+        Tuple of (codec or None, field names, kinds) steps
+    """
+    steps = []
+    run = []
+    for field, kind in fields + ((None, None),):
+        if kind in _RUN_CODES:
+            run.append((field, kind))
+            continue
+        if run:
+            codec = struct.Struct('>' + ''.join(_RUN_CODES[k] for _, k in run))
+            steps.append((codec, tuple(f for f, _ in run), tuple(k for _, k in run)))
+            run = []
+        if field is not None:
+            steps.append((None, (field,), (kind,)))
+    return tuple(steps)
+
+
+_COMPILED = {msg_type: _compile(fields) for msg_type, (name, fields) in MESSAGE_FIELDS.items()}
+
+_HEADER_KEYS = ('type', 'name', 'schema', 'id')
+
+
+def _decode_entry(name, fields, steps):
+    """
+    _DECODE_TABLE entry: (name, output keys, steps, indexes of QTime values).
+    A step is (None, field, reader) for a variable-width field, or (codec,
+    names, per-field readers) for a run - the per-field readers are only
+    used when an older WSJT-X ends the datagram inside the run.
+    """
+    keys = _HEADER_KEYS + tuple(field for field, _ in fields)
+    steps = tuple((None, names[0], READERS[kinds[0]]) if codec is None else
+                  (codec, names, tuple(_RUN_READERS[kind] for kind in kinds))
+                  for codec, names, kinds in steps)
+    qtime_indexes = tuple(len(_HEADER_KEYS) + i for i, (_, kind) in enumerate(fields) if kind == 'qtime')
+    return name, keys, steps, qtime_indexes
+
+
+_DECODE_TABLE = {msg_type: _decode_entry(name, fields, _COMPILED[msg_type])
+                 for msg_type, (name, fields) in MESSAGE_FIELDS.items()}
+assert all(len(set(keys)) == len(keys) for _, keys, _, _ in _DECODE_TABLE.values()), \
+    "a message field shadows a header key"
+
+
+def _read_header(buf):
+    """Magic, Schema, Type, Id -> (msg_type, schema, wsjtx_id, offset)"""
+    try:
+        magic, schema, msg_type, length = HEADER_ID.unpack_from(buf, 0)
+    except struct.error as e:
+        raise ValueError(f"Packet too short: {e}") from None
+    if magic != MAGIC:
+        raise ValueError("Invalid magic number")
+    offset = HEADER_ID.size
+    if length == NULL_LENGTH:
+        return msg_type, schema, '', offset
+    end = offset + length
+    if end > len(buf):
+        raise ValueError("Packet too short: Id runs past end of datagram")
+    return msg_type, schema, buf[offset:end].decode('utf-8', 'replace'), end
+
+
+def decode_header(data):
+    """
+    Read only the header of a datagram.
+    
+    Returns:
+        (msg_type, schema, wsjtx_id)
+    
+    Raises:
+        ValueError: Not a WSJT-X datagram
+    """
+    return _read_header(data if isinstance(data, bytes) else bytes(data))[:3]
+
+
+def _read_cut_run(buf, offset, name, fields, readers, values):
+    """A run that an older WSJT-X ends part way through: read it field by field"""
+    for field, read in zip(fields, readers):
+        if offset >= len(buf):
+            values.append(None)
+            continue
+        try:
+            value, offset = read(buf, offset)
+        except struct.error as e:
+            raise ValueError(f"Truncated {name} message at '{field}': {e}") from None
+        values.append(value)
+    return offset
+
+
+def decode_message(data) -> Dict:
+    """
+    Decode a WSJT-X datagram.
+    
+    Args:
+        data: bytes / bytearray / memoryview of one datagram
+    
+    Returns:
+        Dict with 'type', 'name', 'schema', 'id' and the message's fields.
+        Fields missing from older WSJT-X versions are None; unknown message
+        types return just the header keys.
+    
+    Raises:
+        ValueError: Not a WSJT-X datagram, or truncated inside a field
+    """
+    buf = data if isinstance(data, bytes) else bytes(data)
+    size = len(buf)
+    msg_type, schema, wsjtx_id, offset = _read_header(buf)
+    
+    name, keys, steps, qtime_indexes = _DECODE_TABLE.get(msg_type, ('unknown', _HEADER_KEYS, (), ()))
+    values = [msg_type, name, schema, wsjtx_id]
+    
+    for codec, field, read in steps:
+        if codec is None:
+            if offset >= size:
+                values.append(None)  # Added in a later WSJT-X version
+                continue
+            try:
+                value, offset = read(buf, offset)
+            except struct.error as e:
+                raise ValueError(f"Truncated {name} message at '{field}': {e}") from None
+            values.append(value)
+        elif offset + codec.size <= size:
+            values.extend(codec.unpack_from(buf, offset))
+            offset += codec.size
+        else:
+            offset = _read_cut_run(buf, offset, name, field, read, values)
+    
+    for index in qtime_indexes:
+        if values[index] is not None:
+            values[index] = _qtime_from_msecs(values[index])
+    return dict(zip(keys, values))
+
+
+# === Field encoders: value -> bytes ===
+
+def encode_utf8(text) -> bytes:
+    """QByteArray holding UTF-8 as bytes (None / '' encode as null)"""
+    if not text:
+        return U32.pack(NULL_LENGTH)
+    encoded = text.encode('utf-8')
+    return U32.pack(len(encoded)) + encoded
+
+
+def _encode_qdatetime(value) -> bytes:
+    """Naive UTC datetime -> QDateTime with Qt::UTC time spec (None encodes a null QDateTime)"""
+    if value is None:
+        return QDATETIME.pack(0, NULL_LENGTH, 1)
+    delta = value - _EPOCH
+    return QDATETIME.pack(JULIAN_DAY_1970 + delta.days, delta.seconds * 1000 + delta.microseconds // 1000, 1)
+
+
+def _encode_qcolor(value) -> bytes:
+    spec, alpha, red, green, blue = value or (0, 0, 0, 0, 0)  # Spec 0 = invalid color
+    return QCOLOR.pack(spec, alpha * 0x101, red * 0x101, green * 0x101, blue * 0x101, 0)
+
+
+# Variable and multi-value kinds (fixed-width kinds are packed by the compiled runs)
+ENCODERS = {
+    'utf8': encode_utf8,
+    'qdatetime': _encode_qdatetime,
+    'qcolor': _encode_qcolor,
+}
+
+# msg_type -> steps of (codec, names, indexes of QTime fields in the run) | (None, (name,), encoder)
+_ENCODE_TABLE = {
+    msg_type: tuple(
+        (codec, names, tuple(i for i, kind in enumerate(kinds) if kind == 'qtime'))
+        if codec else (None, names, ENCODERS[kinds[0]])
+        for codec, names, kinds in steps)
+    for msg_type, steps in _COMPILED.items()
+}
+
+
+def encode_message(msg_type: int, wsjtx_id: str, fields: Optional[Dict] = None,
+                   schema: int = SCHEMA) -> bytes:
+    """
+    Build a WSJT-X datagram (e.g. LocationChange, Reply, HaltTx to an instance).
+    
+    Args:
+        msg_type: MSG_* message type
+        wsjtx_id: Target instance Id
+        fields: Field values by name (missing fields are written as null / 0)
+        schema: Schema number for the header
+    
+    Returns:
+        Datagram bytes
+    """
+    fields = fields or {}
+    encoded_id = wsjtx_id.encode('utf-8') if wsjtx_id else b''
+    parts = [HEADER_ID.pack(MAGIC, schema, msg_type, len(encoded_id) if encoded_id else NULL_LENGTH),
+             encoded_id]
+    for codec, names, extra in _ENCODE_TABLE[msg_type]:
+        if codec is None:
+            parts.append(extra(fields.get(names[0])))
+            continue
+        values = [fields.get(field) or 0 for field in names]
+        for index in extra:
+            values[index] = _msecs_from_qtime(fields.get(names[index]))
+        parts.append(codec.pack(*values))
+    # One join sizes and copies the datagram once
+    return b''.join(parts)
+
+
+# === Decode text ===
+
+_GRID_RE = re.compile(r'^[A-R]{2}[0-9]{2}([A-X]{2})?$')
+_REPORT_RE = re.compile(r'^R?[+-]\d{2}$')
+
+
+def parse_standard_message(text: str) -> Dict[str, Optional[str]]:
+    """
+    Pull the calls and grid out of a standard FT8/FT4/MSK144 message.
+    
+    "CQ K5TR EM10", "CQ NA K5TR EM10", "N5ZY K5TR EM10", "N5ZY K5TR R-05",
+    "K5TR N5ZY RR73", "<N5ZY> K5TR/R EM10" ...
+    
+    Returns:
+        {'to_call': call or 'CQ', 'from_call': call, 'grid': grid or None,
+         'report': report or None}
+    """
+    words = (text or '').upper().split()
+    result = {'to_call': None, 'from_call': None, 'grid': None, 'report': None}
+    if not words:
+        return result
+    
+    # Trailing token: grid, report or RR73/RRR/73
+    last = words[-1]
+    if _GRID_RE.match(last) and last != 'RR73':
+        result['grid'] = last
+        words = words[:-1]
+    elif _REPORT_RE.match(last):
+        result['report'] = last
+        words = words[:-1]
+    elif last in ('RR73', 'RRR', '73'):
+        words = words[:-1]
+    
+    if words and words[0] == 'CQ':
+        # "CQ K5TR" or "CQ NA K5TR" (directed CQ)
+        result['to_call'] = 'CQ'
+        if len(words) >= 2:
+            result['from_call'] = words[-1].strip('<>')
+    elif len(words) >= 2:
+        result['to_call'] = words[0].strip('<>')
+        result['from_call'] = words[1].strip('<>')
+    return result
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+ADIF County Re-Stamp Tool
+
+Re-computes MY_STATE and MY_CNTY in Co-Pilot ADIF logs from each record's
+MY_LAT / MY_LON, using one vectorized county lookup per file. Useful after
+a run where the county shapefile was missing or still loading, or after
+switching to a more detailed shapefile.
+
+The original file is kept as <name>.adi.bak. A log Co-Pilot is still
+writing (it has a <name>.adi.lock) is skipped - close Co-Pilot first, or
+pass --force if the lock was left behind by a crash.
+
+Usage:
+    python restamp_adif.py                        # all logs/n5zy_copilot_*.adi
+    python restamp_adif.py logs/n5zy_copilot_20260614.adi --dry-run
+    python restamp_adif.py --shapefile data/tl_2025_us_county.shp
+"""
+
+import argparse
+import glob
+import os
+import shutil
+import sys
+
+from modules.adif import AdifReader, adif_file_in_use, format_record, read_adif_file
+from modules.county_lookup import CountyLookupService
+from modules.county_mappings import CountyMappingRegistry
+from modules.radio_updater import RadioUpdater
+
+DEFAULT_LOG_GLOB = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                'logs', 'n5zy_copilot_*.adi')
+
+
+def restamp_record(record, state, name):
+    """Replace (or add) MY_STATE / MY_CNTY in one record dict"""
+    record['my_state'] = state
+    record['my_cnty'] = name
+    return record
+
+
+def restamp_file(path, service, mappings, dry_run=False):
+    """
+    Re-stamp one ADIF file.
+    
+    The file is streamed twice: once to gather MY_LAT/MY_LON for a single
+    bulk lookup, and (if anything changed) once more from the .bak copy to
+    write the re-stamped records.
+    
+    Args:
+        path: ADIF file
+        service: Loaded CountyLookupService
+        mappings: CountyMappingRegistry (MY_CNTY spelling, same as the live stamping)
+        dry_run: Count changes without writing
+    
+    Returns:
+        (records, stamped, changed) counts
+    """
+    # Gather coordinates (and the current stamp) for a single bulk lookup
+    lats, lons, positions, stamps = [], [], [], []
+    records = 0
+    for i, record in enumerate(read_adif_file(path)):
+        records += 1
+        lat = RadioUpdater.from_adif_location(record.get('my_lat', ''))
+        lon = RadioUpdater.from_adif_location(record.get('my_lon', ''))
+        if lat is not None and lon is not None:
+            lats.append(lat)
+            lons.append(lon)
+            positions.append(i)
+            stamps.append((record.get('my_state', ''), record.get('my_cnty', '')))
+    
+    counties = service.lookup_many(lats, lons)
+    
+    # Record index -> new (state, county name), only where it differs
+    updates = {}
+    stamped = 0
+    for i, old, county in zip(positions, stamps, counties):
+        if county is None:
+            continue
+        new = (county.state_abbrev,
+               mappings.name_for(county.state_abbrev, county.fips, default=county.contest_name))
+        stamped += 1
+        if old != new:
+            updates[i] = new
+    changed = len(updates)
+    
+    if changed and not dry_run:
+        shutil.copy2(path, path + '.bak')
+        tmp_path = path + '.tmp'
+        with open(path + '.bak', 'r', encoding='utf-8', errors='replace') as src, \
+                open(tmp_path, 'w', encoding='utf-8') as dst:
+            reader = AdifReader(src)
+            for i, record in enumerate(reader):
+                if i == 0:
+                    # Keep the header untouched
+                    dst.write(reader.header_text)
+                    if reader.header_text and not reader.header_text.endswith('\n'):
+                        dst.write('\n')
+                if i in updates:
+                    record = restamp_record(record, *updates[i])
+                dst.write(format_record(record) + '\n')
+        os.replace(tmp_path, path)
+    
+    return records, stamped, changed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-stamp MY_STATE/MY_CNTY in ADIF logs from MY_LAT/MY_LON")
+    parser.add_argument('files', nargs='*', help="ADIF files (default: logs/n5zy_copilot_*.adi)")
+    parser.add_argument('--shapefile', default='data/us_counties_10m.shp',
+                        help="County shapefile (default: data/us_counties_10m.shp)")
+    parser.add_argument('--dry-run', action='store_true', help="Report changes without writing")
+    parser.add_argument('--force', action='store_true',
+                        help="Also rewrite logs that look in use (stale .lock after a crash)")
+    args = parser.parse_args()
+    
+    files = args.files or sorted(glob.glob(DEFAULT_LOG_GLOB))
+    if not files:
+        print("No ADIF files found")
+        return 1
+    
+    service = CountyLookupService()
+    service.load_shapefile(args.shapefile)
+    mappings = CountyMappingRegistry()
+    
+    for path in files:
+        if not args.dry_run and not args.force and adif_file_in_use(path):
+            print(f"{os.path.basename(path)}: skipped - Co-Pilot is logging to it "
+                  f"(close Co-Pilot, or use --force if it is not running)")
+            continue
+        records, stamped, changed = restamp_file(path, service, mappings, dry_run=args.dry_run)
+        action = "would change" if args.dry_run else "changed"
+        print(f"{os.path.basename(path)}: {records} records, {stamped} located, {changed} {action}")
+    
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())